@@ -0,0 +1,44 @@
+# File: C:\New Project\viral-ai-content\audio_pcm.py
+"""
+PCM Audio Buffers for Viral AI Content
+Encoded audio bytes are decoded once, over ffmpeg pipes, into NumPy int16
+sample buffers; buffers are written back out as WAV with the standard
+library. No intermediate files.
+"""
+
+import io
+import wave
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+
+def decode_pcm(audio, sample_rate=24000, channels=1):
+    """Encoded audio bytes -> int16 samples, shape (n,) for mono or (n, channels)"""
+    cmd = [get_setting("FFMPEG_BINARY"), '-loglevel', 'error', '-i', 'pipe:0',
+           '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', str(channels), '-ar', str(sample_rate), 'pipe:1']
+    result = subprocess.run(cmd, input=audio, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise IOError(f"ffmpeg audio decode failed: {result.stderr.decode(errors='ignore')}")
+
+    samples = np.frombuffer(result.stdout, dtype=np.int16)
+    return samples if channels == 1 else samples.reshape(-1, channels)
+
+
+def encode_wav(samples, sample_rate):
+    """int16 samples, shape (n,) or (n, channels) -> WAV bytes"""
+    samples = np.ascontiguousarray(samples, dtype=np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1 if samples.ndim == 1 else samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def write_wav(path, samples, sample_rate):
+    with open(path, 'wb') as f:
+        f.write(encode_wav(samples, sample_rate))
+    return path
@@ -0,0 +1,62 @@
+# File: C:\New Project\viral-ai-content\camera_moves.py
+"""
+Camera Moves for Viral AI Content
+Ken Burns zooms as a moving crop window: every output frame is produced by
+one fixed-size cv2.warpAffine from the (larger) source frame, instead of a
+full-frame resize whose output size changes over time
+"""
+
+import cv2
+import numpy as np
+
+
+class ZoomWindow:
+    """
+    Crop window over the source that fills a width x height output.
+    zoom(t) = 1 is the largest window with the output's aspect ratio (a
+    cover-fit crop); zoom(t) = 1.2 shows a window 1.2x smaller, and so on.
+    focus places the window inside the slack space: (0.5, 0.5) is centred,
+    (0.5, 1/3) is the upper-middle crop.
+    """
+
+    def __init__(self, width, height, zoom=None, focus=(0.5, 0.5), interpolation=cv2.INTER_LINEAR):
+        self.width = width
+        self.height = height
+        self.zoom = zoom if zoom is not None else (lambda t: 1.0)
+        self.focus = focus
+        self.interpolation = interpolation
+
+    def matrix(self, src_width, src_height, t):
+        """Output -> source affine matrix for time t"""
+        scale = max(self.width / src_width, self.height / src_height) * self.zoom(t)
+        window_w = self.width / scale
+        window_h = self.height / scale
+        left = (src_width - window_w) * self.focus[0]
+        top = (src_height - window_h) * self.focus[1]
+
+        # Pixel centres map to pixel centres, like cv2.resize
+        return np.float32([
+            [1 / scale, 0, left + 0.5 / scale - 0.5],
+            [0, 1 / scale, top + 0.5 / scale - 0.5],
+        ])
+
+    def zoom_frame(self, frame, t):
+        """Constant-size output frame for time t"""
+        frame = np.ascontiguousarray(frame)
+        if frame.dtype != np.uint8 and frame.ndim == 3:
+            frame = frame.astype(np.uint8)
+        matrix = self.matrix(frame.shape[1], frame.shape[0], t)
+        return cv2.warpAffine(frame, matrix, (self.width, self.height),
+                              flags=self.interpolation | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def apply(self, clip):
+        """Clip reframed to the output size with the zoom applied (mask included)"""
+        zoomed = clip.fl(lambda get_frame, t: self.zoom_frame(get_frame(t), t))
+        zoomed.size = (self.width, self.height)
+        if clip.mask is not None:
+            mask = clip.mask.fl(lambda get_frame, t: self.zoom_frame(
+                np.asarray(get_frame(t), dtype=np.float32), t))
+            mask.size = (self.width, self.height)
+            zoomed = zoomed.set_mask(mask)
+        return zoomed
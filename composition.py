@@ -0,0 +1,216 @@
+# File: C:\New Project\viral-ai-content\composition.py
+"""
+Layer Flattening for Viral AI Content
+Composition pass that pre-merges time-invariant, statically positioned layers
+(letterbox bars, lower thirds, text cards) into one premultiplied RGBA layer,
+so each frame pays one cheap blend instead of one full moviepy blit per layer
+"""
+
+import numpy as np
+from moviepy.editor import CompositeVideoClip, ImageClip
+
+
+def _static_image(clip):
+    """True when the clip returns the same array at every time (ImageClip without time effects)"""
+    img = getattr(clip, 'img', None)
+    if img is None:
+        return False
+    try:
+        return clip.make_frame(0) is img
+    except Exception:
+        return False
+
+
+def resolve_position(clip, t, frame_size):
+    """Top-left corner of a clip in the frame, with the same rules as VideoClip.blit_on"""
+    wf, hf = frame_size
+    hi, wi = clip.img.shape[:2]
+    pos = clip.pos(t)
+
+    if isinstance(pos, str):
+        pos = {'center': ['center', 'center'],
+               'left': ['left', 'center'],
+               'right': ['right', 'center'],
+               'top': ['center', 'top'],
+               'bottom': ['center', 'bottom']}[pos]
+    else:
+        pos = list(pos)
+
+    if clip.relative_pos:
+        for i, dim in enumerate([wf, hf]):
+            if not isinstance(pos[i], str):
+                pos[i] = dim * pos[i]
+
+    if isinstance(pos[0], str):
+        pos[0] = {'left': 0, 'center': (wf - wi) / 2, 'right': wf - wi}[pos[0]]
+    if isinstance(pos[1], str):
+        pos[1] = {'top': 0, 'center': (hf - hi) / 2, 'bottom': hf - hi}[pos[1]]
+
+    return int(pos[0]), int(pos[1])
+
+
+def static_position(clip, duration, frame_size, fps):
+    """The clip's position if it never moves at any frame time, else None"""
+    times = np.append(np.arange(0, duration, 1.0 / fps), duration)
+    first = resolve_position(clip, 0, frame_size)
+    for t in times:
+        if resolve_position(clip, t, frame_size) != first:
+            return None
+    return first
+
+
+class StaticLayerStack:
+    """
+    Consecutive static layers merged into premultiplied colour + alpha.
+    Blending is done per horizontal band of visible rows, inside that band's
+    column extent only, so transparent areas cost nothing.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.color = np.zeros((height, width, 3), dtype=np.float32)
+        self.alpha = np.zeros((height, width, 1), dtype=np.float32)
+        self.bands = None
+
+    def add(self, clip, pos):
+        """Merge a static layer on top of the stack"""
+        img = np.asarray(clip.img)[:, :, :3].astype(np.float32)
+        if clip.mask is not None:
+            mask = np.asarray(clip.mask.img, dtype=np.float32)[:, :, None]
+        else:
+            mask = np.ones(img.shape[:2] + (1,), dtype=np.float32)
+
+        # Clip the layer against the frame, like moviepy's blit
+        x, y = pos
+        h, w = img.shape[:2]
+        fx0, fy0 = max(0, x), max(0, y)
+        fx1, fy1 = min(self.width, x + w), min(self.height, y + h)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+
+        img = img[fy0 - y:fy1 - y, fx0 - x:fx1 - x]
+        mask = mask[fy0 - y:fy1 - y, fx0 - x:fx1 - x]
+        color = self.color[fy0:fy1, fx0:fx1]
+        alpha = self.alpha[fy0:fy1, fx0:fx1]
+        color[:] = img * mask + color * (1 - mask)
+        alpha[:] = mask + alpha * (1 - mask)
+        self.bands = None
+
+    def build_bands(self):
+        """Split the visible rows into contiguous bands cropped to their columns"""
+        visible = self.alpha[:, :, 0] > 0
+        rows = np.flatnonzero(visible.any(axis=1))
+        self.bands = []
+        if len(rows) == 0:
+            return
+
+        breaks = np.flatnonzero(np.diff(rows) > 1)
+        starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+        ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+
+        for y0, y1 in zip(starts, ends):
+            cols = np.flatnonzero(visible[y0:y1].any(axis=0))
+            x0, x1 = cols[0], cols[-1] + 1
+            alpha = self.alpha[y0:y1, x0:x1]
+            color = self.color[y0:y1, x0:x1]
+            if alpha.min() >= 1:
+                # Fully opaque band: a plain copy
+                self.bands.append((y0, y1, x0, x1, color.astype(np.uint8), None, None))
+            else:
+                self.bands.append((y0, y1, x0, x1, color, 1 - alpha, alpha[:, :, 0]))
+
+    def blend(self, frame):
+        """Frame with the merged layers on top (input frame is not modified)"""
+        if self.bands is None:
+            self.build_bands()
+
+        out = np.array(frame, dtype=np.uint8)
+        for y0, y1, x0, x1, color, inverse, _ in self.bands:
+            region = out[y0:y1, x0:x1]
+            if inverse is None:
+                region[:] = color
+            else:
+                region[:] = region * inverse + color
+        return out
+
+    def blend_mask(self, mask):
+        """Mask frame with the merged layers' coverage added"""
+        if self.bands is None:
+            self.build_bands()
+
+        out = np.array(mask, dtype=np.float64)
+        for y0, y1, x0, x1, _, inverse, alpha in self.bands:
+            region = out[y0:y1, x0:x1]
+            if inverse is None:
+                region[:] = 1.0
+            else:
+                region[:] = region * inverse[:, :, 0] + alpha
+        return out
+
+
+def _covers_frame(clip, size):
+    """A maskless full-frame clip at the origin, usable as the base without compositing"""
+    return (clip.start == 0 and clip.mask is None and tuple(clip.size) == tuple(size)
+            and clip.pos(0) in [(0, 0), 'center', ('center', 'center')])
+
+
+def _collapse(clips, size):
+    if len(clips) == 1 and _covers_frame(clips[0], size):
+        return clips[0]
+    return CompositeVideoClip(clips, size=size)
+
+
+def _apply_stack(base, stack, duration):
+    """Blend a finished static stack over everything composited so far"""
+    if _static_image(base) and base.mask is None:
+        # Static on static: render the merged frame once
+        return ImageClip(stack.blend(base.img), duration=duration)
+
+    merged = base.fl_image(stack.blend)
+    if base.mask is not None:
+        merged = merged.set_mask(base.mask.fl_image(stack.blend_mask))
+    return merged
+
+
+def compose_layers(clips, size=None, fps=30):
+    """
+    Drop-in replacement for CompositeVideoClip(clips, size=size).
+    Runs of static layers (unchanging image, fixed position, shown for the
+    whole composition, no audio) above the first layer are merged into one
+    premultiplied layer that is blended over the layers below it; the
+    remaining dynamic layers are composited as usual.
+    """
+    if size is None:
+        size = clips[0].size
+
+    ends = [c.end for c in clips]
+    if None in ends:
+        return CompositeVideoClip(clips, size=size)
+    duration = max(ends)
+
+    below = []
+    stack = None
+    for clip in clips:
+        pos = None
+        base_end = max(c.end for c in below) if below else 0
+        if (base_end >= duration and clip.start == 0 and clip.end >= duration
+                and clip.audio is None and not clip.ismask and _static_image(clip)
+                and (clip.mask is None or _static_image(clip.mask))):
+            pos = static_position(clip, duration, size, fps)
+
+        if pos is not None:
+            if stack is None:
+                stack = StaticLayerStack(*size)
+            stack.add(clip, pos)
+            continue
+
+        if stack is not None:
+            below = [_apply_stack(_collapse(below, size), stack, duration)]
+            stack = None
+        below.append(clip)
+
+    if stack is not None:
+        below = [_apply_stack(_collapse(below, size), stack, duration)]
+
+    return _collapse(below, size).set_duration(duration)
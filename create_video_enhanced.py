@@ -8,28 +8,52 @@ import json
 import asyncio
 from moviepy.editor import *
 from moviepy.video.fx.all import *
-import edge_tts
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import numpy as np
 import os
+import shutil
+import tempfile
 import requests
 from datetime import datetime
 import re
 import random
 from stock_footage_manager import StockFootageManager
-from voice_enhancer import generate_voice_with_subtitles_enhanced
+from voice_enhancer import generate_speech_enhanced
+from parallel_speech import synthesize_speech
+from speech_synthesis import get_backend_name
 from video_effects_manager import VideoEffectsManager
+from footage_index import FootageIndex
+from procedural_layers import GradientBackground, Vignette
+from text_renderer import get_font, cached_overlay
+from composition import compose_layers
+from camera_moves import ZoomWindow
+from color_grading import ColorGrade
+from video_encoder import get_encoder
+from multi_format import master_canvas, SharedFrames, format_branch, FootageReaders
+from render_profiles import get_profile, encoder_settings
 
 class EnhancedVideoCreator:
-    def __init__(self):
+    def __init__(self, profile=None, tts_backend=None):
+        # Render profile (RENDER_PROFILE=full|draft)
+        self.profile = get_profile(profile)
+
         # Video specifications
         self.formats = {
             'reels': {'width': 1080, 'height': 1920},  # 9:16
             'square': {'width': 1080, 'height': 1080},  # 1:1
             'youtube': {'width': 1920, 'height': 1080}  # 16:9
         }
-        self.fps = 30
-        
+        self.fps = self.profile['fps']
+
+        # Encode backend and x264 settings (VIDEO_ENCODER=pipe|moviepy)
+        self.encoder = get_encoder(**encoder_settings(self.profile))
+
+        # Concurrent sentence syntheses (1 = the whole text in one request)
+        self.tts_workers = int(os.getenv('TTS_WORKERS', '1'))
+
+        # Speech backend (TTS_BACKEND=edge|espeak|tone); espeak and tone run offline
+        self.tts_backend = get_backend_name(tts_backend)
+
         # More modern voices
         self.voices = {
             'female': 'en-US-AriaNeural',  # More modern than Indian accent
@@ -52,30 +76,15 @@ class EnhancedVideoCreator:
     async def generate_voice_with_subtitles(self, text, voice_type='female'):
         """Generate voice and subtitle timings"""
         voice = self.voices[voice_type]
-        voice_file = os.path.join(self.project_root, f"temp_voice_{datetime.now().timestamp()}.mp3")
-        
-        # Generate voice
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(voice_file)
-        
-        # Generate subtitle timings (word-level)
-        words = text.split()
-        audio_clip = AudioFileClip(voice_file)
-        duration = audio_clip.duration
-        
-        # Make subtitles appear word by word, not all at once
-        subtitles = []
-        words_per_second = 2.5  # Faster pace for modern videos
-        current_time = 0
-
-        for word in words:
-            word_duration = 1 / words_per_second
-            subtitles.append({
-                'text': word,
-                'start': current_time,
-                'end': current_time + word_duration
-            })
-            current_time += word_duration * 0.8  # Slight overlap for smooth flow
+        
+        # Generate voice; word boundaries arrive in the same stream as the audio
+        speech = await synthesize_speech(text, voice, backend=self.tts_backend, workers=self.tts_workers)
+        handle, voice_file = tempfile.mkstemp(prefix='voice_', suffix=f'.{speech.audio_format}')
+        os.close(handle)
+        speech.save(voice_file)
+        
+        # Subtitles appear word by word, exactly when each word is spoken
+        subtitles = [dict(word) for word in speech.words]
             
         return voice_file, subtitles
     
@@ -104,33 +113,27 @@ class EnhancedVideoCreator:
     
     def create_animated_text(self, text, duration, width, height, style='slide'):
         """Create animated text overlays"""
-        # Create text image
-        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Try to load custom font
-        try:
-            font = ImageFont.truetype("arial.ttf", 60)
-        except:
-            font = ImageFont.load_default()
-        
-        # Calculate text position
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        
-        x = (width - text_width) // 2
-        y = (height - text_height) // 2
-        
-        # Draw text with stroke
-        for dx in range(-2, 3):
-            for dy in range(-2, 3):
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), text, font=font, fill=(0, 0, 0, 255))
-        draw.text((x, y), text, font=font, fill=(255, 255, 255, 255))
-        
-        # Convert to video clip
-        img_array = np.array(img)
+        font = get_font("arial.ttf", 60)
+
+        def render():
+            img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(img)
+
+            # Calculate text position
+            text_bbox = draw.textbbox((0, 0), text, font=font)
+            text_width = text_bbox[2] - text_bbox[0]
+            text_height = text_bbox[3] - text_bbox[1]
+
+            x = (width - text_width) // 2
+            y = (height - text_height) // 2
+
+            # Draw text with stroke (one stroked pass instead of 24 offset passes)
+            draw.text((x, y), text, font=font, fill=(255, 255, 255, 255),
+                      stroke_width=2, stroke_fill=(0, 0, 0, 255))
+            return np.array(img)
+
+        # Rendered once per (text, size) and reused across jobs
+        img_array = cached_overlay(('animated_text', text, "arial.ttf", 60, width, height), render)
         text_clip = ImageClip(img_array, duration=duration)
         
         # Add animation based on style
@@ -150,34 +153,31 @@ class EnhancedVideoCreator:
         """Create modern animated subtitles"""
         subtitle_clips = []
 
-        for i, sub in enumerate(subtitles):
-            # Bigger, bolder text
+        font = get_font("arial.ttf", 80)  # Bigger font
+
+        def render(text, color):
             img = Image.new('RGBA', (width, 250), (0, 0, 0, 0))
             draw = ImageDraw.Draw(img)
 
-            try:
-                font = ImageFont.truetype("arial.ttf", 80)  # Bigger font
-            except:
-                font = ImageFont.load_default()
-
-            text = sub['text'].upper()  # Always uppercase
             bbox = draw.textbbox((0, 0), text, font=font)
             text_width = bbox[2] - bbox[0]
             x = (width - text_width) // 2
 
-            # No background box - just thick outline
-            for offset in range(5):  # Thick black outline
-                for angle in range(0, 360, 30):
-                    dx = offset * np.cos(np.radians(angle))
-                    dy = offset * np.sin(np.radians(angle))
-                    draw.text((x + dx, 100 + dy), text, font=font, fill=(0, 0, 0, 255))
+            # No background box - just thick outline, drawn as one 4px stroke
+            # instead of 60 offset passes
+            draw.text((x, 100), text, font=font, fill=(*color, 255),
+                      stroke_width=4, stroke_fill=(0, 0, 0, 255))
+            return np.array(img)
+
+        for i, sub in enumerate(subtitles):
+            text = sub['text'].upper()  # Always uppercase
 
             # Bright white or yellow text
             color = (255, 255, 0) if i % 2 == 0 else (255, 255, 255)
-            draw.text((x, 100), text, font=font, fill=(*color, 255))
 
             # Create clip with pop animation
-            img_array = np.array(img)
+            img_array = cached_overlay(('subtitle', text, "arial.ttf", 80, color, width),
+                                       lambda: render(text, color))
             subtitle_clip = (ImageClip(img_array, duration=sub['end'] - sub['start'])
                            .set_start(sub['start'])
                            .set_position(('center', height - 350)))
@@ -269,13 +269,14 @@ class EnhancedVideoCreator:
         height = format_spec['height']
         
         # Generate voice and subtitles
-        voice_file, subtitles = await generate_voice_with_subtitles_enhanced(
+        speech, subtitles = await generate_speech_enhanced(
             script_data['voiceover'],
-            voice_type='female'
+            voice_type='female',
+            tts_backend=self.tts_backend
         )
         
-        # Load audio
-        audio = AudioFileClip(voice_file)
+        # Decoded once into memory - no temp voice file
+        audio = speech.audio_clip()
         duration = audio.duration
         
         # Initialize managers
@@ -284,17 +285,89 @@ class EnhancedVideoCreator:
 
         # Get stock footage for the script
         print("Fetching stock footage...")
-        footage_dict = stock_manager.get_footage_for_script(script_data)
+        # Segments use at most 2 seconds per clip, so cold misses only fetch a window
+        footage_dict = stock_manager.get_footage_for_script(script_data, window_seconds=6,
+                                                            quality=self.profile['footage_quality'])
         
+        # Create video segments with stock footage
+        final_video = self.compose_segments(script_data, footage_dict, duration, width, height, effects_manager)
+        
+        # Add audio
+        final_video = final_video.set_audio(audio)
+        
+        # Add TikTok-style animated captions
+        print("Adding TikTok-style animated captions...")
+        caption_clips = effects_manager.create_animated_captions(
+            script_data['voiceover'],
+            duration,
+            style='bold',
+            timings=subtitles
+        )
+
+        # Combine video with captions
+        clips_with_captions = [final_video] + caption_clips
+        final_video = CompositeVideoClip(clips_with_captions)
+        
+        # Add background music
+        music_file = os.path.join(self.music_dir, "background_music_1.mp3")
+        if os.path.exists(music_file):
+            final_video = self.add_background_music(final_video, music_file)
+        
+        # Layouts are in full-size pixels, so drafts are scaled down just before encoding
+        if self.profile['scale'] != 1:
+            final_video = final_video.resize(self.profile['scale'])
+        
+        # Generate output filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = "" if self.profile['name'] == 'full' else f"_{self.profile['name']}"
+        output_path = os.path.join(
+            self.output_dir,
+            f"video_{format_type}{suffix}_{timestamp}.mp4"
+        )
+        
+        # Export video
+        print(f"Rendering {format_type} video...")
+        # Encoder intermediates go to a per-job scratch directory, not the working directory
+        scratch = tempfile.mkdtemp(prefix='enhanced_')
+        try:
+            self.encoder.encode(final_video, output_path, self.fps, scratch_dir=scratch)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        
+        # Generate quality report
+        report = self.create_quality_report(output_path, script_data)
+        print(f"Video saved to: {output_path}")
+        print(f"Quality score: {report['predicted_score']}/10")
+        
+        # Generate thumbnail
+        self.generate_thumbnail(final_video, output_path.replace('.mp4', '_thumb.jpg'))
+        
+        return output_path, report
+
+    def compose_segments(self, script_data, footage_dict, duration, width, height, effects_manager,
+                         with_text=True):
+        """
+        Hook, main point and CTA segments joined with transitions (no captions or audio).
+        Random choices and footage readers come from effects_manager (its rng and readers).
+        with_text=False leaves each segment's text off and returns (clip, texts):
+        texts lists (text, style, duration) per segment for segment_text_clips(),
+        which lays the text out for any frame size.
+        """
+        rng = effects_manager.rng
+        readers = effects_manager.readers
+        components = script_data['script_components']
         # Create video segments with stock footage
         video_segments = []
-        current_time = 0
+        texts = []
+
+        def text_for(text, style):
+            # Text is baked into the segment, or recorded to be laid out per format
+            texts.append((text, style))
+            return text if with_text else None
         
         # Calculate segment durations
         hook_duration = min(3, duration * 0.10)  # 3 seconds max, not 5
         cta_duration = min(3, duration * 0.10)   # 3 seconds max, not 5
-        main_duration = duration - hook_duration - cta_duration
-        points_count = len(script_data['script_components']['main_points'])
         point_duration = 1.5  # Fixed 1.5 seconds per point, not calculated
         
         # 1. HOOK SEGMENT (0-5 seconds) - Using VideoEffectsManager
@@ -309,8 +382,9 @@ class EnhancedVideoCreator:
             # Use first 3 clips for hook sequence
             hook_segment = effects_manager.create_hook_sequence(
                 footage_clips[:3],
-                script_data['script_components']['hook'],
-                hook_duration
+                text_for(components['hook'], 'cinematic'),
+                hook_duration,
+                width, height
             )
         elif footage_dict['hook']:
             # Fallback to single footage segment
@@ -318,48 +392,48 @@ class EnhancedVideoCreator:
                 footage_dict['hook'][0],
                 hook_duration,
                 width, height,
-                text_overlay=script_data['script_components']['hook'],
-                style='dramatic'
+                text_overlay=text_for(components['hook'], 'dramatic'),
+                style='dramatic',
+                rng=rng, readers=readers
             )
         else:
             # Fallback to gradient if no footage
             hook_segment = self.create_text_on_gradient(
-                script_data['script_components']['hook'],
+                text_for(components['hook'], 'fade'),
                 hook_duration, width, height
             )
         video_segments.append(hook_segment)
-        current_time += hook_duration
         
         # 2. MAIN POINTS SEGMENTS
-        main_points = script_data['script_components']['main_points']
-        for i, point in enumerate(main_points):
+        for i, point in enumerate(components['main_points']):
             # Use stock footage if available
             if i < len(footage_dict['main_points']) and footage_dict['main_points'][i]:
                 point_clip = self.create_footage_segment(
                     footage_dict['main_points'][i],
                     point_duration,
                     width, height,
-                    text_overlay=point,
-                    style='informative'
+                    text_overlay=text_for(point, 'informative'),
+                    style='informative',
+                    rng=rng, readers=readers
                 )
             else:
                 # Use background footage or gradient
                 if footage_dict['background']:
-                    bg_video = random.choice(footage_dict['background'])
+                    bg_video = rng.choice(footage_dict['background'])
                     point_clip = self.create_footage_segment(
                         bg_video,
                         point_duration,
                         width, height,
-                        text_overlay=point,
-                        style='informative'
+                        text_overlay=text_for(point, 'informative'),
+                        style='informative',
+                        rng=rng, readers=readers
                     )
                 else:
                     point_clip = self.create_text_on_gradient(
-                        point, point_duration, width, height
+                        text_for(point, 'fade'), point_duration, width, height
                     )
             
             video_segments.append(point_clip)
-            current_time += point_duration
         
         # 3. CTA SEGMENT (last 5 seconds)
         if footage_dict['cta']:
@@ -367,105 +441,85 @@ class EnhancedVideoCreator:
                 footage_dict['cta'][0],
                 cta_duration,
                 width, height,
-                text_overlay=script_data['script_components']['cta'],
-                style='action'
+                text_overlay=text_for(components['cta'], 'action'),
+                style='action',
+                rng=rng, readers=readers
             )
         else:
             cta_clip = self.create_text_on_gradient(
-                script_data['script_components']['cta'],
+                text_for(components['cta'], 'fade'),
                 cta_duration, width, height
             )
         video_segments.append(cta_clip)
         
         # Concatenate all segments with transitions
         print("Combining video segments with transitions...")
-        final_video = self.concatenate_with_transitions(video_segments)
-        
-        # Add audio
-        final_video = final_video.set_audio(audio)
-        
-        # Add TikTok-style animated captions
-        print("Adding TikTok-style animated captions...")
-        caption_clips = effects_manager.create_animated_captions(
-            script_data['voiceover'],
-            duration,
-            style='bold'
-        )
-
-        # Combine video with captions
-        clips_with_captions = [final_video] + caption_clips
-        final_video = CompositeVideoClip(clips_with_captions)
-        
-        # Add background music
-        music_file = os.path.join(self.music_dir, "background_music_1.mp3")
-        if os.path.exists(music_file):
-            final_video = self.add_background_music(final_video, music_file)
-        
-        # Generate output filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = os.path.join(
-            self.output_dir,
-            f"video_{format_type}_{timestamp}.mp4"
-        )
-        
-        # Export video
-        print(f"Rendering {format_type} video...")
-        final_video.write_videofile(
-            output_path,
-            fps=self.fps,
-            codec='libx264',
-            audio_codec='aac',
-            preset='medium',
-            threads=4,
-            logger=None  # Suppress verbose output
-        )
-        
-        # Cleanup
-        os.remove(voice_file)
-        
-        # Generate quality report
-        report = self.create_quality_report(output_path, script_data)
-        print(f"Video saved to: {output_path}")
-        print(f"Quality score: {report['predicted_score']}/10")
-        
-        # Generate thumbnail
-        self.generate_thumbnail(final_video, output_path.replace('.mp4', '_thumb.jpg'))
-        
-        return output_path, report
+        video = self.concatenate_with_transitions(video_segments)
+        if with_text:
+            return video
+        return video, [(text, style, segment.duration)
+                       for (text, style), segment in zip(texts, video_segments)]
+
+    def segment_text_clips(self, texts, width, height, effects_manager, transition_duration=0.5):
+        """
+        Text layers for compose_segments(with_text=False) laid out for a width x
+        height frame, timed and cross-faded like the segments they belong to
+        """
+        clips = []
+        start = 0
+        for i, (text, style, duration) in enumerate(texts):
+            if style == 'cinematic':
+                clip = effects_manager.create_cinematic_text(text, duration, width, height)
+            else:
+                clip = self.create_animated_text(text, duration, width, height, style)
 
-    def create_footage_segment(self, video_path, duration, width, height, text_overlay=None, style='normal'):
-        """Create a video segment from stock footage with effects"""
+            # Same transitions as concatenate_with_transitions
+            if i > 0:
+                clip = clip.crossfadein(transition_duration)
+            if i < len(texts) - 1:
+                clip = clip.crossfadeout(transition_duration)
+            clips.append(clip.set_start(start))
+            start += duration - transition_duration
+        return clips
+
+    def create_footage_segment(self, video_path, duration, width, height, text_overlay=None, style='normal',
+                               rng=None, readers=None):
+        """
+        Create a video segment from stock footage with effects.
+        rng makes the random choices; readers (multi_format.FootageReaders) opens the footage.
+        """
         try:
             # CHANGE: Make clips shorter
             duration = min(duration, 2.0)  # Max 2 seconds per clip instead of 5+
 
             # Load stock video
-            clip = VideoFileClip(video_path)
+            clip = readers.open(video_path) if readers is not None else VideoFileClip(video_path)
             
             # Loop if too short
             if clip.duration < duration:
                 clip = clip.loop(duration=duration)
             else:
-                # Select interesting part (avoid beginning/end)
-                start = min(2, clip.duration * 0.1)  # Start 10% in or 2 seconds
+                # Select interesting part from the footage index, else avoid beginning/end
+                start = FootageIndex.for_clip(video_path).best_window(video_path, duration)
+                if start is None or start + duration > clip.duration:
+                    start = min(2, clip.duration * 0.1)  # Start 10% in or 2 seconds
                 clip = clip.subclip(start, start + duration)
             
-            # Resize to fit format (crop to fill)
-            clip = self.resize_and_crop(clip, width, height)
-            
             # Apply style effects
             if style == 'dramatic':
-                # Add zoom effect for hook with lambda function
-                try:
-                    clip = clip.resize(lambda t: min(1.3, 1 + 0.1 * (t / duration)))
-                except:
-                    pass  # Skip zoom if it fails
+                # Zoom effect for hook: the crop window also fits the format
+                zoom = lambda t: min(1.3, 1 + 0.1 * (t / duration))
+                clip = ZoomWindow(width, height, zoom).apply(clip)
                 # Add vignette
                 clip = self.add_vignette(clip, width, height)
             elif style == 'informative':
-                # Ken Burns effect
-                clip = self.apply_ken_burns(clip, duration)
-            elif style == 'action':
+                # Ken Burns effect, straight from the source to the format size
+                clip = self.apply_ken_burns(clip, duration, width, height, rng=rng)
+            else:
+                # Resize to fit format (crop to fill)
+                clip = self.resize_and_crop(clip, width, height)
+
+            if style == 'action':
                 # Speed ramp for CTA (simplified)
                 try:
                     speed_factor = 1.2  # Fixed speed instead of time-based
@@ -481,7 +535,7 @@ class EnhancedVideoCreator:
                 text_clip = self.create_animated_text(
                     text_overlay, duration, width, height, style
                 )
-                clip = CompositeVideoClip([clip, text_clip])
+                clip = compose_layers([clip, text_clip], fps=self.fps)
             
             return clip
             
@@ -519,60 +573,40 @@ class EnhancedVideoCreator:
 
         return clip
 
-    def apply_ken_burns(self, clip, duration):
-        """Apply Ken Burns effect (pan and zoom)"""
+    def apply_ken_burns(self, clip, duration, width=None, height=None, rng=None):
+        """Apply Ken Burns effect (pan and zoom) as a crop window of constant output size"""
         # Random zoom direction
-        zoom_in = random.choice([True, False])
+        zoom_in = (rng or random).choice([True, False])
         
         if zoom_in:
-            # Start wide, zoom in with lambda
-            try:
-                clip = clip.resize(lambda t: min(1.3, 1 + 0.1 * (t / duration)))
-            except:
-                pass  # Skip if it fails
+            # Start wide, zoom in
+            zoom = lambda t: min(1.3, 1 + 0.1 * (t / duration))
         else:
-            # Start close, zoom out with lambda
-            try:
-                clip = clip.resize(lambda t: max(0.8, 1.3 - 0.1 * (t / duration)))
-            except:
-                pass  # Skip if it fails
+            # Start close, zoom out
+            zoom = lambda t: max(0.8, 1.3 - 0.1 * (t / duration))
         
-        return clip
+        return ZoomWindow(width or clip.w, height or clip.h, zoom).apply(clip)
 
     def add_vignette(self, clip, width, height):
         """Add vignette effect"""
-        from PIL import Image, ImageDraw
-        import numpy as np
-        
-        # Create vignette mask
-        vignette = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(vignette)
-        
-        # Draw radial gradient
-        for i in range(min(width, height) // 2):
-            alpha = int(255 * (i / (min(width, height) / 2)) ** 2)
-            draw.ellipse(
-                [i, i, width - i, height - i],
-                fill=(0, 0, 0, alpha)
-            )
-        
-        vignette_clip = ImageClip(np.array(vignette), duration=clip.duration)
-        
-        return CompositeVideoClip([clip, vignette_clip])
+        # Elliptical falloff following the format's aspect ratio, one multiply per frame
+        return Vignette(strength=0.7, shape='ellipse').apply(clip)
 
     def apply_color_grading(self, clip, style):
         """Apply color grading based on style"""
+        grade = ColorGrade()
         if style == 'dramatic':
             # Increase contrast, slight blue tint
-            clip = clip.fx(vfx.colorx, 1.2)  # Increase contrast
+            grade = grade.colorx(1.2)  # Increase contrast
         elif style == 'informative':
             # Bright and clear
-            clip = clip.fx(vfx.gamma_corr, 1.1)  # Slightly brighter
+            grade = grade.gamma(1.1)  # Slightly brighter
         elif style == 'action':
             # High contrast, saturated
-            clip = clip.fx(vfx.colorx, 1.3)
+            grade = grade.colorx(1.3)
         
-        return clip
+        # Applied as a single cv2.LUT per frame
+        return grade.apply(clip)
 
     def concatenate_with_transitions(self, clips, transition_duration=0.5):
         """Concatenate clips with smooth transitions"""
@@ -595,22 +629,17 @@ class EnhancedVideoCreator:
         """Create modern animated subtitles"""
         subtitle_clips = []
         
-        for i, sub in enumerate(subtitles):
-            # Create modern subtitle style
+        # Use bold font for better visibility
+        font = get_font("arialbd.ttf", 48)
+
+        def render(text):
             img = Image.new('RGBA', (width, 120), (0, 0, 0, 0))
             draw = ImageDraw.Draw(img)
-            
-            try:
-                # Use bold font for better visibility
-                font = ImageFont.truetype("arialbd.ttf", 48)
-            except:
-                font = ImageFont.load_default()
-            
-            text = sub['text'].upper()  # Uppercase for impact
+
             bbox = draw.textbbox((0, 0), text, font=font)
             text_width = bbox[2] - bbox[0]
             x = (width - text_width) // 2
-            
+
             # Draw background pill
             padding = 20
             draw.rounded_rectangle(
@@ -618,15 +647,21 @@ class EnhancedVideoCreator:
                 radius=30,
                 fill=(0, 0, 0, 200)
             )
-            
+
             # Draw text with glow effect
             for offset in range(3, 0, -1):
-                draw.text((x, 30), text, font=font, 
+                draw.text((x, 30), text, font=font,
                          fill=(255, 255, 0, 100 // offset))  # Yellow glow
             draw.text((x, 30), text, font=font, fill=(255, 255, 255, 255))
-            
+            return np.array(img)
+
+        for i, sub in enumerate(subtitles):
+            text = sub['text'].upper()  # Uppercase for impact
+            img_array = cached_overlay(('subtitle_pill', text, "arialbd.ttf", 48, width),
+                                       lambda: render(text))
+
             # Create clip with animation
-            subtitle_clip = (ImageClip(np.array(img), duration=sub['end'] - sub['start'])
+            subtitle_clip = (ImageClip(img_array, duration=sub['end'] - sub['start'])
                             .set_start(sub['start'])
                             .set_position(('center', height - 200)))
             
@@ -641,7 +676,7 @@ class EnhancedVideoCreator:
         return subtitle_clips
 
     def create_text_on_gradient(self, text, duration, width, height):
-        """Fallback: Create text on gradient background"""
+        """Fallback: Create text on gradient background (text=None for the background alone)"""
         # Use existing gradient creation
         background = ColorClip(
             size=(width, height),
@@ -654,24 +689,19 @@ class EnhancedVideoCreator:
             self.create_gradient_image(width, height),
             duration=duration
         ).set_opacity(0.8)
+        if text is None:
+            return compose_layers([background, gradient], fps=self.fps)
         
         # Add text
         text_clip = self.create_animated_text(
             text, duration, width, height, style='fade'
         ).set_position(('center', 'center'))
         
-        return CompositeVideoClip([background, gradient, text_clip])
+        return compose_layers([background, gradient, text_clip], fps=self.fps)
 
     def create_gradient_image(self, width, height):
         """Creates a gradient image."""
-        img = Image.new('RGB', (width, height))
-        draw = ImageDraw.Draw(img)
-        for i in range(height):
-            r = int(20 + 30 * i / height)
-            g = int(20 + 30 * i / height)
-            b = int(30 + 40 * i / height)
-            draw.line([(0, i), (width, i)], fill=(r, g, b))
-        return np.array(img)
+        return GradientBackground(width, height, top=(20, 20, 30), bottom=(50, 50, 70)).frame()
 
     
     def generate_thumbnail(self, video_clip, output_path):
@@ -686,16 +716,99 @@ class EnhancedVideoCreator:
         img.save(output_path, quality=95)
         print(f"Thumbnail saved: {output_path}")
     
-    async def create_all_formats(self, script_data):
-        """Create video in reels format only"""
-        results = {}
-
-        # Only create Reels/Shorts format (9:16)
-        reels_path, reels_report = await self.create_video(script_data, 'reels')
-        results['reels'] = {'path': reels_path, 'report': reels_report}
+    async def create_formats(self, script_data, format_types=None):
+        """
+        Create several formats from one master render: TTS, footage, decoding,
+        grading and transitions happen once, without text, on a canvas that
+        contains every format. Each format is a crop/scale branch of that
+        master with its own text overlays and captions laid out at its own
+        size, and all branches are encoded in the same pass.
+        """
+        format_types = list(format_types or self.formats)
+        sizes = [(self.formats[f]['width'], self.formats[f]['height']) for f in format_types]
+        master_width, master_height = master_canvas(sizes)
+        print(f"Creating {', '.join(format_types)} videos from a {master_width}x{master_height} master...")
+        
+        # Generate voice and subtitles (once for all formats)
+        speech, subtitles = await generate_speech_enhanced(
+            script_data['voiceover'],
+            voice_type='female',
+            tts_backend=self.tts_backend
+        )
+        
+        audio = speech.audio_clip()
+        duration = audio.duration
+        
+        stock_manager = StockFootageManager(self.pexels_key)
 
+        print("Fetching stock footage...")
+        footage_dict = stock_manager.get_footage_for_script(script_data, window_seconds=6,
+                                                            quality=self.profile['footage_quality'])
+        
+        readers = FootageReaders()
+        effects_manager = VideoEffectsManager(readers=readers)
+        try:
+            # Master composition - the shared decode and compose; text is laid out per format
+            master, texts = self.compose_segments(script_data, footage_dict, duration,
+                                                  master_width, master_height, effects_manager,
+                                                  with_text=False)
+            master = master.set_audio(audio)
+            music_file = os.path.join(self.music_dir, "background_music_1.mp3")
+            master = self.add_background_music(master, music_file)
+            shared = SharedFrames(master)
+            
+            # Per-format branches: crop/scale of the master plus the format's own text and captions
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            suffix = "" if self.profile['name'] == 'full' else f"_{self.profile['name']}"
+            outputs = []
+            for format_type, (width, height) in zip(format_types, sizes):
+                branch = format_branch(shared, width, height)
+                text_clips = self.segment_text_clips(texts, width, height, effects_manager)
+                caption_clips = effects_manager.create_animated_captions(
+                    script_data['voiceover'],
+                    duration,
+                    style='bold',
+                    width=width,
+                    height=height,
+                    timings=subtitles
+                )
+                final_video = CompositeVideoClip([branch] + text_clips + caption_clips,
+                                                 size=(width, height)).set_audio(master.audio)
+                
+                # Layouts are in full-size pixels, so drafts are scaled down just before encoding
+                if self.profile['scale'] != 1:
+                    final_video = final_video.resize(self.profile['scale'])
+                
+                output_path = os.path.join(
+                    self.output_dir,
+                    f"video_{format_type}{suffix}_{timestamp}.mp4"
+                )
+                outputs.append((final_video, output_path))
+            
+            # One pass over the timeline feeds every format's encoder
+            print(f"Rendering {len(outputs)} formats in one pass...")
+            scratch = tempfile.mkdtemp(prefix='enhanced_')
+            try:
+                self.encoder.encode_many(outputs, self.fps, scratch_dir=scratch)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+            
+            results = {}
+            for format_type, (final_video, output_path) in zip(format_types, outputs):
+                report = self.create_quality_report(output_path, script_data)
+                self.generate_thumbnail(final_video, output_path.replace('.mp4', '_thumb.jpg'))
+                results[format_type] = {'path': output_path, 'report': report}
+                print(f"Video saved to: {output_path}")
+        finally:
+            # Footage readers are closed even when a format fails
+            readers.close()
+        
         return results
 
+    async def create_all_formats(self, script_data):
+        """Create reels, square and youtube videos from one master render"""
+        return await self.create_formats(script_data)
+
 # Test function
 async def test_enhanced_creator():
     """Test with sample script data"""
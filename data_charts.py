@@ -0,0 +1,173 @@
+# File: C:\New Project\viral-ai-content\data_charts.py
+"""
+Animated Data Charts for Viral AI Content
+Charts are split into layers rendered once (background, labels) and cheap
+per-frame parts (threshold-revealed masks, cached numerals)
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+from PIL import Image, ImageDraw
+from moviepy.editor import VideoClip
+
+from text_renderer import get_font
+
+
+class AnimatedChart(ABC):
+    """Base class: static layer (background and labels, rendered once) + per-frame dynamic parts"""
+
+    def __init__(self, width, height, animate_seconds=1.5, background=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.animate_seconds = animate_seconds
+        self.base = np.zeros((height, width, 3), dtype=np.uint8)
+        self.base[:] = background
+
+        # Pixels covered by static text - dynamic parts leave them alone, so
+        # labels stay on top without being redrawn every frame
+        self.text_cover = np.zeros((height, width), dtype=bool)
+        # Rendered numerals, one patch per distinct value
+        self.numeral_cache = {}
+
+    def load_font(self, size, name="arial.ttf"):
+        """TrueType font from the process-wide registry"""
+        return get_font(name, size)
+
+    def text_patch(self, text, font, fill):
+        """Render text once into an (RGB, alpha) patch plus its ink offset"""
+        left, top, right, bottom = font.getbbox(text)
+        mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+
+        alpha = (np.asarray(mask, dtype=np.float32) / 255.0)[:, :, None]
+        color = np.array(fill, dtype=np.float32)
+        return {'alpha': alpha, 'color': color, 'offset': (left, top), 'width': right - left}
+
+    def centered_x(self, patch, center_x):
+        """x to pass to draw.text so the text is centred (same maths as textbbox centring)"""
+        return center_x - patch['width'] // 2
+
+    def blend_patch(self, frame, patch, x, y):
+        """Alpha-blend a text patch onto the frame inside its bounding box only"""
+        x += patch['offset'][0]
+        y += patch['offset'][1]
+        alpha = patch['alpha']
+        h, w = alpha.shape[:2]
+
+        fx0, fy0 = max(0, x), max(0, y)
+        fx1, fy1 = min(frame.shape[1], x + w), min(frame.shape[0], y + h)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+
+        a = alpha[fy0 - y:fy1 - y, fx0 - x:fx1 - x]
+        region = frame[fy0:fy1, fx0:fx1]
+        region[:] = region * (1 - a) + patch['color'] * a
+
+    def add_text(self, text, font, fill, center_x, y):
+        """Draw centred text onto the base layer and mark the pixels it covers"""
+        patch = self.text_patch(text, font, fill)
+        x = self.centered_x(patch, center_x)
+        self.blend_patch(self.base, patch, x, y)
+
+        cover = np.zeros((self.height, self.width, 1), dtype=np.float32)
+        self.blend_patch(cover, dict(patch, color=np.ones(1, dtype=np.float32)), x, y)
+        self.text_cover |= cover[:, :, 0] > 0
+
+    def numeral(self, value, font, fill):
+        """Cached patch for a count-up value"""
+        key = (value, id(font), fill)
+        if key not in self.numeral_cache:
+            self.numeral_cache[key] = self.text_patch(f"{value:,}", font, fill)
+        return self.numeral_cache[key]
+
+    def progress(self, t):
+        return min(1, t / self.animate_seconds)
+
+    @abstractmethod
+    def draw_dynamic(self, frame, t):
+        """Per-frame parts, drawn onto a copy of the base layer"""
+
+    def make_frame(self, t):
+        frame = self.base.copy()
+        self.draw_dynamic(frame, t)
+        return frame
+
+    def clip(self, duration):
+        return VideoClip(self.make_frame, duration=duration)
+
+
+class ProgressRingChart(AnimatedChart):
+    """Circular progress arc with a count-up value in the middle"""
+
+    def __init__(self, width, height, title, value, unit, radius=200, thickness=20,
+                 color=(0, 200, 255), track_color=(50, 50, 50), animate_seconds=1.5):
+        super().__init__(width, height, animate_seconds)
+        self.value = value
+        self.color = np.array(color, dtype=np.uint8)
+
+        self.center_x, self.center_y = width // 2, 300
+        self.value_font = self.load_font(120)
+        label_font = self.load_font(48)
+
+        # Background ring is static
+        img = Image.fromarray(self.base)
+        ImageDraw.Draw(img).ellipse(
+            [self.center_x - radius, self.center_y - radius,
+             self.center_x + radius, self.center_y + radius],
+            outline=track_color, width=thickness
+        )
+        self.base = np.array(img)
+
+        # Unit and title are static; where they touch the arc they stay on top (text_cover)
+        self.add_text(unit, label_font, (150, 150, 150), self.center_x, self.center_y + 40)
+        self.add_text(title, label_font, (255, 255, 255), self.center_x, 50)
+
+        self.build_arc_mask(radius, thickness // 2)
+
+    def build_arc_mask(self, radius, half_width):
+        """
+        Precompute the arc band and each band pixel's angle (0 at the top,
+        clockwise). Revealing the arc is then a threshold on the angle map.
+        """
+        outer = radius + half_width
+        self.box = (self.center_x - outer, self.center_y - outer,
+                    self.center_x + outer + 1, self.center_y + outer + 1)
+        x0, y0, x1, y1 = self.box
+
+        y, x = np.mgrid[y0:y1, x0:x1]
+        dx = (x - self.center_x).astype(np.float32)
+        dy = (y - self.center_y).astype(np.float32)
+        distance = np.sqrt(dx ** 2 + dy ** 2)
+
+        self.band = (np.abs(distance - radius) <= half_width) & ~self.text_cover[y0:y1, x0:x1]
+        self.angle = (np.degrees(np.arctan2(dy, dx)) + 90) % 360
+        self.radius = radius
+
+        # Round cap at the moving end of the arc
+        size = 2 * half_width + 1
+        cy, cx = np.mgrid[0:size, 0:size]
+        self.cap = (cx - half_width) ** 2 + (cy - half_width) ** 2 <= half_width ** 2
+        self.cap_half = half_width
+
+    def draw_cap(self, frame, angle):
+        x = int(round(self.center_x + self.radius * np.cos(np.radians(angle - 90)))) - self.cap_half
+        y = int(round(self.center_y + self.radius * np.sin(np.radians(angle - 90)))) - self.cap_half
+        size = self.cap.shape[0]
+        frame[y:y + size, x:x + size][self.cap & ~self.text_cover[y:y + size, x:x + size]] = self.color
+
+    def draw_dynamic(self, frame, t):
+        progress = self.progress(t)
+        degrees = int(360 * progress)
+
+        if degrees > 0:
+            x0, y0, x1, y1 = self.box
+            visible = self.band & (self.angle <= degrees - 1)
+            frame[y0:y1, x0:x1][visible] = self.color
+            self.draw_cap(frame, 0)
+            self.draw_cap(frame, degrees - 1)
+
+        # Count-up value, rasterized once per distinct number
+        current_value = int(self.value * progress)
+        patch = self.numeral(current_value, self.value_font, (255, 255, 255))
+        self.blend_patch(frame, patch, self.centered_x(patch, self.center_x), self.center_y - 60)
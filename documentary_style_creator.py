@@ -8,20 +8,41 @@ Slow, cinematic, information-focused content
 import json
 from moviepy.editor import *
 from moviepy.video.fx.all import *
-import edge_tts
 import asyncio
 import os
 import random
+import shutil
+import tempfile
 from datetime import datetime
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+import cv2
+from PIL import Image, ImageDraw, ImageFilter
 import colorsys
+from footage_index import FootageIndex
+from procedural_layers import GradientBackground, ParticleField, FilmGrain, Vignette
+from data_charts import ProgressRingChart
+from text_renderer import get_font, cached_overlay
+from composition import compose_layers
+from camera_moves import ZoomWindow
+from color_grading import ColorGrade
+from parallel_render import render_parallel
+from filtergraph_render import FilterGraphRenderer
+from video_encoder import get_encoder
+from render_profiles import get_profile, encoder_settings
+from parallel_speech import synthesize_speech
+from speech_synthesis import get_backend_name
 
 class DocumentaryStyleCreator:
-    def __init__(self):
-        self.width = 1080
-        self.height = 1920
-        self.fps = 30
+    def __init__(self, profile=None, tts_backend=None):
+        # Render profile (RENDER_PROFILE=full|draft); layouts are designed at
+        # 1080x1920 and scaled to the profile's output size
+        self.profile = get_profile(profile)
+        self.scale = self.profile['scale']
+        self.layout_width = 1080
+        self.layout_height = 1920
+        self.width = self.px(self.layout_width)
+        self.height = self.px(self.layout_height)
+        self.fps = self.profile['fps']
         
         # Documentary style voices (authoritative, professional)
         self.voices = {
@@ -73,6 +94,36 @@ class DocumentaryStyleCreator:
         # Load Pexels API
         self.pexels_key = os.getenv('PEXELS_API_KEY', '')
 
+        # Precomputed particle fields, keyed by (width, height, density, opacity)
+        self.particle_fields = {}
+
+        # Processes used to render a video (1 = single encode pass)
+        self.render_workers = int(os.getenv('RENDER_WORKERS', '1'))
+
+        # Concurrent sentence syntheses for the voiceover (1 = one request)
+        self.tts_workers = int(os.getenv('TTS_WORKERS', '1'))
+
+        # Speech backend (TTS_BACKEND=edge|espeak|tone); espeak and tone run offline
+        self.tts_backend = get_backend_name(tts_backend)
+
+        # Render engine: 'moviepy' composites frames in Python, 'ffmpeg' compiles
+        # the segment plan into one filtergraph (RENDER_ENGINE=moviepy|ffmpeg)
+        self.render_engine = os.getenv('RENDER_ENGINE', 'moviepy')
+
+        # Encode backend and x264 settings (VIDEO_ENCODER=pipe|moviepy)
+        self.encoder = get_encoder(**encoder_settings(self.profile))
+
+    def px(self, value):
+        """Layout pixels (1080x1920 design) -> output pixels for this profile"""
+        return int(round(value * self.scale))
+
+    def fit(self, image):
+        """Downscale a graphic rasterized at layout size to the output size"""
+        if self.scale == 1:
+            return image
+        height, width = image.shape[:2]
+        return cv2.resize(image, (self.px(width), self.px(height)), interpolation=cv2.INTER_AREA)
+
     def get_style_variation(self):
         """Rotate through different visual styles for content variety"""
         styles = [
@@ -91,16 +142,19 @@ class DocumentaryStyleCreator:
         style = self.style_variations[style_name]
 
         try:
+            # Colour steps are collected and applied as one LUT pass
+            grade = ColorGrade()
+
             # Apply color temperature adjustments
             if style['color_temp'] == 'cool':
                 # Blue tint for tech/modern feel
-                clip = clip.fx(vfx.colorx, 1.1).fx(vfx.gamma_corr, 0.9)
+                grade = grade.colorx(1.1).gamma(0.9)
             elif style['color_temp'] == 'warm':
                 # Warm orange/yellow tint for human interest
-                clip = clip.fx(vfx.gamma_corr, 1.1)
+                grade = grade.gamma(1.1)
             elif style['color_temp'] == 'bright':
                 # Increased brightness and saturation
-                clip = clip.fx(vfx.colorx, 1.3).fx(vfx.gamma_corr, 1.2)
+                grade = grade.colorx(1.3).gamma(1.2)
 
             # Apply specific effects
             for effect in style.get('effects', []):
@@ -109,19 +163,21 @@ class DocumentaryStyleCreator:
                     pass  # Would need additional libraries
                 elif effect == 'glow':
                     # Enhance highlights
-                    clip = clip.fx(vfx.colorx, 1.1)
+                    grade = grade.colorx(1.1)
                 elif effect == 'vignette':
                     # Dark vignette for serious mood
                     pass  # Could implement custom vignette
                 elif effect == 'contrast':
                     # Increase contrast for dramatic effect
-                    clip = clip.fx(vfx.colorx, 1.4)
+                    grade = grade.colorx(1.4)
                 elif effect == 'brightness':
                     # Increase overall brightness
-                    clip = clip.fx(vfx.gamma_corr, 1.3)
+                    grade = grade.gamma(1.3)
                 elif effect == 'saturation':
                     # Boost color saturation
-                    clip = clip.fx(vfx.colorx, 1.2)
+                    grade = grade.colorx(1.2)
+
+            clip = grade.apply(clip)
 
         except Exception as e:
             print(f"Error applying style variation {style_name}: {e}")
@@ -163,31 +219,24 @@ class DocumentaryStyleCreator:
     def create_cinematic_opening(self, title, duration=5):
         """Create a cinematic title sequence"""
         
-        # Create gradient background
-        def make_frame(t):
-            # Animated gradient
-            img = Image.new('RGB', (self.width, self.height))
-            draw = ImageDraw.Draw(img)
-            
-            # Animate colors
-            phase = t / duration
-            color1 = (int(20 + 30 * np.sin(phase)), 20, int(30 + 20 * np.sin(phase)))
-            color2 = (10, int(10 + 20 * np.sin(phase)), 50)
-            
-            # Draw gradient
-            for y in range(self.height):
-                ratio = y / self.height
-                r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-                g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-                b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-                draw.rectangle([(0, y), (self.width, y + 1)], fill=(r, g, b))
-            
-            return np.array(img)
-        
-        background = VideoClip(make_frame, duration=duration)
+        def gradient_frame(t):
+            # Animated gradient; the end colours are whole numbers, so columns repeat across frames
+            s = np.sin(t / duration)
+            top = (int(20 + 30 * s), 20, int(30 + 20 * s))
+            bottom = (10, int(10 + 20 * s), 50)
+            return GradientBackground(self.width, self.height, top, bottom).frame()
+
+        background = VideoClip(gradient_frame, duration=duration)
+
+        # Add subtle particle effect (gradient frames are fresh arrays, stamp in place)
+        background = self.add_particle_overlay(background, opacity=1.0, copy=False)
+
+        # The particles used to be a black frame at 50% opacity over the gradient:
+        # (gradient + particles) / 2, truncated like moviepy's blend
+        background = background.fl_image(lambda frame: frame >> 1)
         
         # Add cinematic bars (letterbox effect)
-        bar_height = 200
+        bar_height = self.px(200)
         top_bar = ColorClip(size=(self.width, bar_height), color=(0, 0, 0), duration=duration)
         bottom_bar = ColorClip(size=(self.width, bar_height), color=(0, 0, 0), duration=duration)
         top_bar = top_bar.set_position(('center', 0))
@@ -200,243 +249,185 @@ class DocumentaryStyleCreator:
                      .fadein(1.5)
                      .fadeout(0.5))
         
-        # Add subtle particle effect
-        particles = self.create_particle_overlay(duration)
-        
         # Combine all elements
-        opening = CompositeVideoClip([background, particles, top_bar, bottom_bar, title_clip])
+        opening = compose_layers([background, top_bar, bottom_bar, title_clip], fps=self.fps)
         
         return opening
     
     def create_cinematic_title(self, title):
         """Create professional title graphic"""
-        img = Image.new('RGB', (self.width, 400), (0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        # Main title font
+        title_font = get_font("arial.ttf", 72)
+        subtitle_font = get_font("arial.ttf", 36)
 
-        try:
-            # Main title font
-            title_font = ImageFont.truetype("arial.ttf", 72)
-            subtitle_font = ImageFont.truetype("arial.ttf", 36)
-        except:
-            title_font = ImageFont.load_default()
-            subtitle_font = title_font
-
-        # Split title if too long
-        words = title.upper().split()
-        if len(words) > 4:
-            line1 = ' '.join(words[:len(words)//2])
-            line2 = ' '.join(words[len(words)//2:])
-        else:
-            line1 = title.upper()
-            line2 = ""
-
-        # Draw main title
-        bbox1 = draw.textbbox((0, 0), line1, font=title_font)
-        x1 = (self.width - (bbox1[2] - bbox1[0])) // 2
-
-        # Glow effect
-        for offset in range(10, 0, -2):
-            alpha_color = (int(100 * (1 - offset/10)), int(200 * (1 - offset/10)), int(255 * (1 - offset/10)))
-            draw.text((x1, 150), line1, font=title_font,
-                     fill=alpha_color, stroke_width=offset)
-
-        # Main text
-        draw.text((x1, 150), line1, font=title_font, fill=(255, 255, 255))
-
-        # Second line if exists
-        if line2:
-            bbox2 = draw.textbbox((0, 0), line2, font=title_font)
-            x2 = (self.width - (bbox2[2] - bbox2[0])) // 2
-            draw.text((x2, 230), line2, font=title_font, fill=(255, 255, 255))
-
-        # Add subtle tagline
-        tagline = "DOCUMENTARY"
-        bbox3 = draw.textbbox((0, 0), tagline, font=subtitle_font)
-        x3 = (self.width - (bbox3[2] - bbox3[0])) // 2
-        draw.text((x3, 320), tagline, font=subtitle_font, fill=(150, 150, 150))
-
-        return np.array(img)
-    
-    def create_particle_overlay(self, duration, density=50):
-        """Create floating particle effect for atmosphere"""
-        def make_frame(t):
-            img = Image.new('RGB', (self.width, self.height), (0, 0, 0))
+        def render():
+            img = Image.new('RGB', (self.layout_width, 400), (0, 0, 0))
             draw = ImageDraw.Draw(img)
 
-            # Draw floating particles
-            random.seed(42)  # Consistent particles
-            for i in range(density):
-                x = random.randint(0, self.width)
-                base_y = random.randint(0, self.height)
-                # Float upward
-                y = (base_y - t * 50) % self.height
-                size = random.randint(1, 3)
-                alpha_val = random.randint(30, 100)
-                color_intensity = int(255 * alpha_val / 255)
+            # Split title if too long
+            words = title.upper().split()
+            if len(words) > 4:
+                line1 = ' '.join(words[:len(words)//2])
+                line2 = ' '.join(words[len(words)//2:])
+            else:
+                line1 = title.upper()
+                line2 = ""
+
+            # Draw main title
+            bbox1 = draw.textbbox((0, 0), line1, font=title_font)
+            x1 = (self.layout_width - (bbox1[2] - bbox1[0])) // 2
+
+            # Glow effect
+            for offset in range(10, 0, -2):
+                alpha_color = (int(100 * (1 - offset/10)), int(200 * (1 - offset/10)), int(255 * (1 - offset/10)))
+                draw.text((x1, 150), line1, font=title_font,
+                         fill=alpha_color, stroke_width=offset)
+
+            # Main text
+            draw.text((x1, 150), line1, font=title_font, fill=(255, 255, 255))
+
+            # Second line if exists
+            if line2:
+                bbox2 = draw.textbbox((0, 0), line2, font=title_font)
+                x2 = (self.layout_width - (bbox2[2] - bbox2[0])) // 2
+                draw.text((x2, 230), line2, font=title_font, fill=(255, 255, 255))
+
+            # Add subtle tagline
+            tagline = "DOCUMENTARY"
+            bbox3 = draw.textbbox((0, 0), tagline, font=subtitle_font)
+            x3 = (self.layout_width - (bbox3[2] - bbox3[0])) // 2
+            draw.text((x3, 320), tagline, font=subtitle_font, fill=(150, 150, 150))
+
+            return self.fit(np.array(img))
+
+        # The glow takes five stroked passes, so render each title only once
+        return cached_overlay(('cinematic_title', title, "arial.ttf", 72, 36, self.layout_width, self.scale),
+                              render)
+    
+    def add_particle_overlay(self, clip, density=50, opacity=0.5, copy=True):
+        """Add floating particle effect for atmosphere"""
+        if not self.profile['particles']:
+            return clip
+
+        key = (clip.w, clip.h, density, opacity)
+        if key not in self.particle_fields:
+            # Positions/sizes are fixed (seeded), so one field serves every job
+            self.particle_fields[key] = ParticleField(clip.w, clip.h, density=density, opacity=opacity)
 
-                draw.ellipse([x-size, y-size, x+size, y+size],
-                           fill=(color_intensity, color_intensity, color_intensity))
+        return self.particle_fields[key].apply(clip, copy=copy)
+    
+    def create_particle_overlay(self, duration, density=50):
+        """Create floating particle effect for atmosphere (a clip to composite on top)"""
+        key = (self.width, self.height, density, 1.0)
+        if key not in self.particle_fields:
+            self.particle_fields[key] = ParticleField(self.width, self.height, density=density, opacity=1.0)
+        field = self.particle_fields[key]
 
-            return np.array(img)
+        def make_frame(t):
+            return field.stamp(np.zeros((self.height, self.width, 3), dtype=np.uint8), t)
 
         return VideoClip(make_frame, duration=duration).set_opacity(0.5)
     
     def create_information_card(self, title, points, duration=5):
         """Create clean information display card"""
+        # Convert to clip
+        card_clip = ImageClip(self.information_card_image(title, points), duration=duration)
 
-        # Create background with subtle gradient
-        img = Image.new('RGB', (self.width, self.height), (15, 15, 25))
-        draw = ImageDraw.Draw(img)
+        # Add subtle zoom (crop window, so every frame stays card-sized)
+        card_clip = ZoomWindow(self.width, self.height, lambda t: 1 + 0.05 * (t / duration)).apply(card_clip)
 
-        # Add gradient overlay
-        for y in range(self.height):
-            gradient_ratio = (1 - y / self.height) * 0.3
-            overlay_color = (int(gradient_ratio * 50), int(gradient_ratio * 100), int(gradient_ratio * 150))
-            draw.rectangle([(0, y), (self.width, y + 1)], fill=overlay_color)
+        return card_clip
 
-        try:
-            title_font = ImageFont.truetype("arial.ttf", 64)
-            point_font = ImageFont.truetype("arial.ttf", 42)
-        except:
-            title_font = ImageFont.load_default()
-            point_font = title_font
+    def information_card_image(self, title, points):
+        """Full-frame card graphic, rendered once per (title, points)"""
+        title_font = get_font("arial.ttf", 64)
+        point_font = get_font("arial.ttf", 42)
 
-        # Draw title
-        title_bbox = draw.textbbox((0, 0), title.upper(), font=title_font)
-        title_x = (self.width - (title_bbox[2] - title_bbox[0])) // 2
+        def render():
+            # Create background with subtle gradient (blue-ish at the top fading to black)
+            gradient = GradientBackground(self.layout_width, self.layout_height,
+                                          top=(15, 30, 45), bottom=(0, 0, 0))
+            img = Image.fromarray(gradient.frame())
+            draw = ImageDraw.Draw(img)
 
-        # Title background
-        draw.rectangle([50, 200, self.width - 50, 300], fill=(0, 100, 200))
-        draw.text((title_x, 220), title.upper(), font=title_font, fill=(255, 255, 255))
+            # Draw title
+            title_bbox = draw.textbbox((0, 0), title.upper(), font=title_font)
+            title_x = (self.layout_width - (title_bbox[2] - title_bbox[0])) // 2
 
-        # Draw points with animation markers
-        y_offset = 400
-        for i, point in enumerate(points[:3]):  # Max 3 points
-            # Point background
-            draw.rectangle([100, y_offset, self.width - 100, y_offset + 80], fill=(50, 50, 50))
+            # Title background
+            draw.rectangle([50, 200, self.layout_width - 50, 300], fill=(0, 100, 200))
+            draw.text((title_x, 220), title.upper(), font=title_font, fill=(255, 255, 255))
 
-            # Point number
-            draw.ellipse([120, y_offset + 15, 170, y_offset + 65], fill=(0, 200, 255))
-            draw.text((135, y_offset + 20), str(i + 1), font=point_font, fill=(255, 255, 255))
+            # Draw points with animation markers
+            y_offset = 400
+            for i, point in enumerate(points[:3]):  # Max 3 points
+                # Point background
+                draw.rectangle([100, y_offset, self.layout_width - 100, y_offset + 80], fill=(50, 50, 50))
 
-            # Point text
-            draw.text((200, y_offset + 20), point, font=point_font, fill=(255, 255, 255))
+                # Point number
+                draw.ellipse([120, y_offset + 15, 170, y_offset + 65], fill=(0, 200, 255))
+                draw.text((135, y_offset + 20), str(i + 1), font=point_font, fill=(255, 255, 255))
 
-            y_offset += 120
+                # Point text
+                draw.text((200, y_offset + 20), point, font=point_font, fill=(255, 255, 255))
 
-        # Convert to clip
-        card_clip = ImageClip(np.array(img), duration=duration)
+                y_offset += 120
 
-        # Add subtle zoom
-        card_clip = card_clip.resize(lambda t: 1 + 0.05 * (t / duration))
+            return self.fit(np.array(img))
 
-        return card_clip
+        return cached_overlay(('information_card', title, tuple(points[:3]), "arial.ttf", 64, 42,
+                               self.layout_width, self.layout_height, self.scale), render)
     
     def create_data_visualization(self, data_title, value, unit, duration=3):
-        """Create animated data visualization"""
-
-        def make_frame(t):
-            img = Image.new('RGB', (self.width, 600), (0, 0, 0))
-            draw = ImageDraw.Draw(img)
-
-            # Animated value
-            current_value = int(value * min(1, t / 1.5))  # Animate over 1.5 seconds
-
-            try:
-                value_font = ImageFont.truetype("arial.ttf", 120)
-                label_font = ImageFont.truetype("arial.ttf", 48)
-            except:
-                value_font = ImageFont.load_default()
-                label_font = value_font
-
-            # Draw circular progress
-            center_x, center_y = self.width // 2, 300
-            radius = 200
-
-            # Background circle
-            draw.ellipse([center_x - radius, center_y - radius,
-                         center_x + radius, center_y + radius],
-                        outline=(50, 50, 50), width=20)
-
-            # Progress arc
-            progress = min(1, t / 1.5)
-            if progress > 0:
-                # Draw arc (simplified - you'd use more complex method in production)
-                for angle in range(int(360 * progress)):
-                    x = center_x + radius * np.cos(np.radians(angle - 90))
-                    y = center_y + radius * np.sin(np.radians(angle - 90))
-                    draw.ellipse([x-10, y-10, x+10, y+10], fill=(0, 200, 255))
-
-            # Draw value
-            value_text = f"{current_value:,}"
-            bbox = draw.textbbox((0, 0), value_text, font=value_font)
-            value_x = center_x - (bbox[2] - bbox[0]) // 2
-            draw.text((value_x, center_y - 60), value_text,
-                     font=value_font, fill=(255, 255, 255))
-
-            # Draw unit
-            unit_bbox = draw.textbbox((0, 0), unit, font=label_font)
-            unit_x = center_x - (unit_bbox[2] - unit_bbox[0]) // 2
-            draw.text((unit_x, center_y + 40), unit,
-                     font=label_font, fill=(150, 150, 150))
-
-            # Draw title
-            title_bbox = draw.textbbox((0, 0), data_title, font=label_font)
-            title_x = center_x - (title_bbox[2] - title_bbox[0]) // 2
-            draw.text((title_x, 50), data_title,
-                     font=label_font, fill=(255, 255, 255))
-
-            return np.array(img)
-
-        return VideoClip(make_frame, duration=duration).set_position('center')
+        """Create animated data visualization (count-up with progress arc)"""
+        chart = ProgressRingChart(self.layout_width, 600, data_title, value, unit)
+
+        # Static layers and numerals are rasterized once; frames only threshold and blend
+        clip = chart.clip(duration)
+        if self.scale != 1:
+            clip = clip.resize(self.scale)
+        return clip.set_position('center')
     
-    def process_footage_with_cinematic_style(self, footage_path, duration, style='normal'):
+    def footage_window(self, footage_path, source_duration, duration):
+        """(start, loop) of the source section to use for a segment"""
+        # Select best part of clip (cut-free, most motion) from the footage index
+        best_start = FootageIndex.for_clip(footage_path).best_window(footage_path, duration)
+        if best_start is not None and best_start + duration <= source_duration:
+            return best_start, False
+        elif source_duration > duration * 2:
+            # Use middle section for better content
+            return (source_duration - duration) / 2, False
+        elif source_duration < duration:
+            return 0, True
+        return 0, False
+    
+    def process_footage_with_cinematic_style(self, footage_path, duration, style='normal', grain=None):
         """Apply cinematic color grading and effects to footage"""
         try:
             clip = VideoFileClip(footage_path)
             
-            # Select best part of clip
-            if clip.duration > duration * 2:
-                # Use middle section for better content
-                start = (clip.duration - duration) / 2
-                clip = clip.subclip(start, start + duration)
-            elif clip.duration < duration:
+            start, loop = self.footage_window(footage_path, clip.duration, duration)
+            if loop:
                 clip = clip.loop(duration=duration)
             else:
-                clip = clip.subclip(0, duration)
-            
-            # Resize for mobile maintaining cinematic feel
-            clip = self.resize_cinematic(clip)
-            
-            # Apply color grading
-            if style == 'dramatic':
-                # Cool, high contrast look
-                clip = clip.fx(vfx.colorx, 0.8)  # Reduce saturation
-                clip = clip.fx(vfx.lum_contrast, lum=0, contrast=0.3)
-            elif style == 'warm':
-                # Warm, inviting look
-                clip = clip.fx(vfx.colorx, 1.2)
-                clip = clip.fx(vfx.gamma_corr, 1.2)
-            elif style == 'tech':
-                # Blue-tinted, modern look
-                def blue_tint(image):
-                    image[:,:,2] = np.minimum(255, image[:,:,2] * 1.2)  # Boost blue
-                    image[:,:,0] = image[:,:,0] * 0.9  # Reduce red
-                    return image
-                clip = clip.fl_image(blue_tint)
+                clip = clip.subclip(start, start + duration)
             
-            # Add subtle slow zoom (Ken Burns effect)
+            # Resize for mobile maintaining cinematic feel, with a subtle slow zoom
+            # (Ken Burns effect) - one crop-window warp per frame from the source
             zoom_factor = 1.1
-            clip = clip.resize(lambda t: 1 + (zoom_factor - 1) * (t / duration))
+            clip = self.resize_cinematic(clip, zoom=lambda t: 1 + (zoom_factor - 1) * (t / duration))
+            
+            # Apply color grading (one LUT pass per frame)
+            clip = self.footage_grade(style).apply(clip)
             
             # Add vignette for cinematic look
-            vignette = self.create_vignette(duration)
-            clip = CompositeVideoClip([clip, vignette])
+            clip = self.add_vignette(clip)
             
             # Add film grain for texture
-            if random.random() > 0.5:
-                grain = self.create_film_grain(duration)
-                clip = CompositeVideoClip([clip, grain])
+            if grain is None:
+                grain = random.random() > 0.5 and self.profile['grain']
+            if grain:
+                clip = self.add_film_grain(clip)
             
             return clip
             
@@ -446,85 +437,81 @@ class DocumentaryStyleCreator:
             return ColorClip(size=(self.width, self.height), 
                            color=(20, 20, 30), duration=duration)
     
-    def resize_cinematic(self, clip):
-        """Resize with cinematic cropping"""
-        # Get aspect ratios
-        clip_aspect = clip.w / clip.h
-        target_aspect = self.width / self.height
-        
-        if clip_aspect > target_aspect:
-            # Wider than target - scale by height
-            clip = clip.resize(height=self.height)
-            # Take center crop
-            excess = clip.w - self.width
-            clip = clip.crop(x1=excess//2, x2=clip.w - excess//2)
-        else:
-            # Taller than target - scale by width
-            clip = clip.resize(width=self.width)
-            # Take upper-middle crop (usually more interesting than center)
-            excess = clip.h - self.height
-            clip = clip.crop(y1=excess//3, y2=clip.h - 2*excess//3)
-        
-        return clip
+    def footage_grade(self, style):
+        """Colour grade for a footage style"""
+        if style == 'dramatic':
+            # Cool, high contrast look: reduce saturation, then add contrast
+            return ColorGrade().colorx(0.8).lum_contrast(lum=0, contrast=0.3)
+        elif style == 'warm':
+            # Warm, inviting look
+            return ColorGrade().colorx(1.2).gamma(1.2)
+        elif style == 'tech':
+            # Blue-tinted, modern look: boost blue, reduce red
+            return ColorGrade().channel_gain(red=0.9, blue=1.2)
+        return ColorGrade()
+
+    def resize_cinematic(self, clip, zoom=None):
+        """Resize with cinematic cropping, optionally zooming over time"""
+        # Wider sources get a center crop; taller ones the upper-middle crop
+        # (usually more interesting than center)
+        return ZoomWindow(self.width, self.height, zoom, focus=(0.5, 1 / 3)).apply(clip)
+    
+    def add_vignette(self, clip, strength=0.6):
+        """Add vignette for cinematic look"""
+        # Gain map is computed once per (resolution, strength) and multiplied in
+        return Vignette(strength=strength).apply(clip)
+    
+    def add_film_grain(self, clip, intensity=0.1):
+        """Add subtle film grain texture"""
+        # Grain tiles are generated once per process and shared across jobs
+        return FilmGrain(intensity=intensity, fps=self.fps).apply(clip)
     
     def create_vignette(self, duration):
-        """Create vignette overlay for cinematic look"""
-        img = Image.new('RGB', (self.width, self.height), (0, 0, 0))
-        draw = ImageDraw.Draw(img)
-
-        # Create radial gradient
-        center_x, center_y = self.width // 2, self.height // 2
-        max_radius = np.sqrt(center_x**2 + center_y**2)
-
-        for i in range(int(max_radius), 0, -5):
-            intensity = int(255 * (1 - (i / max_radius) ** 2))
-            color = (intensity, intensity, intensity)
-            draw.ellipse([center_x - i, center_y - i,
-                         center_x + i, center_y + i], fill=color)
-
-        return ImageClip(np.array(img), duration=duration).set_opacity(0.6)
+        """Create vignette overlay for cinematic look (a clip to composite on top)"""
+        # Bright centre falling off to black in the corners - the full-strength gain map
+        return ImageClip(Vignette(strength=1.0).gain_map(self.width, self.height),
+                         duration=duration).set_opacity(0.6)
     
     def create_film_grain(self, duration, intensity=0.1):
-        """Add subtle film grain texture"""
-        def make_frame(t):
-            # Create random noise
-            grain = np.random.random((self.height, self.width, 3)) * intensity * 255
-            grain = grain.astype(np.uint8)
-
-            return grain
-
-        return VideoClip(make_frame, duration=duration).set_opacity(0.2)
+        """Create subtle film grain texture (a clip to composite on top)"""
+        grain = FilmGrain(intensity=intensity, opacity=1.0, fps=self.fps)
+        black = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        return VideoClip(lambda t: grain.grain_frame(black, t), duration=duration).set_opacity(0.2)
     
     def create_lower_third(self, text, subtitle, duration=3):
         """Create professional lower third graphic"""
-        img = Image.new('RGB', (self.width, 300), (0, 0, 0))
-        draw = ImageDraw.Draw(img)
+        lower_third = ImageClip(self.lower_third_image(text, subtitle), duration=duration)
+
+        # Animate in from left
+        lower_third = lower_third.set_position(
+            lambda t: (min(0, -self.width + t * self.width * 2), self.height - self.px(400))
+        )
 
-        # Background bars
-        draw.rectangle([0, 50, self.width, 130], fill=(0, 0, 0))
-        draw.rectangle([0, 130, 600, 180], fill=(0, 150, 255))
+        return lower_third
 
-        try:
-            main_font = ImageFont.truetype("arial.ttf", 48)
-            sub_font = ImageFont.truetype("arial.ttf", 32)
-        except:
-            main_font = ImageFont.load_default()
-            sub_font = main_font
+    def lower_third_image(self, text, subtitle):
+        """Lower third graphic, rendered once per (text, subtitle)"""
+        main_font = get_font("arial.ttf", 48)
+        sub_font = get_font("arial.ttf", 32)
 
-        # Main text
-        draw.text((50, 60), text.upper(), font=main_font, fill=(255, 255, 255))
+        def render():
+            img = Image.new('RGB', (self.layout_width, 300), (0, 0, 0))
+            draw = ImageDraw.Draw(img)
 
-        # Subtitle
-        draw.text((50, 135), subtitle, font=sub_font, fill=(200, 200, 200))
+            # Background bars
+            draw.rectangle([0, 50, self.layout_width, 130], fill=(0, 0, 0))
+            draw.rectangle([0, 130, 600, 180], fill=(0, 150, 255))
 
-        lower_third = ImageClip(np.array(img), duration=duration)
+            # Main text
+            draw.text((50, 60), text.upper(), font=main_font, fill=(255, 255, 255))
 
-        # Animate in from left
-        lower_third = lower_third.set_position(
-            lambda t: (min(0, -self.width + t * self.width * 2), self.height - 400)
-        )
+            # Subtitle
+            draw.text((50, 135), subtitle, font=sub_font, fill=(200, 200, 200))
 
-        return lower_third
+            return self.fit(np.array(img))
+
+        return cached_overlay(('lower_third', text, subtitle, "arial.ttf", 48, 32, self.layout_width, self.scale),
+                              render)
     
     def create_transition(self, style='fade'):
         """Create smooth transitions between scenes"""
@@ -535,88 +522,143 @@ class DocumentaryStyleCreator:
         elif style == 'dissolve':
             return 1.0  # Longer fade
     
-    async def create_documentary_video(self, script_data, footage_clips):
-        """Create complete documentary-style video"""
-        
-        print("🎬 Creating documentary-style video...")
-        
+    async def synthesize_voiceover(self, script_data):
+        """Documentary voiceover for the script (a SpeechResult)"""
         # Generate voiceover with professional voice
-        voice_file = f"temp_voice_{datetime.now().timestamp()}.mp3"
         voice = self.voices['primary']  # Documentary voice
         
         # Process script for better flow
         voiceover_text = self.process_script_for_documentary(script_data['voiceover'])
         
-        communicate = edge_tts.Communicate(voiceover_text, voice, rate="-10%")  # Slightly slower
-        await communicate.save(voice_file)
+        # Cached on disk by (text, voice, rate, pitch, backend) - repeats skip the TTS round trip;
+        # with TTS_WORKERS > 1 sentences are synthesized concurrently and stitched
+        return await synthesize_speech(voiceover_text, voice, rate="-10%",  # Slightly slower
+                                       backend=self.tts_backend, workers=self.tts_workers)
+    
+    def prerasterize_overlays(self, script_data):
+        """
+        Render the text graphics that don't depend on footage (titles, lower
+        thirds) into the shared overlay cache, so the render finds them ready.
+        Safe to run on another thread alongside the fetches and the render.
+        """
+        components = script_data['script_components']
+        self.create_cinematic_title(script_data['video_details']['title'])
+        self.create_cinematic_title(components['cta'])
+        self.lower_third_image("BREAKING", components['hook'][:50])
+        for i, point in enumerate(components['main_points']):
+            self.lower_third_image(f"POINT {i + 1}", point[:60])
+    
+    def renders_in_process(self):
+        """
+        Whether the configured render runs in this process - only then does it
+        see the overlays prerasterize_overlays() put in the shared cache
+        """
+        return self.render_engine == 'ffmpeg' or self.render_workers <= 1
+    
+    async def create_documentary_video(self, script_data, footage_clips, workers=None, engine=None,
+                                       speech=None):
+        """
+        Create complete documentary-style video.
+        workers > 1 renders timeline chunks in parallel processes (defaults to RENDER_WORKERS).
+        engine='ffmpeg' renders the segment plan as one ffmpeg filtergraph (defaults to RENDER_ENGINE).
+        speech is an already synthesized voiceover (see synthesize_voiceover), e.g. one
+        produced while the footage was downloading.
+        """
+        
+        print("🎬 Creating documentary-style video...")
         
-        audio = AudioFileClip(voice_file)
-        duration = audio.duration
+        if speech is None:
+            speech = await self.synthesize_voiceover(script_data)
+        # Per-job scratch directory; the voice file is only there for ffmpeg to mux
+        scratch = tempfile.mkdtemp(prefix='documentary_')
+        voice_file = speech.save(os.path.join(scratch, f"voice.{speech.audio_format}"))
         
-        # Create video segments
-        segments = []
+        # Duration comes from the TTS stream itself - no decode of the audio
+        duration = speech.duration
         
-        # 1. Opening sequence (5 seconds)
-        opening = self.create_cinematic_opening(
-            script_data['video_details']['title'],
-            duration=5
+        # Export
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = "" if self.profile['name'] == 'full' else f"_{self.profile['name']}"
+        output_path = os.path.join(
+            "output", "videos",
+            f"documentary{suffix}_{timestamp}.mp4"
         )
-        segments.append(opening)
+        
+        engine = engine or self.render_engine
+        workers = workers if workers is not None else self.render_workers
+        
+        # Every random choice is made here, once; renderers and workers only read the plan
+        plan = self.plan_documentary(script_data, footage_clips, duration)
+        try:
+            if engine == 'ffmpeg':
+                print("📹 Rendering documentary video as an ffmpeg filtergraph...")
+                FilterGraphRenderer(self, self.encoder).render(plan, output_path, audio_path=voice_file)
+            elif workers > 1:
+                # Each worker builds only the segments its chunk overlaps
+                print(f"📹 Rendering documentary video in {workers} processes...")
+                bounds = self.segment_bounds(plan)
+                render_parallel(
+                    build_documentary_window,
+                    (plan, self.profile['name']),
+                    bounds[:-1], bounds[-1], output_path,
+                    fps=self.fps, workers=workers, audio_path=voice_file,
+                    encoder=self.encoder
+                )
+            else:
+                final_video, _ = self.build_plan_timeline(plan)
+                
+                # Add subtle background music (optional)
+                # final_video = self.add_ambient_music(final_video)
+                
+                # Voiceover is muxed straight from the TTS file
+                print("📹 Rendering documentary video...")
+                self.encoder.encode(final_video, output_path, self.fps, audio_path=voice_file,
+                                    scratch_dir=scratch)
+        finally:
+            # Cleanup
+            shutil.rmtree(scratch, ignore_errors=True)
+        
+        print(f"✅ Documentary video created: {output_path}")
+        return output_path
+    
+    def plan_documentary(self, script_data, footage_clips, duration, rng=None):
+        """
+        Segment plan for a voiceover of `duration` seconds: one dict per segment
+        describing what to show. Rendered by moviepy (build_documentary_timeline)
+        or compiled into a single ffmpeg filtergraph (FilterGraphRenderer).
+        Random choices are drawn from rng (a random.Random), never the global generator.
+        """
+        rng = rng or random.Random()
+        components = script_data['script_components']
+        plan = []
+        
+        # 1. Opening sequence (5 seconds)
+        plan.append({'kind': 'opening', 'title': script_data['video_details']['title'], 'duration': 5})
         
         # 2. Hook section with dramatic footage (5-7 seconds)
         if footage_clips and len(footage_clips) > 0:
-            hook_footage = self.process_footage_with_cinematic_style(
-                footage_clips[0],
-                duration=5,
-                style='dramatic'
-            )
-            
-            # Add hook text as lower third
-            hook_text = self.create_lower_third(
-                "BREAKING",
-                script_data['script_components']['hook'][:50],
-                duration=5
-            )
-            hook_section = CompositeVideoClip([hook_footage, hook_text])
+            # Hook text as lower third
+            plan.append(self.plan_footage(footage_clips[0], 5, 'dramatic', rng,
+                                          lower_third=("BREAKING", components['hook'][:50])))
         else:
             # Fallback to text card
-            hook_section = self.create_information_card(
-                "KEY INSIGHT",
-                [script_data['script_components']['hook']],
-                duration=5
-            )
-        segments.append(hook_section)
+            plan.append({'kind': 'card', 'title': "KEY INSIGHT",
+                         'points': [components['hook']], 'duration': 5})
         
         # 3. Main points with cinematic footage
-        points = script_data['script_components']['main_points']
+        points = components['main_points']
         point_duration = (duration - 15) / len(points)  # Minus opening and ending
         
         for i, point in enumerate(points):
             if i < len(footage_clips) - 1:
-                # Use footage with cinematic treatment
-                point_footage = self.process_footage_with_cinematic_style(
-                    footage_clips[i + 1],
-                    duration=point_duration,
-                    style='tech' if i % 2 == 0 else 'warm'
-                )
-                
-                # Add text overlay
-                point_text = self.create_lower_third(
-                    f"POINT {i + 1}",
-                    point[:60],
-                    duration=point_duration
-                )
-                
-                point_section = CompositeVideoClip([point_footage, point_text])
+                # Footage with cinematic treatment and a text overlay
+                plan.append(self.plan_footage(footage_clips[i + 1], point_duration,
+                                              'tech' if i % 2 == 0 else 'warm', rng,
+                                              lower_third=(f"POINT {i + 1}", point[:60])))
             else:
                 # Use info card
-                point_section = self.create_information_card(
-                    f"KEY POINT {i + 1}",
-                    [point],
-                    duration=point_duration
-                )
-            
-            segments.append(point_section)
+                plan.append({'kind': 'card', 'title': f"KEY POINT {i + 1}",
+                             'points': [point], 'duration': point_duration})
         
         # 4. Data visualization (if numbers mentioned)
         if any(char.isdigit() for char in script_data['voiceover']):
@@ -624,69 +666,89 @@ class DocumentaryStyleCreator:
             import re
             numbers = re.findall(r'\d+', script_data['voiceover'])
             if numbers:
-                data_viz = self.create_data_visualization(
-                    "IMPACT",
-                    int(numbers[0]),
-                    "UNITS",
-                    duration=3
-                )
-                segments.append(data_viz)
+                plan.append({'kind': 'chart', 'title': "IMPACT", 'value': int(numbers[0]),
+                             'unit': "UNITS", 'duration': 3})
         
         # 5. Closing with CTA
         closing_duration = 5
         if footage_clips and len(footage_clips) > 1:
-            closing_footage = self.process_footage_with_cinematic_style(
-                footage_clips[-1],
-                duration=closing_duration,
-                style='dramatic'
-            )
+            plan.append(self.plan_footage(footage_clips[-1], closing_duration, 'dramatic', rng,
+                                          title=components['cta']))
         else:
-            closing_footage = ColorClip(
-                size=(self.width, self.height),
-                color=(10, 10, 20),
-                duration=closing_duration
+            plan.append({'kind': 'footage', 'path': None, 'color': (10, 10, 20),
+                         'duration': closing_duration, 'title': components['cta']})
+        
+        return plan
+    
+    def plan_footage(self, footage_path, duration, style, rng, **overlay):
+        """Footage segment entry; overlay is lower_third=(text, subtitle) or title=text"""
+        segment = {'kind': 'footage', 'path': footage_path, 'duration': duration,
+                   'style': style, 'grain': rng.random() > 0.5 and self.profile['grain']}
+        segment.update(overlay)
+        return segment
+    
+    def build_segment(self, segment):
+        """moviepy clip for one plan entry"""
+        kind = segment['kind']
+        duration = segment['duration']
+        
+        if kind == 'opening':
+            return self.create_cinematic_opening(segment['title'], duration=duration)
+        if kind == 'card':
+            return self.create_information_card(segment['title'], segment['points'], duration=duration)
+        if kind == 'chart':
+            return self.create_data_visualization(segment['title'], segment['value'],
+                                                  segment['unit'], duration=duration)
+        
+        # Footage (or a plain colour when there is none) with a text overlay
+        if segment.get('path'):
+            background = self.process_footage_with_cinematic_style(
+                segment['path'], duration=duration, style=segment['style'], grain=segment['grain']
             )
+        else:
+            background = ColorClip(size=(self.width, self.height), color=segment['color'], duration=duration)
         
-        # Add CTA text
-        cta_text = self.create_cinematic_title(script_data['script_components']['cta'])
-        cta_clip = (ImageClip(cta_text, duration=closing_duration)
-                   .set_position('center')
-                   .fadein(0.5))
+        if 'lower_third' in segment:
+            overlay = self.create_lower_third(*segment['lower_third'], duration=duration)
+        else:
+            # CTA text
+            overlay = (ImageClip(self.create_cinematic_title(segment['title']), duration=duration)
+                       .set_position('center')
+                       .fadein(0.5))
         
-        closing = CompositeVideoClip([closing_footage, cta_clip])
-        segments.append(closing)
+        return compose_layers([background, overlay], fps=self.fps)
+    
+    def segment_bounds(self, plan):
+        """Segment start times plus the total duration: [0, end of 1st, ..., end of last]"""
+        return [float(t) for t in np.cumsum([0] + [segment['duration'] for segment in plan])]
+    
+    def build_plan_timeline(self, plan, window=None):
+        """
+        Silent moviepy timeline for a plan, or for just the segments overlapping
+        window=(start, end). Returns (clip, timeline time at which the clip starts).
+        """
+        bounds = self.segment_bounds(plan)
+        indices = [i for i in range(len(plan))
+                   if window is None or (bounds[i] < window[1] and bounds[i + 1] > window[0])]
+        segments = [self.build_segment(plan[i]) for i in indices]
         
         # Concatenate all segments with smooth transitions
-        final_video = concatenate_videoclips(segments, method="compose")
-        
-        # Add audio
-        final_video = final_video.set_audio(audio)
-        
-        # Add subtle background music (optional)
-        # final_video = self.add_ambient_music(final_video)
-        
-        # Export
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = os.path.join(
-            "output", "videos",
-            f"documentary_{timestamp}.mp4"
-        )
-        
-        print("📹 Rendering documentary video...")
-        final_video.write_videofile(
-            output_path,
-            fps=self.fps,
-            codec='libx264',
-            audio_codec='aac',
-            preset='medium',
-            threads=4
-        )
-        
-        # Cleanup
-        os.remove(voice_file)
-        
-        print(f"✅ Documentary video created: {output_path}")
-        return output_path
+        clip = concatenate_videoclips(segments, method="compose")
+        if tuple(clip.size) != (self.width, self.height):
+            # A window of smaller-than-frame segments (the chart) is centred on the
+            # full canvas, exactly as the full timeline places it
+            clip = CompositeVideoClip([clip.set_position('center')], size=(self.width, self.height))
+        return clip, bounds[indices[0]]
+    
+    def build_documentary_timeline(self, script_data, footage_clips, duration, seed=None):
+        """
+        Build the silent documentary timeline for a voiceover of `duration` seconds.
+        The same seed gives the same timeline.
+        Returns the clip and the segment start times (chunk boundaries for parallel rendering).
+        """
+        plan = self.plan_documentary(script_data, footage_clips, duration, random.Random(seed))
+        final_video, _ = self.build_plan_timeline(plan)
+        return final_video, self.segment_bounds(plan)[:-1]
     
     def process_script_for_documentary(self, script):
         """Adjust script pacing for documentary style"""
@@ -701,6 +763,10 @@ class DocumentaryStyleCreator:
         
         return script
 
+def build_documentary_window(plan, profile=None, window=None):
+    """Module-level builder for parallel render workers: just the plan segments overlapping window"""
+    return DocumentaryStyleCreator(profile).build_plan_timeline(plan, window)
+
 # Test function
 async def test_documentary_style():
     creator = DocumentaryStyleCreator()
@@ -0,0 +1,211 @@
+# File: C:\New Project\viral-ai-content\filtergraph_render.py
+"""
+FFmpeg Filtergraph Render Engine for Viral AI Content
+Compiles a documentary segment plan into one ffmpeg filter_complex run:
+footage trimming/looping, cover crop and zoom, LUT grading, vignette,
+grain, static overlays and concatenation all happen inside ffmpeg. Only the
+procedural segments (animated opening, charts) are rendered in Python.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+from PIL import Image
+from moviepy.editor import CompositeVideoClip
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from procedural_layers import Vignette
+from video_encoder import PipeEncoder
+
+
+def write_cube_lut(grade, path):
+    """Save a ColorGrade's per-channel LUT as a 1D .cube file for ffmpeg's lut1d"""
+    table = grade.lut[0].astype(np.float64) / 255.0
+    with open(path, 'w') as f:
+        f.write("LUT_1D_SIZE 256\n")
+        for r, g, b in table:
+            f.write(f"{r:.6f} {g:.6f} {b:.6f}\n")
+    return path
+
+
+def _escape_path(path):
+    """Path usable as a filter option value inside filter_complex"""
+    return os.path.abspath(path).replace('\\', '/').replace(':', '\\\\:').replace("'", "\\\\'")
+
+
+class FilterGraphRenderer:
+    """Translate a DocumentaryStyleCreator plan into a single ffmpeg invocation"""
+
+    def __init__(self, creator, encoder=None):
+        self.creator = creator
+        self.width = creator.width
+        self.height = creator.height
+        self.fps = creator.fps
+        encoder = encoder or creator.encoder
+        if not hasattr(encoder, 'video_args'):
+            # The filtergraph needs ffmpeg output options, not a frame writer
+            if not hasattr(encoder, 'pipe_encoder'):
+                raise TypeError(f"{type(encoder).__name__} can't encode an ffmpeg filtergraph render")
+            print(f"ℹ️ Filtergraph render uses the ffmpeg pipe encoder with the "
+                  f"{type(encoder).__name__} settings")
+            encoder = encoder.pipe_encoder()
+        self.encoder = encoder
+
+    def render(self, plan, output_path, audio_path=None):
+        started = time.time()
+        self.work_dir = tempfile.mkdtemp(prefix='filtergraph_')
+        self.inputs = []
+        self.filters = []
+        self.luts = {}
+
+        try:
+            labels = [self.segment(i, segment) for i, segment in enumerate(plan)]
+            self.filters.append(''.join(f"[{label}]" for label in labels)
+                                + f"concat=n={len(labels)}:v=1:a=0[outv]")
+
+            cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error']
+            for args in self.inputs:
+                cmd += args
+            if audio_path:
+                cmd += ['-i', audio_path]
+
+            cmd += ['-filter_complex', ';'.join(self.filters), '-map', '[outv]']
+            if audio_path:
+                cmd += ['-map', f"{len(self.inputs)}:a:0", '-c:a', 'aac']
+            cmd += self.encoder.video_args() + ['-r', str(self.fps), '-movflags', '+faststart', output_path]
+
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode != 0:
+                raise IOError(f"ffmpeg filtergraph render failed: {result.stderr.decode(errors='ignore')}")
+        finally:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+        print(f"🎞️ Filtergraph render: {len(plan)} segments in {time.time() - started:.1f}s")
+        return output_path
+
+    # Inputs
+
+    def add_input(self, args):
+        self.inputs.append(args)
+        return len(self.inputs) - 1
+
+    def image_input(self, array, duration, name):
+        """Looped still image input, held for `duration` seconds"""
+        path = os.path.join(self.work_dir, f"{name}.png")
+        Image.fromarray(np.asarray(array, dtype=np.uint8)).save(path)
+        return self.add_input(['-loop', '1', '-framerate', str(self.fps),
+                               '-t', f"{duration:.3f}", '-i', path])
+
+    def lut_file(self, style, grain):
+        """Grade LUT for a footage style, written once per render"""
+        key = (style, grain)
+        if key not in self.luts:
+            grade = self.creator.footage_grade(style)
+            if grain:
+                # Film grain dims the frame by its layer opacity before adding noise
+                grade = grade.colorx(0.8)
+            path = os.path.join(self.work_dir, f"grade_{style}_{int(grain)}.cube")
+            self.luts[key] = write_cube_lut(grade, path)
+        return self.luts[key]
+
+    # Segments
+
+    def segment(self, i, segment):
+        """Add the filters for one plan entry; returns its output label"""
+        kind = segment['kind']
+        if kind == 'footage':
+            label = self.footage(i, segment)
+        elif kind == 'card':
+            label = self.card(i, segment)
+        else:
+            label = self.procedural(i, segment)
+
+        out = f"s{i}"
+        self.filters.append(f"[{label}]fps={self.fps},format=yuv420p,setsar=1[{out}]")
+        return out
+
+    def zoom(self, duration, amount):
+        """Per-frame upscale by 1 -> 1 + amount over the segment, cropped back to frame size"""
+        w, h = self.width, self.height
+        factor = f"(1+{amount}*t/{duration:.3f})"
+        return (f"scale=w='2*trunc({w}*{factor}/2)':h='2*trunc({h}*{factor}/2)':eval=frame,"
+                f"crop={w}:{h}:(in_w-{w})/2:(in_h-{h})/2")
+
+    def footage(self, i, segment):
+        duration = segment['duration']
+        w, h = self.width, self.height
+
+        if segment.get('path'):
+            path = segment['path']
+            info = ffmpeg_parse_infos(path)
+            src_w, src_h = info['video_size']
+            start, loop = self.creator.footage_window(path, info['duration'], duration)
+            if loop:
+                index = self.add_input(['-stream_loop', '-1', '-t', f"{duration:.3f}", '-i', path])
+            else:
+                index = self.add_input(['-ss', f"{start:.3f}", '-t', f"{duration:.3f}", '-i', path])
+
+            # Cover crop (upper-middle for tall sources, like resize_cinematic), then the slow zoom
+            scale = max(w / src_w, h / src_h)
+            crop_w = min(src_w, int(round(w / scale)))
+            crop_h = min(src_h, int(round(h / scale)))
+            crop_x = (src_w - crop_w) // 2
+            crop_y = (src_h - crop_h) // 3
+
+            chain = [f"[{index}:v]trim=duration={duration:.3f},setpts=PTS-STARTPTS",
+                     f"crop={crop_w}:{crop_h}:{crop_x}:{crop_y}",
+                     f"scale={w}:{h}",
+                     self.zoom(duration, 0.1),
+                     "format=gbrp",
+                     f"lut1d=file='{_escape_path(self.lut_file(segment['style'], segment['grain']))}'"]
+            self.filters.append(','.join(chain) + f"[g{i}]")
+
+            # Vignette: multiply with the same cached gain map the moviepy path uses
+            gain = self.image_input(Vignette(strength=0.6).gain_map(w, h), duration, f"vignette_{i}")
+            self.filters.append(f"[{gain}:v]format=gbrp[gm{i}]")
+            vignette = f"[g{i}][gm{i}]blend=all_mode=multiply:shortest=1"
+            if segment['grain']:
+                # Temporal noise around the grain bank's mean (~+2 levels) instead of the tiles
+                vignette += ",noise=alls=3:allf=t+u,lutrgb=r=val+2:g=val+2:b=val+2"
+            self.filters.append(vignette + f"[b{i}]")
+        else:
+            r, g, b = segment['color']
+            self.filters.append(f"color=c=0x{r:02x}{g:02x}{b:02x}:s={w}x{h}:r={self.fps}"
+                                f":d={duration:.3f},format=gbrp[b{i}]")
+
+        # Static text overlay, rasterized once by the creator
+        if 'lower_third' in segment:
+            overlay = self.image_input(self.creator.lower_third_image(*segment['lower_third']),
+                                       duration, f"lower_third_{i}")
+            self.filters.append(f"[b{i}][{overlay}:v]overlay=x='min(0,-{w}+t*{2 * w})'"
+                                f":y={h - self.creator.px(400)}:eval=frame[v{i}]")
+        else:
+            overlay = self.image_input(self.creator.create_cinematic_title(segment['title']),
+                                       duration, f"title_{i}")
+            self.filters.append(f"[{overlay}:v]fade=t=in:st=0:d=0.5[t{i}]")
+            self.filters.append(f"[b{i}][t{i}]overlay=x=(W-w)/2:y=(H-h)/2[v{i}]")
+        return f"v{i}"
+
+    def card(self, i, segment):
+        duration = segment['duration']
+        image = self.creator.information_card_image(segment['title'], segment['points'])
+        index = self.image_input(image, duration, f"card_{i}")
+        self.filters.append(f"[{index}:v]{self.zoom(duration, 0.05)}[v{i}]")
+        return f"v{i}"
+
+    def procedural(self, i, segment):
+        """Animated segments stay in Python; encode them near-losslessly as an input"""
+        clip = self.creator.build_segment(segment)
+        if tuple(clip.size) != (self.width, self.height):
+            clip = CompositeVideoClip([clip], size=(self.width, self.height))
+        clip = clip.set_duration(segment['duration'])
+
+        path = os.path.join(self.work_dir, f"segment_{i}.mp4")
+        PipeEncoder(preset='ultrafast', crf=10).encode(clip, path, self.fps)
+        index = self.add_input(['-i', path])
+        return f"{index}:v"
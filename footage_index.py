@@ -0,0 +1,449 @@
+# File: C:\New Project\viral-ai-content\footage_index.py
+"""
+Footage Index for Viral AI Content
+One-time per-clip analysis (scene cuts, motion, brightness, keyframes) stored
+next to the stock video cache so segment builders can pick windows and cut
+points instantly. Also tracks content identity for cache deduplication.
+"""
+
+import os
+import re
+import json
+import hashlib
+import random
+import subprocess
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+from moviepy.config import get_setting
+
+
+class FootageAnalyzer:
+    def __init__(self, sample_rate: float = 4.0, analysis_width: int = 96,
+                 cut_threshold: float = 0.45):
+        # Frames per second actually inspected (rest are only grabbed, not converted)
+        self.sample_rate = sample_rate
+        # Frames are downsampled to this width before any maths
+        self.analysis_width = analysis_width
+        # Bhattacharyya histogram distance above which we call it a hard cut
+        self.cut_threshold = cut_threshold
+        # Keep windows this far away from a cut so we never open on one
+        self.cut_margin = 0.15
+
+    def analyze(self, video_path: str) -> Optional[Dict]:
+        """Build scene-cut and score timeline for a clip from downsampled frames"""
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            print(f"❌ Could not open footage for analysis: {video_path}")
+            return None
+
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            step = max(1, int(round(fps / self.sample_rate)))
+
+            times, motion, brightness, cuts = [], [], [], []
+            prev_small = None
+            prev_hist = None
+            frame_no = 0
+
+            while True:
+                # grab() demuxes/decodes without the costly colour conversion
+                if not cap.grab():
+                    break
+                if frame_no % step:
+                    frame_no += 1
+                    continue
+
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                t = frame_no / fps
+                frame_no += 1
+
+                h, w = frame.shape[:2]
+                small_h = max(1, int(h * self.analysis_width / w))
+                small = cv2.resize(frame, (self.analysis_width, small_h),
+                                   interpolation=cv2.INTER_AREA)
+                gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+                hist = cv2.calcHist([gray], [0], None, [32], [0, 256])
+                cv2.normalize(hist, hist)
+
+                is_cut = False
+                if prev_hist is not None:
+                    distance = cv2.compareHist(prev_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+                    is_cut = distance > self.cut_threshold
+                    if is_cut:
+                        cuts.append(round(t, 3))
+
+                if prev_small is None or is_cut:
+                    # A cut is not motion - don't reward windows for containing one
+                    motion_value = 0.0
+                else:
+                    motion_value = float(cv2.absdiff(gray, prev_small).mean()) / 255.0
+
+                times.append(round(t, 3))
+                motion.append(round(motion_value, 4))
+                brightness.append(round(float(gray.mean()) / 255.0, 4))
+
+                prev_small = gray
+                prev_hist = hist
+
+            duration = frame_no / fps
+        finally:
+            cap.release()
+
+        if not times:
+            return None
+
+        score = self.score_timeline(motion, brightness)
+        shots = self.build_shot_table(times, score, cuts, duration)
+
+        return {
+            "duration": round(duration, 3),
+            "sample_rate": self.sample_rate,
+            "cuts": cuts,
+            "timeline": {
+                "t": times,
+                "motion": motion,
+                "brightness": brightness,
+                "score": score
+            },
+            **shots
+        }
+
+    def probe_keyframes(self, video_path: str) -> Optional[List[float]]:
+        """List keyframe (GOP start) timestamps without decoding any other frame (None if ffmpeg failed)"""
+        cmd = [get_setting("FFMPEG_BINARY"), '-hide_banner',
+               '-skip_frame', 'nokey', '-i', video_path,
+               '-an', '-vf', 'showinfo', '-f', 'null', '-']
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, timeout=120)
+        except Exception as e:
+            print(f"❌ Keyframe probe failed: {e}")
+            return None
+
+        stderr = result.stderr.decode('utf-8', errors='ignore')
+        times = [round(float(t), 3) for t in re.findall(r'pts_time:([0-9.]+)', stderr)]
+        return sorted(set(times))
+
+    def score_timeline(self, motion: List[float], brightness: List[float]) -> List[float]:
+        """Combine motion and exposure into one 'interesting frame' score"""
+        motion_arr = np.asarray(motion, dtype=np.float32)
+        bright_arr = np.asarray(brightness, dtype=np.float32)
+
+        # Normalise motion per clip so a calm clip still has a best part
+        peak = float(motion_arr.max()) if motion_arr.size else 0.0
+        motion_norm = motion_arr / peak if peak > 0 else motion_arr
+
+        # Penalise near-black and blown-out frames
+        exposure = np.clip(1.0 - np.abs(bright_arr - 0.45) / 0.45, 0.0, 1.0)
+
+        score = motion_norm * (0.5 + 0.5 * exposure)
+        return [round(float(s), 4) for s in score]
+
+    def build_shot_table(self, times: List[float], score: List[float],
+                         cuts: List[float], duration: float) -> Dict:
+        """
+        Split the clip into shots and precompute a length-sorted lookup table.
+        shots are sorted by usable length; best_by_length[i] is the index of the
+        highest-scoring shot among shots[i:], so any duration resolves with a
+        single bisect.
+        """
+        bounds = [0.0] + list(cuts) + [duration]
+        shots = []
+
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            lo = bisect_left(times, start)
+            hi = bisect_left(times, end)
+            if hi <= lo:
+                continue
+            window = score[lo:hi]
+            peak_index = lo + int(np.argmax(window))
+            shots.append([
+                round(start, 3),
+                round(end, 3),
+                round(float(np.mean(window)), 4),
+                times[peak_index]
+            ])
+
+        shots.sort(key=lambda shot: shot[1] - shot[0])
+
+        best_by_length = [0] * len(shots)
+        best = None
+        for i in range(len(shots) - 1, -1, -1):
+            if best is None or shots[i][2] > shots[best][2]:
+                best = i
+            best_by_length[i] = best
+
+        return {
+            "shots": shots,
+            "shot_lengths": [round(shot[1] - shot[0], 3) for shot in shots],
+            "best_by_length": best_by_length
+        }
+
+    def select_window(self, analysis: Dict, duration: float) -> Optional[float]:
+        """Return the start time of the best cut-free window, or None"""
+        lengths = analysis.get("shot_lengths") or []
+        if not lengths:
+            return None
+
+        # Prefer a shot with breathing room on both sides, then any long-enough shot
+        for needed in (duration + 2 * self.cut_margin, duration):
+            i = bisect_left(lengths, needed)
+            if i < len(lengths):
+                break
+        else:
+            return None
+
+        start, end, _, peak = analysis["shots"][analysis["best_by_length"][i]]
+        margin = min(self.cut_margin, max(0.0, (end - start - duration) / 2))
+
+        # Centre the window on the shot's peak, clamped inside the shot
+        window_start = peak - duration / 2
+        window_start = max(start + margin, min(window_start, end - margin - duration))
+        return round(window_start, 3)
+
+
+class FootageIndex:
+    # One shared index per cache directory so concurrent jobs see the same data
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_cut_bytes: int = 1024 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.cuts_dir = os.path.join(cache_dir, "cuts")
+        self.max_cut_bytes = max_cut_bytes
+        self.index_file = os.path.join(cache_dir, "footage_index.json")
+        self.analyzer = FootageAnalyzer()
+        self.lock = threading.RLock()
+        self.load_index()
+
+    @classmethod
+    def for_clip(cls, video_path: str) -> "FootageIndex":
+        """Get the shared index that lives next to a cached clip"""
+        return cls.for_dir(os.path.dirname(os.path.abspath(video_path)))
+
+    @classmethod
+    def for_dir(cls, cache_dir: str) -> "FootageIndex":
+        """Get the shared index for a cache directory"""
+        cache_dir = os.path.abspath(cache_dir)
+        with cls._instances_lock:
+            if cache_dir not in cls._instances:
+                cls._instances[cache_dir] = cls(cache_dir)
+            return cls._instances[cache_dir]
+
+    def load_index(self):
+        """Load footage index from disk"""
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r') as f:
+                self.entries = json.load(f)
+        else:
+            self.entries = {}
+
+    def save_index(self):
+        """Save footage index (merged with entries other processes wrote meanwhile)"""
+        with self.lock:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    on_disk = json.load(f)
+                for key, entry in self.entries.items():
+                    on_disk[key] = {**on_disk.get(key, {}), **entry}
+                self.entries = on_disk
+
+            # Unique per writer - parallel render workers save into the same cache
+            tmp_file = f"{self.index_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_file, self.index_file)
+
+    def key_for(self, video_path: str) -> str:
+        # Keyed by file name so the index survives moving the cache folder
+        return os.path.basename(video_path)
+
+    def get(self, video_path: str) -> Dict:
+        """Get the index entry for a clip (empty dict if unknown)"""
+        with self.lock:
+            return self.entries.get(self.key_for(video_path), {})
+
+    def update(self, video_path: str, **fields):
+        """Merge fields into a clip's entry and persist"""
+        with self.lock:
+            entry = self.entries.setdefault(self.key_for(video_path), {})
+            entry.update(fields)
+            self.save_index()
+
+    def content_hash(self, video_path: str, sample_size: int = 64 * 1024) -> str:
+        """Fast content hash: file size plus chunks sampled from start, middle and end"""
+        size = os.path.getsize(video_path)
+        digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+
+        with open(video_path, 'rb') as f:
+            for offset in (0, max(0, size // 2 - sample_size // 2), max(0, size - sample_size)):
+                f.seek(offset)
+                digest.update(f.read(sample_size))
+
+        return digest.hexdigest()
+
+    def find_by(self, field: str, value: str) -> Optional[str]:
+        """Path of an existing cached file whose entry has field == value"""
+        with self.lock:
+            for key, entry in self.entries.items():
+                if entry.get(field) == value:
+                    path = os.path.join(self.cache_dir, key)
+                    if os.path.exists(path):
+                        return path
+        return None
+
+    def register_content(self, video_path: str, identity: Optional[str] = None) -> str:
+        """
+        Record a freshly downloaded file's identity and content hash.
+        If identical content is already cached, the new file is replaced by a
+        hardlink to it (or dropped in favour of the existing file where
+        hardlinks aren't supported). Returns the path to use.
+        """
+        content_hash = self.content_hash(video_path)
+        existing = self.find_by("content_hash", content_hash)
+
+        if existing and os.path.abspath(existing) != os.path.abspath(video_path):
+            tmp_link = video_path + ".link"
+            try:
+                os.link(existing, tmp_link)
+                os.replace(tmp_link, video_path)
+                print(f"🔗 Deduplicated {self.key_for(video_path)} -> {self.key_for(existing)}")
+            except OSError:
+                if os.path.exists(tmp_link):
+                    os.remove(tmp_link)
+                os.remove(video_path)
+                print(f"🔗 Reusing {self.key_for(existing)} for duplicate download")
+                video_path = existing
+
+            # Share the one-time analysis with the duplicate
+            known = {k: v for k, v in self.get(existing).items() if k in ("analysis", "keyframes")}
+            if known:
+                self.update(video_path, **known)
+
+        fields = {"content_hash": content_hash}
+        if identity:
+            fields["identity"] = identity
+        self.update(video_path, **fields)
+        return video_path
+
+    def ingest(self, video_path: str):
+        """Run every one-time per-clip pass (called when a clip enters the cache)"""
+        self.ensure_analysis(video_path)
+        self.ensure_keyframes(video_path)
+
+    def ensure_analysis(self, video_path: str) -> Optional[Dict]:
+        """Run the one-time analysis pass for a clip if it hasn't been done"""
+        analysis = self.get(video_path).get("analysis")
+        if analysis:
+            return analysis
+
+        print(f"🔬 Analyzing footage: {os.path.basename(video_path)}")
+        analysis = self.analyzer.analyze(video_path)
+        if analysis:
+            self.update(video_path, analysis=analysis)
+            print(f"✅ Analysis stored: {len(analysis['cuts'])} cuts, "
+                  f"{len(analysis['shots'])} shots")
+        return analysis
+
+    def best_window(self, video_path: str, duration: float) -> Optional[float]:
+        """Start time of the best window of `duration` seconds (None if not indexed)"""
+        analysis = self.get(video_path).get("analysis")
+        if not analysis:
+            return None
+        return self.analyzer.select_window(analysis, duration)
+
+    def ensure_keyframes(self, video_path: str) -> List[float]:
+        """Probe and store the keyframe (GOP) index for a clip"""
+        entry = self.get(video_path)
+        if "keyframes" in entry:
+            return entry["keyframes"]
+
+        keyframes = self.analyzer.probe_keyframes(video_path)
+        if keyframes is None:
+            # The probe itself failed - leave it unrecorded so a later ingest retries
+            return []
+
+        # An empty list is stored too, so clips without usable keyframes aren't re-probed
+        self.update(video_path, keyframes=keyframes)
+        return keyframes
+
+    def random_cut_start(self, video_path: str, cut_duration: float,
+                         clip_duration: float, rng: Optional[random.Random] = None) -> Optional[float]:
+        """Pick a random keyframe that still leaves room for a full cut (from rng, else the random module)"""
+        keyframes = self.get(video_path).get("keyframes")
+        if not keyframes:
+            return None
+        end = bisect_left(keyframes, clip_duration - cut_duration + 1e-3)
+        if end == 0:
+            return None
+        return keyframes[(rng or random).randrange(end)]
+
+    def extract_cut(self, video_path: str, start: float, duration: float) -> Optional[str]:
+        """
+        Stream-copy a keyframe-aligned cut into its own small file.
+        Starting exactly on a keyframe means no decode-from-far-back, and the
+        reader then only ever reads the cut sequentially from frame 0.
+        """
+        os.makedirs(self.cuts_dir, exist_ok=True)
+
+        stem = os.path.splitext(self.key_for(video_path))[0]
+        cut_path = os.path.join(
+            self.cuts_dir, f"{stem}_{int(start * 1000)}_{int(duration * 1000)}.mp4"
+        )
+        if os.path.exists(cut_path):
+            try:
+                # Touch so eviction sees this cut as recently used
+                os.utime(cut_path, None)
+                return cut_path
+            except OSError:
+                pass  # Evicted in the meantime - cut it again
+
+        # Unique per writer, so concurrent jobs cutting the same window never share a file
+        tmp_path = f"{cut_path}.{os.getpid()}.{threading.get_ident()}.part"
+        cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+               '-ss', f"{start:.3f}", '-i', video_path, '-t', f"{duration:.3f}",
+               '-map', '0:v:0', '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+               '-f', 'mp4', tmp_path]
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE, timeout=60)
+            os.replace(tmp_path, cut_path)
+            self.evict_cuts(keep=cut_path)
+            return cut_path
+        except Exception as e:
+            print(f"❌ Could not extract cut from {os.path.basename(video_path)}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def evict_cuts(self, keep: Optional[str] = None):
+        """Drop least recently used cuts (never keep) until the cuts folder fits in max_cut_bytes"""
+        with self.lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cuts_dir):
+                path = os.path.join(self.cuts_dir, name)
+                if not name.endswith('.mp4') or path == keep:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                    used = os.path.getmtime(path)
+                except OSError:
+                    continue
+                entries.append((used, size, path))
+                total += size
+
+            for used, size, path in sorted(entries):
+                if total <= self.max_cut_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue  # Still open (Windows) - try again next time
+                total -= size
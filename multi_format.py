@@ -0,0 +1,79 @@
+# File: C:\New Project\viral-ai-content\multi_format.py
+"""
+Multi-Format Output for Viral AI Content
+Footage, grading and transitions are composed once, without any text, on a
+canvas that contains every output format; each format is a crop/scale
+branch of that master with its own text overlays and captions laid out at
+the format's size on top. Branches read a shared one-frame cache, so the
+master is decoded and composited once per timestamp no matter how many
+formats are encoded in the same pass
+"""
+
+from moviepy.editor import VideoClip, VideoFileClip
+
+from camera_moves import ZoomWindow
+
+
+def master_canvas(sizes):
+    """Smallest canvas every (width, height) fits in at 1:1 (1080x1920 + 1920x1080 -> 1920x1920)"""
+    return max(w for w, h in sizes), max(h for w, h in sizes)
+
+
+class SharedFrames:
+    """Master clip frames, cached for the most recent timestamp"""
+
+    def __init__(self, clip):
+        self.clip = clip
+        self.duration = clip.duration
+        self.size = tuple(clip.size)
+        self.t = None
+        self.frame = None
+
+    def get_frame(self, t):
+        if t != self.t:
+            self.frame = self.clip.get_frame(t)
+            self.t = t
+        return self.frame
+
+
+def format_branch(shared, width, height, focus=(0.5, 0.5)):
+    """
+    width x height background cut from the master: the largest window with
+    the format's aspect ratio (placed by focus), scaled to size if needed.
+    The master carries no text, so nothing laid out for a format is cropped.
+    """
+    master_w, master_h = shared.size
+
+    if max(width / master_w, height / master_h) == 1:
+        # Exact crop - a view into the master frame, no resampling
+        left = int((master_w - width) * focus[0])
+        top = int((master_h - height) * focus[1])
+
+        def make_frame(t):
+            return shared.get_frame(t)[top:top + height, left:left + width]
+    else:
+        window = ZoomWindow(width, height, focus=focus)
+
+        def make_frame(t):
+            return window.zoom_frame(shared.get_frame(t), t)
+
+    return VideoClip(make_frame, duration=shared.duration)
+
+
+class FootageReaders:
+    """Footage files opened for one composition, closed together when the job is done"""
+
+    def __init__(self):
+        self.clips = []
+
+    def open(self, path):
+        """A new VideoFileClip for path (each use gets its own reader)"""
+        clip = VideoFileClip(path)
+        self.clips.append(clip)
+        return clip
+
+    def close(self):
+        """Close every reader opened so far"""
+        for clip in self.clips:
+            clip.close()
+        self.clips = []
@@ -0,0 +1,124 @@
+# File: C:\New Project\viral-ai-content\parallel_render.py
+"""
+Parallel Chunked Rendering for Viral AI Content
+Splits a timeline into frame-aligned chunks (segment boundaries, long
+segments sliced), renders them in worker processes with identical encoder
+settings, then joins them with the ffmpeg concat demuxer (stream copy) and
+muxes the voiceover. Each worker builds only the part of the timeline its
+chunk covers
+"""
+
+import os
+import copy
+import math
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from moviepy.config import get_setting
+
+from video_encoder import PipeEncoder
+
+
+def frame_count(duration, fps):
+    """Frames moviepy writes for a clip of this duration (len(arange(0, duration, 1/fps)))"""
+    return len(np.arange(0, duration, 1.0 / fps))
+
+
+def plan_chunks(boundaries, duration, fps, max_chunk_seconds=8.0):
+    """
+    Frame ranges [(first, last), ...] covering the timeline. Chunks start at
+    segment boundaries; segments longer than max_chunk_seconds are sliced.
+    """
+    total = frame_count(duration, fps)
+    cuts = sorted({0, total} | {min(total, int(round(b * fps))) for b in boundaries})
+    max_frames = max(1, int(max_chunk_seconds * fps))
+
+    chunks = []
+    for first, last in zip(cuts, cuts[1:]):
+        if last <= first:
+            continue
+        pieces = math.ceil((last - first) / max_frames)
+        step = math.ceil((last - first) / pieces)
+        for start in range(first, last, step):
+            chunks.append((start, min(last, start + step)))
+    return chunks
+
+
+def render_chunk(job):
+    """Worker: build the part of the timeline covering frames [first, last) and encode it to job['path']"""
+    fps = job['fps']
+    first, last = job['frames']
+    clip, clip_start = job['builder'](*job['args'], window=(first / fps, last / fps))
+
+    # Half a frame short so exactly (last - first) frames are written
+    chunk = (clip.subclip(first / fps - clip_start, min(clip.duration, last / fps - clip_start))
+             .set_duration((last - first - 0.5) / fps)
+             .without_audio())
+
+    job['encoder'].encode(chunk, job['path'], fps)
+    clip.close()
+    return job['path']
+
+
+def concat_chunks(chunk_paths, output_path, audio_path=None, audio_codec='aac'):
+    """Join encoded chunks without re-encoding and mux the audio track"""
+    list_path = os.path.join(os.path.dirname(os.path.abspath(chunk_paths[0])), 'chunks.txt')
+    with open(list_path, 'w') as f:
+        for path in chunk_paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+           '-f', 'concat', '-safe', '0', '-i', list_path]
+    if audio_path:
+        cmd += ['-i', audio_path, '-map', '0:v:0', '-map', '1:a:0', '-c:a', audio_codec]
+    cmd += ['-c:v', 'copy', '-movflags', '+faststart', output_path]
+
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return output_path
+
+
+def render_parallel(builder, args, boundaries, duration, output_path, fps=30,
+                    workers=None, audio_path=None, encoder=None,
+                    max_chunk_seconds=8.0):
+    """
+    Render a timeline to output_path using `workers` processes. builder is a
+    picklable, module-level function: builder(*args, window=(start, end))
+    returns (clip, clip_start), a clip covering at least [start, end) of the
+    timeline and the timeline time it starts at. Every process must build the
+    same timeline, so builders take all their random choices from args (e.g. a
+    precomputed plan) or seeded generators, never the global random state.
+    Every chunk is encoded with the same encoder settings so the stream copy
+    concat is valid.
+    """
+    encoder = encoder or PipeEncoder()
+    workers = workers or os.cpu_count() or 1
+    chunks = plan_chunks(boundaries, duration, fps, max_chunk_seconds)
+
+    chunk_dir = tempfile.mkdtemp(prefix='render_chunks_')
+    # Split encoder threads between the workers, unless a thread count was set explicitly
+    encoder = copy.copy(encoder)
+    if not encoder.threads:
+        encoder.threads = max(1, (os.cpu_count() or 1) // workers)
+    jobs = [{
+        'builder': builder,
+        'args': args,
+        'fps': fps,
+        'frames': frames,
+        'path': os.path.join(chunk_dir, f"chunk_{i:04d}.mp4"),
+        'encoder': encoder,
+    } for i, frames in enumerate(chunks)]
+
+    try:
+        # spawn: workers rebuild the timeline instead of inheriting ffmpeg readers/threads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+            chunk_paths = list(pool.map(render_chunk, jobs))
+
+        return concat_chunks(chunk_paths, output_path, audio_path)
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
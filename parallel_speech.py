@@ -0,0 +1,123 @@
+# File: C:\New Project\viral-ai-content\parallel_speech.py
+"""
+Sentence-Parallel Speech for Viral AI Content
+Splits a voiceover into sentence/clause chunks, synthesizes them concurrently
+(bounded, each chunk cached on its own), decodes each to PCM and stitches
+them gaplessly: every chunk is trimmed to its spoken words and joined with a
+controlled pause. Chunk word timings are offset into one global table.
+"""
+
+import re
+import asyncio
+
+import numpy as np
+
+from audio_pcm import decode_pcm, encode_wav
+from speech_synthesis import SpeechResult, BACKENDS, get_backend_name
+from speech_cache import SpeechCache
+
+
+SAMPLE_RATE = 24000  # edge-tts native rate, mono
+
+
+def split_sentences(text, max_chars=200):
+    """Sentence chunks; sentences longer than max_chars are split at clause breaks"""
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?…])\s+', text.strip()) if s.strip()]
+
+    chunks = []
+    for sentence in sentences:
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ''
+        for clause in re.split(r'(?<=[,;:])\s+', sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}".strip()
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def stitch(chunks, results, sample_rate=SAMPLE_RATE, sentence_pause=0.35, clause_pause=0.15,
+           lead=0.05, tail=0.15, fade=0.005):
+    """
+    Join chunk results into one SpeechResult: each chunk is trimmed to
+    [first word - lead, last word + tail] and followed by a pause (longer
+    after a sentence than after a clause). Positions are counted in samples
+    so timings never drift.
+    """
+    fade_samples = int(fade * sample_rate)
+    ramp = np.linspace(0.0, 1.0, fade_samples, endpoint=False) if fade_samples else None
+
+    pieces = []
+    words = []
+    position = 0
+    for i, (text, speech) in enumerate(zip(chunks, results)):
+        pcm = decode_pcm(speech.audio, sample_rate)
+        if speech.words:
+            first = max(0, int((speech.words[0]['start'] - lead) * sample_rate))
+            last = min(len(pcm), int((speech.words[-1]['end'] + tail) * sample_rate))
+        else:
+            first, last = 0, len(pcm)
+        piece = pcm[first:last].astype(np.float32)
+
+        # Short fades at the cut points avoid clicks
+        if ramp is not None and len(piece) > 2 * fade_samples:
+            piece[:fade_samples] *= ramp
+            piece[-fade_samples:] *= ramp[::-1]
+
+        offset = (position - first) / sample_rate
+        for word in speech.words:
+            words.append({'text': word['text'], 'start': word['start'] + offset, 'end': word['end'] + offset})
+
+        pieces.append(piece.astype(np.int16))
+        position += len(piece)
+
+        if i < len(chunks) - 1:
+            pause = sentence_pause if text.rstrip()[-1:] in '.!?…' else clause_pause
+            silence = np.zeros(int(pause * sample_rate), dtype=np.int16)
+            pieces.append(silence)
+            position += len(silence)
+
+    samples = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+    return SpeechResult(encode_wav(samples, sample_rate), words, len(samples) / sample_rate,
+                        audio_format='wav')
+
+
+async def synthesize_parallel(text, voice, rate='+0%', pitch='+0Hz', backend='edge',
+                              workers=4, cache=None):
+    """
+    Sentence-parallel synthesis of text with at most `workers` requests in
+    flight. Each chunk goes through the speech cache (SpeechCache.for_dir()
+    unless cache=False), so edited scripts only re-synthesize changed sentences.
+    """
+    chunks = split_sentences(text)
+    if cache is None:
+        cache = SpeechCache.for_dir()
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def synthesize_chunk(chunk):
+        async with semaphore:
+            if cache:
+                return await cache.synthesize(chunk, voice, rate=rate, pitch=pitch, backend=backend)
+            return await BACKENDS[backend](chunk, voice, rate=rate, pitch=pitch)
+
+    results = await asyncio.gather(*(synthesize_chunk(chunk) for chunk in chunks))
+    print(f"🗣️ Synthesized {len(chunks)} chunks ({workers} at a time)")
+
+    # Decoding and stitching are CPU work - keep them off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, stitch, chunks, results)
+
+
+async def synthesize_speech(text, voice, rate='+0%', pitch='+0Hz', backend=None, workers=1):
+    """
+    Cached synthesis of the whole text, or sentence-parallel when workers > 1.
+    backend is a speech_synthesis.BACKENDS name (defaults to TTS_BACKEND, then 'edge').
+    """
+    backend = get_backend_name(backend)
+    if workers > 1:
+        return await synthesize_parallel(text, voice, rate=rate, pitch=pitch, backend=backend, workers=workers)
+    return await SpeechCache.for_dir().synthesize(text, voice, rate=rate, pitch=pitch, backend=backend)
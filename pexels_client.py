@@ -0,0 +1,259 @@
+# File: C:\New Project\viral-ai-content\pexels_client.py
+"""
+Shared Pexels Client for Viral AI Content
+One process-wide client so concurrent jobs coalesce identical searches and
+downloads, respect Pexels rate limits and retry transient failures
+"""
+
+import os
+import time
+import random
+import threading
+import subprocess
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from moviepy.config import get_setting
+
+
+class TokenBucket:
+    """
+    Token bucket limiter paced at the Pexels hourly quota, hard-blocking when
+    the rate-limit headers say the quota is used up
+    """
+
+    def __init__(self, rate: float = 200 / 3600, capacity: float = 200):
+        # Pexels default quota is 200 requests/hour; a full hour's quota may go out as a burst
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request is allowed"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(min(wait, 5.0))
+
+    def update_from_headers(self, headers: Dict):
+        """
+        Block until X-Ratelimit-Reset once X-Ratelimit-Remaining reaches 0.
+        The reset is the end of the monthly window, so the remainder is not
+        spread over it - the refill rate stays at the hourly quota.
+        """
+        remaining = headers.get('X-Ratelimit-Remaining')
+        reset = headers.get('X-Ratelimit-Reset')
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining = int(remaining)
+            seconds_left = max(1.0, float(reset) - time.time())
+        except ValueError:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining <= 0:
+                # Quota exhausted - nothing goes out until the window resets
+                self.tokens = 0
+                self.blocked_until = now + seconds_left
+            else:
+                # Never burst past what the window has left
+                self.tokens = min(self.tokens, float(remaining))
+
+    def block_for(self, seconds: float):
+        """Stop issuing requests for a while (e.g. after a 429)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict = {}
+
+    def do(self, key, fn: Callable):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self.calls[key] = call
+
+        if not leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['event'].set()
+
+
+class PexelsClient:
+    # One client per API key, shared by every job in the process
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, api_key: str, max_retries: int = 4, backoff_base: float = 1.0):
+        self.headers = {"Authorization": api_key}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+        self.session = requests.Session()
+        self.limiter = TokenBucket()
+        self.searches = SingleFlight()
+        self.downloads = SingleFlight()
+
+    @classmethod
+    def shared(cls, api_key: str) -> "PexelsClient":
+        """Get the process-wide client for an API key"""
+        with cls._instances_lock:
+            if api_key not in cls._instances:
+                cls._instances[api_key] = cls(api_key)
+            return cls._instances[api_key]
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        if response is not None and response.headers.get('Retry-After'):
+            try:
+                return float(response.headers['Retry-After'])
+            except ValueError:
+                pass
+        return random.uniform(0, min(30.0, self.backoff_base * 2 ** attempt))
+
+    def _request(self, url: str, rate_limited: bool, **kwargs) -> requests.Response:
+        """GET with retry on connection errors, 429 and 5xx"""
+        for attempt in range(self.max_retries + 1):
+            if rate_limited:
+                self.limiter.acquire()
+
+            try:
+                response = self.session.get(url, timeout=30, **kwargs)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"⚠️ Pexels request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if rate_limited:
+                self.limiter.update_from_headers(response.headers)
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    return response
+                delay = self._backoff(attempt, response)
+                if response.status_code == 429:
+                    self.limiter.block_for(delay)
+                print(f"⚠️ Pexels returned {response.status_code}, retrying in {delay:.1f}s")
+                response.close()
+                time.sleep(delay)
+                continue
+
+            return response
+
+        return response
+
+    def get_json(self, url: str, params: Dict) -> Tuple[int, Optional[Dict]]:
+        """Rate-limited API GET; identical in-flight queries share one request"""
+        key = (url, tuple(sorted(params.items())))
+
+        def fetch():
+            response = self._request(url, rate_limited=True,
+                                     headers=self.headers, params=params)
+            if response.status_code == 200:
+                return response.status_code, response.json()
+            return response.status_code, None
+
+        return self.searches.do(key, fetch)
+
+    def download(self, url: str, file_path: str) -> Optional[str]:
+        """
+        Download a file once even if several jobs ask for it together.
+        Data goes to a .part file that is renamed into place, so no reader
+        ever sees a half-written video.
+        """
+        def fetch():
+            if os.path.exists(file_path):
+                return file_path
+
+            # Closing the streamed response returns its connection to the pool on every path
+            with self._request(url, rate_limited=False, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"❌ Download failed: {response.status_code}")
+                    return None
+
+                tmp_path = f"{file_path}.{threading.get_ident()}.part"
+                try:
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=1024 * 1024):
+                            f.write(chunk)
+                    os.replace(tmp_path, file_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            return file_path
+
+        return self.downloads.do(file_path, fetch)
+
+    def fetch_window(self, url: str, file_path: str, start: float, duration: float) -> Optional[str]:
+        """
+        Fetch only the bytes covering [start, start + duration] of a remote video.
+        ffmpeg input-seeks over HTTP (Range requests for the moov atom and the
+        needed span) and stream-copies the window into a small local file.
+        """
+        def fetch():
+            if os.path.exists(file_path):
+                return file_path
+
+            tmp_path = f"{file_path}.{threading.get_ident()}.part"
+            # -xerror: a failed range read must fail the fetch, not leave a stub file
+            cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error', '-xerror',
+                   '-ss', f"{start:.3f}", '-i', url, '-t', f"{duration:.3f}",
+                   '-map', '0:v:0', '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+                   '-movflags', '+faststart', '-f', 'mp4', tmp_path]
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE, timeout=120)
+                    os.replace(tmp_path, file_path)
+                    return file_path
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        print(f"❌ Window fetch failed: {e}")
+                        return None
+                    delay = self._backoff(attempt)
+                    print(f"⚠️ Window fetch failed, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+
+        return self.downloads.do(file_path, fetch)
@@ -0,0 +1,236 @@
+# File: C:\New Project\viral-ai-content\procedural_layers.py
+"""
+Procedural Layers for Viral AI Content
+Vectorized, cached generators for backgrounds and overlays that used to be
+drawn pixel-row by pixel-row with PIL on every frame
+"""
+
+import random
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+from moviepy.editor import ImageClip, VideoClip
+
+# Animation values are snapped to this many steps so frames can be memoized
+WAVE_STEPS = 4096
+
+
+@lru_cache(maxsize=2048)
+def _gradient_column(height, top, bottom, top_swing, bottom_swing, wave_step):
+    """One (H, 1, 3) uint8 column of the gradient for a quantized wave value"""
+    # Float64 like the per-row Python loops it replaces, so rows truncate to the same values
+    ratio = (np.arange(height, dtype=np.float64) / height).reshape(height, 1, 1)
+
+    # Two precomputed row ramps: the static gradient and how it moves with the wave
+    base_ramp = np.float64(top) * (1 - ratio) + np.float64(bottom) * ratio
+    swing_ramp = np.float64(top_swing) * (1 - ratio) + np.float64(bottom_swing) * ratio
+
+    column = base_ramp + swing_ramp * (wave_step / WAVE_STEPS)
+    column = np.clip(column, 0, 255).astype(np.uint8)
+    column.setflags(write=False)
+    return column
+
+
+class GradientBackground:
+    """
+    Vertical two-colour gradient whose end colours move linearly with a wave:
+    top = top + top_swing * wave(t), bottom = bottom + bottom_swing * wave(t)
+    """
+
+    def __init__(self, width, height, top, bottom, top_swing=(0, 0, 0), bottom_swing=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.top = tuple(top)
+        self.bottom = tuple(bottom)
+        self.top_swing = tuple(top_swing)
+        self.bottom_swing = tuple(bottom_swing)
+
+    def column(self, wave=0.0):
+        """Gradient column (H, 1, 3) for a wave value, memoized across jobs"""
+        wave_step = int(round(float(wave) * WAVE_STEPS))
+        return _gradient_column(self.height, self.top, self.bottom,
+                                self.top_swing, self.bottom_swing, wave_step)
+
+    def frame(self, wave=0.0):
+        """Full-size RGB frame for a wave value"""
+        # Nearest-neighbour widening of a 1px column is an exact, fast row fill
+        return cv2.resize(self.column(wave), (self.width, self.height),
+                          interpolation=cv2.INTER_NEAREST)
+
+    def clip(self, duration, wave=None):
+        """Animated background clip; wave(t) defaults to a static gradient"""
+        if wave is None:
+            return ImageClip(self.frame(0.0), duration=duration)
+        return VideoClip(lambda t: self.frame(wave(t)), duration=duration)
+
+
+class ParticleField:
+    """
+    Floating particles with positions/sizes precomputed once. Each frame only
+    stamps small sprites, adding light inside each particle's bounding box
+    (the particles are a lighten-only layer, they never darken the frame).
+    """
+
+    def __init__(self, width, height, density=50, speed=50, opacity=0.5, seed=42):
+        self.width = width
+        self.height = height
+        self.speed = speed
+
+        # Same draw order as the old per-frame random.seed(42) loop, without
+        # touching the global random state
+        rng = random.Random(seed)
+        xs, base_ys, sizes, levels = [], [], [], []
+        for _ in range(density):
+            xs.append(rng.randint(0, width))
+            base_ys.append(rng.randint(0, height))
+            sizes.append(rng.randint(1, 3))
+            levels.append(rng.randint(30, 100))
+
+        self.x = np.array(xs, dtype=np.int32)
+        self.base_y = np.array(base_ys, dtype=np.float32)
+        self.size = np.array(sizes, dtype=np.int32)
+        self.level = np.array(levels, dtype=np.float32)
+
+        # (2s+1, 2s+1, 1) alpha sprites with the layer opacity baked in
+        self.sprites = {size: self.make_sprite(size) * opacity for size in set(sizes)}
+
+    @staticmethod
+    def make_sprite(size):
+        """Filled circle mask matching PIL's ellipse at this radius"""
+        img = Image.new('L', (2 * size + 1, 2 * size + 1), 0)
+        ImageDraw.Draw(img).ellipse([0, 0, 2 * size, 2 * size], fill=255)
+        return (np.asarray(img, dtype=np.float32) / 255.0)[:, :, None]
+
+    def stamp(self, frame, t):
+        """Draw the particles for time t onto frame (in place) and return it"""
+        # Floored like PIL does with fractional ellipse coordinates
+        ys = np.floor((self.base_y - t * self.speed) % self.height).astype(np.int32)
+
+        for x, y, size, level in zip(self.x, ys, self.size, self.level):
+            alpha = self.sprites[size]
+            x0, y0 = x - size, y - size
+            x1, y1 = x0 + alpha.shape[1], y0 + alpha.shape[0]
+
+            # Clip the sprite against the frame edges
+            fx0, fy0 = max(0, x0), max(0, y0)
+            fx1, fy1 = min(frame.shape[1], x1), min(frame.shape[0], y1)
+            if fx0 >= fx1 or fy0 >= fy1:
+                continue
+
+            a = alpha[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0]
+            region = frame[fy0:fy1, fx0:fx1]
+            region[:] = np.minimum(region + level * a, 255)
+
+        return frame
+
+    def apply(self, clip, copy=True):
+        """Clip with particles stamped on; copy=False when frames are fresh arrays"""
+        def stamp_frame(get_frame, t):
+            frame = get_frame(t)
+            return self.stamp(np.array(frame) if copy else frame, t)
+
+        return clip.fl(stamp_frame)
+
+
+@lru_cache(maxsize=8)
+def _grain_bank(intensity, opacity, tile_size, bank_size, seed):
+    """Pre-generated uint8 grain tiles, already scaled by the layer opacity"""
+    rng = np.random.default_rng(seed)
+    bank = rng.random((bank_size, tile_size, tile_size, 3), dtype=np.float32)
+    bank = (bank * intensity * 255).astype(np.uint8)
+    bank = (bank * opacity).astype(np.uint8)
+    bank.setflags(write=False)
+    return bank
+
+
+class FilmGrain:
+    """
+    Film grain from a shared bank of uint8 tiles. Each frame picks a tile,
+    offset and rotation, dims the frame through a LUT and adds the tiled
+    grain in place - no full-frame float noise per frame.
+    """
+
+    def __init__(self, intensity=0.1, opacity=0.2, fps=30, tile_size=256, bank_size=8, seed=7):
+        self.fps = fps
+        self.tile_size = tile_size
+        self.bank = _grain_bank(intensity, opacity, tile_size, bank_size, seed)
+
+        # The grain layer used to be composited at `opacity`, which also dimmed
+        # the frame underneath by (1 - opacity)
+        self.dim_lut = (np.arange(256) * (1 - opacity)).astype(np.uint8)
+
+    def tile_for(self, t):
+        """Tile for a frame: bank index, rotation and offset vary per frame number"""
+        n = int(round(t * self.fps))
+        tile = self.bank[n % len(self.bank)]
+        tile = np.rot90(tile, (n // len(self.bank)) % 4)
+
+        # Cheap deterministic per-frame offset so consecutive uses don't line up
+        offset_x = (n * 7919) % self.tile_size
+        offset_y = (n * 104729) % self.tile_size
+        return np.roll(tile, (offset_y, offset_x), axis=(0, 1))
+
+    def grain_frame(self, frame, t):
+        """Return frame with grain applied (input frame is not modified)"""
+        out = cv2.LUT(np.ascontiguousarray(frame, dtype=np.uint8), self.dim_lut)
+        tile = self.tile_for(t)
+        ts = self.tile_size
+        height, width = out.shape[:2]
+
+        # Dimmed max + grain max never exceeds 255, so a plain uint8 add is safe
+        for y in range(0, height, ts):
+            for x in range(0, width, ts):
+                region = out[y:y + ts, x:x + ts]
+                np.add(region, tile[:region.shape[0], :region.shape[1]], out=region)
+
+        return out
+
+    def apply(self, clip):
+        """Clip with film grain"""
+        return clip.fl(lambda get_frame, t: self.grain_frame(get_frame(t), t))
+
+
+@lru_cache(maxsize=16)
+def _vignette_gain(width, height, strength, shape):
+    """(H, W, 3) uint8 gain map (255 = unchanged) for a radial falloff"""
+    cx, cy = width / 2, height / 2
+    y, x = np.ogrid[0:height, 0:width]
+    dx = (x + 0.5 - cx).astype(np.float32)
+    dy = (y + 0.5 - cy).astype(np.float32)
+
+    if shape == 'ellipse':
+        # Follows the frame's aspect ratio, reaching full strength at the edges
+        radius = np.sqrt((dx / cx) ** 2 + (dy / cy) ** 2)
+    else:
+        # Round falloff, reaching full strength in the corners
+        radius = np.sqrt(dx ** 2 + dy ** 2) / np.sqrt(cx ** 2 + cy ** 2)
+
+    gain = 1.0 - strength * np.clip(radius, 0.0, 1.0) ** 2
+    gain = np.rint(gain * 255).astype(np.uint8)
+    gain = np.repeat(gain[:, :, None], 3, axis=2)
+    gain.setflags(write=False)
+    return gain
+
+
+class Vignette:
+    """Cinematic vignette applied as a single multiply with a cached gain map"""
+
+    def __init__(self, strength=0.6, shape='circle'):
+        self.strength = strength
+        self.shape = shape
+
+    def gain_map(self, width, height):
+        """Gain map for a resolution, computed once per (resolution, strength, shape)"""
+        return _vignette_gain(width, height, round(float(self.strength), 3), self.shape)
+
+    def vignette_frame(self, frame):
+        """Return frame darkened towards the edges"""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        gain = self.gain_map(frame.shape[1], frame.shape[0])
+        return cv2.multiply(frame, gain, scale=1 / 255.0)
+
+    def apply(self, clip):
+        """Clip with the vignette multiplied into every frame"""
+        return clip.fl_image(self.vignette_frame)
@@ -0,0 +1,61 @@
+# File: C:\New Project\viral-ai-content\render_profiles.py
+"""
+Render Profiles for Viral AI Content
+'full' is the publish render. 'draft' is a quick QA preview for checking
+pacing and text: half resolution, 15 fps, ultrafast encode, SD footage and
+no grain or particles. Encoder settings can be overridden per run from the
+environment (see encoder_settings)
+"""
+
+import os
+
+
+RENDER_PROFILES = {
+    'full': {
+        'scale': 1.0,             # Output size relative to the 1080x1920 layout
+        'fps': 30,
+        'preset': 'medium',
+        'crf': 23,
+        'tune': None,             # x264 tune (e.g. film); None = x264's default
+        'gop': None,              # Keyframe interval in frames; None = x264's default
+        'threads': 0,             # Encoder threads; 0 = let ffmpeg pick
+        'footage_quality': 'hd',  # Stock rendition to download
+        'grain': True,
+        'particles': True,
+    },
+    'draft': {
+        'scale': 0.5,
+        'fps': 15,
+        'preset': 'ultrafast',
+        'crf': 30,
+        'tune': None,
+        'gop': None,
+        'threads': 0,
+        'footage_quality': 'sd',
+        'grain': False,
+        'particles': False,
+    },
+}
+
+
+def get_profile(name=None):
+    """Profile settings by name (defaults to RENDER_PROFILE, then 'full')"""
+    name = name or os.getenv('RENDER_PROFILE', 'full')
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile: {name} (expected one of {', '.join(RENDER_PROFILES)})")
+    return dict(RENDER_PROFILES[name], name=name)
+
+
+def encoder_settings(profile):
+    """
+    x264 settings for get_encoder() from a profile; VIDEO_PRESET, VIDEO_CRF,
+    VIDEO_TUNE, VIDEO_GOP and VIDEO_THREADS override the profile's values
+    """
+    gop = os.getenv('VIDEO_GOP', profile['gop'])
+    return {
+        'preset': os.getenv('VIDEO_PRESET', profile['preset']),
+        'crf': int(os.getenv('VIDEO_CRF', profile['crf'])),
+        'tune': os.getenv('VIDEO_TUNE', profile['tune']) or None,
+        'gop': int(gop) if gop else None,
+        'threads': int(os.getenv('VIDEO_THREADS', profile['threads'])),
+    }
@@ -0,0 +1,126 @@
+# File: C:\New Project\viral-ai-content\speech_cache.py
+"""
+Speech Cache for Viral AI Content
+Content-addressed on-disk cache of synthesized speech. Entries are keyed by
+(normalized text, voice, rate, pitch, backend) and hold the audio bytes plus
+the word timing table, so a repeat synthesis (retry, re-render, another
+format) is a local file read. Least recently used entries are evicted once
+the cache grows past max_bytes.
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Dict, Optional
+
+from speech_synthesis import SpeechResult, BACKENDS
+
+
+DEFAULT_CACHE_DIR = os.getenv('TTS_CACHE_DIR', r"C:\New Project\viral-ai-content\assets\tts_cache")
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace differences don't change the speech"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class SpeechCache:
+    # One instance (and lock) per cache directory, shared by every job in the process
+    _instances: Dict[str, "SpeechCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def for_dir(cls, cache_dir: Optional[str] = None) -> "SpeechCache":
+        """Shared cache for a directory (defaults to TTS_CACHE_DIR)"""
+        cache_dir = os.path.abspath(cache_dir or DEFAULT_CACHE_DIR)
+        with cls._instances_lock:
+            if cache_dir not in cls._instances:
+                cls._instances[cache_dir] = cls(cache_dir)
+            return cls._instances[cache_dir]
+
+    def key(self, text: str, voice: str, rate: str = '+0%', pitch: str = '+0Hz',
+            backend: str = 'edge') -> str:
+        identity = json.dumps([normalize_text(text), voice, rate, pitch, backend])
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def paths(self, key: str):
+        return os.path.join(self.cache_dir, f"{key}.audio"), os.path.join(self.cache_dir, f"{key}.json")
+
+    async def synthesize(self, text: str, voice: str, rate: str = '+0%', pitch: str = '+0Hz',
+                         backend: str = 'edge') -> SpeechResult:
+        """Cached speech for these settings, synthesizing (and storing) it on a miss"""
+        key = self.key(text, voice, rate, pitch, backend)
+        speech = self.get(key)
+        if speech is not None:
+            print(f"📦 Using cached speech ({len(speech.words)} words, {speech.duration:.1f}s)")
+            return speech
+
+        speech = await BACKENDS[backend](text, voice, rate=rate, pitch=pitch)
+        self.put(key, speech)
+        return speech
+
+    def get(self, key: str) -> Optional[SpeechResult]:
+        audio_path, meta_path = self.paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(audio_path, 'rb') as f:
+                audio = f.read()
+            # Touch so eviction sees this entry as recently used
+            os.utime(meta_path, None)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return SpeechResult(audio, meta['words'], meta['duration'], meta.get('audio_format', 'mp3'))
+
+    def put(self, key: str, speech: SpeechResult):
+        audio_path, meta_path = self.paths(key)
+        meta = {'words': speech.words, 'duration': speech.duration, 'audio_format': speech.audio_format}
+
+        # Audio first, metadata last: an entry only counts once its .json exists
+        for path, mode, data in ((audio_path, 'wb', speech.audio), (meta_path, 'w', json.dumps(meta))):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        with self.lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.json'):
+                    continue
+                audio_path, meta_path = self.paths(name[:-5])
+                try:
+                    size = os.path.getsize(meta_path) + os.path.getsize(audio_path)
+                    used = os.path.getmtime(meta_path)
+                except OSError:
+                    continue
+                entries.append((used, size, audio_path, meta_path))
+                total += size
+
+            for used, size, audio_path, meta_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                for path in (meta_path, audio_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
@@ -0,0 +1,209 @@
+# File: C:\New Project\viral-ai-content\speech_synthesis.py
+"""
+Speech Synthesis for Viral AI Content
+Interchangeable TTS backends (BACKENDS, selected by name or TTS_BACKEND):
+- edge: one pass over edge-tts Communicate.stream(); the MP3 bytes and the
+  WordBoundary events are collected together, giving exact per-word timings
+  and the audio duration without decoding the audio
+- espeak: local espeak-ng, word timings estimated from the text
+- tone: offline synthetic speech - one tone burst per word at a fixed pace,
+  so timings are exact and runs are deterministic (CI, load tests, benchmarks)
+"""
+
+import os
+import re
+import zlib
+import struct
+import asyncio
+
+import edge_tts
+import numpy as np
+from moviepy.audio.AudioClip import AudioArrayClip
+
+from audio_pcm import decode_pcm, encode_wav
+
+
+# WordBoundary offsets/durations are in 100 ns ticks
+TICKS_PER_SECOND = 10_000_000
+
+# edge-tts streams constant-bitrate "audio-24khz-48kbitrate-mono-mp3"
+EDGE_MP3_BYTES_PER_SECOND = 48000 / 8
+
+
+class SpeechResult:
+    """
+    Synthesized speech: encoded audio bytes plus a word timing table
+    (words = [{'text', 'start', 'end'}, ...] in seconds, in spoken order)
+    """
+
+    def __init__(self, audio, words, duration, audio_format='mp3'):
+        self.audio = audio
+        self.words = words
+        self.duration = duration
+        self.audio_format = audio_format
+        self.decoded = {}
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.audio)
+        return path
+
+    def pcm(self, sample_rate=44100):
+        """Stereo int16 samples, decoded from the audio bytes once per sample rate"""
+        if sample_rate not in self.decoded:
+            self.decoded[sample_rate] = decode_pcm(self.audio, sample_rate, channels=2)
+        return self.decoded[sample_rate]
+
+    def audio_clip(self, sample_rate=44100):
+        """In-memory moviepy audio clip over the decoded samples - no file, no ffmpeg reader"""
+        clip = AudioArrayClip(self.pcm(sample_rate) / 32768.0, fps=sample_rate)
+        # AudioArrayClip leaves end unset, which composites need to work out their duration
+        return clip.set_duration(clip.duration)
+
+
+async def synthesize_edge(text, voice, rate='+0%', pitch='+0Hz'):
+    """Synthesize text with edge-tts; returns a SpeechResult"""
+    communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch, boundary='WordBoundary')
+
+    chunks = []
+    words = []
+    async for chunk in communicate.stream():
+        if chunk['type'] == 'audio':
+            chunks.append(chunk['data'])
+        elif chunk['type'] == 'WordBoundary':
+            start = chunk['offset'] / TICKS_PER_SECOND
+            words.append({
+                'text': chunk['text'],
+                'start': start,
+                'end': start + chunk['duration'] / TICKS_PER_SECOND,
+            })
+
+    audio = b''.join(chunks)
+    # CBR stream, so the byte count gives the duration (trailing silence included)
+    duration = len(audio) / EDGE_MP3_BYTES_PER_SECOND
+    if words:
+        duration = max(duration, words[-1]['end'])
+    return SpeechResult(audio, words, duration)
+
+
+def parse_rate(rate):
+    """edge-tts rate ('-10%') -> speed factor (0.9)"""
+    return max(0.1, 1 + int(rate.rstrip('%')) / 100)
+
+
+def parse_pitch(pitch):
+    """edge-tts pitch ('+5Hz') -> Hz offset (5)"""
+    return int(pitch[:-2] if pitch.endswith('Hz') else pitch)
+
+
+def pace_words(text, seconds_per_char, speed=1.0, start=0.0):
+    """
+    Word timing table for text spoken at a constant pace: each word lasts in
+    proportion to its letters, with pauses after clauses and sentences
+    (matching the stitching pauses in parallel_speech)
+    """
+    words = []
+    t = start
+    for token in text.split():
+        word = token.strip('.,;:!?…"\'()[]')
+        if not word:
+            continue
+        letters = len(re.sub(r'\W', '', word)) or 1
+        end = t + (0.04 + letters * seconds_per_char) / speed
+        words.append({'text': word, 'start': t, 'end': end})
+
+        ending = token.rstrip('"\')]')[-1:]
+        if ending in '.!?…':
+            pause = 0.35
+        elif ending in ',;:':
+            pause = 0.15
+        else:
+            pause = 0.05
+        t = end + pause / speed
+    return words
+
+
+TONE_SAMPLE_RATE = 24000
+
+
+async def synthesize_tone(text, voice, rate='+0%', pitch='+0Hz'):
+    """
+    Offline stand-in for a TTS service: a short tone per word, laid out by
+    pace_words. Same input -> same audio and timings, with no network.
+    """
+    speed = parse_rate(rate)
+    words = pace_words(text, 0.055, speed=speed, start=0.1)
+    duration = (words[-1]['end'] if words else 0) + 0.3
+
+    # Each voice gets its own base frequency, so voices stay distinguishable
+    frequency = 110 + zlib.crc32(voice.encode('utf-8')) % 80 + parse_pitch(pitch)
+    fade = int(0.01 * TONE_SAMPLE_RATE)
+
+    samples = np.zeros(int(round(duration * TONE_SAMPLE_RATE)), dtype=np.float32)
+    for i, word in enumerate(words):
+        first = int(word['start'] * TONE_SAMPLE_RATE)
+        last = int(word['end'] * TONE_SAMPLE_RATE)
+        n = np.arange(last - first)
+        burst = np.sin(2 * np.pi * frequency * (1 + 0.06 * (i % 3)) * n / TONE_SAMPLE_RATE)
+        # Short fades in and out, so bursts don't click
+        envelope = np.minimum(1.0, np.minimum(n, n[::-1]) / fade)
+        samples[first:last] = 0.25 * burst * envelope
+
+    audio = encode_wav((samples * 32767).astype(np.int16), TONE_SAMPLE_RATE)
+    return SpeechResult(audio, words, duration, audio_format='wav')
+
+
+ESPEAK_BINARY = os.getenv('ESPEAK_BINARY', 'espeak-ng')
+
+# espeak-ng voices for edge-tts locales; other locales use the bare language
+ESPEAK_VOICES = {
+    'en-GB': 'en-gb',
+    'en-US': 'en-us',
+}
+
+
+async def synthesize_espeak(text, voice, rate='+0%', pitch='+0Hz'):
+    """
+    Synthesize text with a local espeak-ng. espeak-ng reports no word
+    boundaries, so word timings are pace_words estimates fitted to the audio.
+    """
+    locale = '-'.join(voice.split('-')[:2])
+    cmd = [ESPEAK_BINARY, '-v', ESPEAK_VOICES.get(locale, locale.split('-')[0].lower()),
+           '-s', str(int(175 * parse_rate(rate))),
+           '-p', str(min(99, max(0, 50 + parse_pitch(pitch) // 2))),
+           '--stdout', '--stdin']
+    try:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdin=asyncio.subprocess.PIPE,
+                                                    stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.PIPE)
+    except FileNotFoundError:
+        raise IOError(f"espeak-ng not found ({ESPEAK_BINARY}) - install it or use the 'tone' backend")
+    audio, errors = await proc.communicate(text.encode('utf-8'))
+    if proc.returncode != 0:
+        raise IOError(f"espeak-ng failed: {errors.decode(errors='ignore')}")
+
+    # 16-bit mono WAV; the streamed header doesn't carry a valid data size
+    sample_rate = struct.unpack('<I', audio[24:28])[0]
+    duration = (len(audio) - 44) / (2 * sample_rate)
+
+    words = pace_words(text, 0.06)
+    if words:
+        fit = duration / words[-1]['end']
+        words = [{'text': w['text'], 'start': w['start'] * fit, 'end': w['end'] * fit} for w in words]
+    return SpeechResult(audio, words, duration, audio_format='wav')
+
+
+# Synthesis backends by name: async fn(text, voice, rate=, pitch=) -> SpeechResult
+BACKENDS = {
+    'edge': synthesize_edge,
+    'espeak': synthesize_espeak,
+    'tone': synthesize_tone,
+}
+
+
+def get_backend_name(name=None):
+    """Backend name, validated (defaults to TTS_BACKEND, then 'edge')"""
+    name = name or os.getenv('TTS_BACKEND', 'edge')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name} (expected one of {', '.join(BACKENDS)})")
+    return name
@@ -5,18 +5,37 @@ Fetches and manages stock videos from Pexels
 """
 
 import os
-import requests
 import json
 import hashlib
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from footage_index import FootageIndex
+from pexels_client import PexelsClient
 
 class StockFootageManager:
+    # Several jobs (one manager each) share the same cache index file
+    cache_index_lock = threading.Lock()
+
+    # Full-file backfills after a windowed fetch: a few at a time, shared by every
+    # job. Executor threads are joined at interpreter exit, so a backfill that
+    # has started is finished rather than killed half-written.
+    backfill_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="footage-backfill")
+    backfills_pending = set()
+
+    # Window clips are deleted once their full file is cached, unless a job
+    # used them within this many seconds (it may still be reading them)
+    window_grace_seconds = 3600
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.pexels.com"
         self.headers = {"Authorization": api_key}
+
+        # Shared client: coalesces identical requests across jobs, rate-limited
+        self.client = PexelsClient.shared(api_key)
         
         # Cache directory for downloaded videos
         self.cache_dir = r"C:\New Project\viral-ai-content\assets\stock_videos"
@@ -25,6 +44,12 @@ class StockFootageManager:
         # Cache index file
         self.cache_index_file = os.path.join(self.cache_dir, "cache_index.json")
         self.load_cache_index()
+
+        # Per-clip analysis (scene cuts, motion/brightness timeline, keyframes)
+        self.footage_index = FootageIndex.for_dir(self.cache_dir)
+
+        # Windows left behind by earlier runs (still open at backfill time)
+        self.drop_windows()
     
     def load_cache_index(self):
         """Load cache index to avoid re-downloading"""
@@ -34,15 +59,34 @@ class StockFootageManager:
         else:
             self.cache_index = {}
     
-    def save_cache_index(self):
-        """Save cache index"""
-        with open(self.cache_index_file, 'w') as f:
-            json.dump(self.cache_index, f, indent=2)
+    def save_cache_index(self, updates: Optional[Dict[str, str]] = None, removals: Tuple[str, ...] = ()):
+        """
+        Apply updates ({cache key: path}) and removals (cache keys) and save the
+        cache index, merged with entries other jobs wrote meanwhile. The index
+        is only changed here, under the lock.
+        """
+        with self.cache_index_lock:
+            if updates:
+                self.cache_index.update(updates)
+            if os.path.exists(self.cache_index_file):
+                with open(self.cache_index_file, 'r') as f:
+                    on_disk = json.load(f)
+                on_disk.update(self.cache_index)
+                self.cache_index = on_disk
+            for key in removals:
+                self.cache_index.pop(key, None)
+
+            tmp_file = self.cache_index_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.cache_index, f, indent=2)
+            os.replace(tmp_file, self.cache_index_file)
     
-    def search_videos(self, query: str, count: int = 5, orientation: str = "portrait") -> List[Dict]:
+    def search_videos(self, query: str, count: int = 5, orientation: str = "portrait",
+                      quality: str = "hd") -> List[Dict]:
         """
         Search for videos on Pexels
         orientation: portrait (9:16), landscape (16:9), square (1:1)
+        quality: "hd" for publish renders, "sd" for the smallest usable rendition (draft previews)
         """
         search_url = f"{self.base_url}/videos/search"
         params = {
@@ -54,10 +98,9 @@ class StockFootageManager:
         
         try:
             print(f"🔍 Searching Pexels for: {query}")
-            response = requests.get(search_url, headers=self.headers, params=params)
+            status_code, data = self.client.get_json(search_url, params)
             
-            if response.status_code == 200:
-                data = response.json()
+            if status_code == 200:
                 videos = []
                 
                 for video in data.get("videos", []):
@@ -70,16 +113,32 @@ class StockFootageManager:
                         "files": []
                     }
                     
-                    # Get the best quality file (HD preferred)
-                    for file in video["video_files"]:
-                        if file["quality"] == "hd" and file["width"] >= 1920:
+                    # Draft renders: smallest SD file whose short side still covers the 540px draft frame
+                    if quality == "sd":
+                        sd_files = sorted((file for file in video["video_files"]
+                                           if file["quality"] == "sd" and file.get("width")),
+                                          key=lambda file: file["width"])
+                        usable = [file for file in sd_files if min(file["width"], file["height"]) >= 540]
+                        if usable or sd_files:
+                            file = (usable or sd_files[-1:])[0]
                             video_info["files"].append({
                                 "link": file["link"],
                                 "quality": file["quality"],
                                 "width": file["width"],
                                 "height": file["height"]
                             })
-                            break
+                    
+                    # Get the best quality file (HD preferred)
+                    if not video_info["files"]:
+                        for file in video["video_files"]:
+                            if file["quality"] == "hd" and file["width"] >= 1920:
+                                video_info["files"].append({
+                                    "link": file["link"],
+                                    "quality": file["quality"],
+                                    "width": file["width"],
+                                    "height": file["height"]
+                                })
+                                break
                     
                     # Fallback to any HD file
                     if not video_info["files"]:
@@ -99,15 +158,22 @@ class StockFootageManager:
                 print(f"✅ Found {len(videos)} videos")
                 return videos
             else:
-                print(f"❌ Pexels API error: {response.status_code}")
+                print(f"❌ Pexels API error: {status_code}")
                 return []
                 
         except Exception as e:
             print(f"❌ Error searching videos: {e}")
             return []
     
-    def download_video(self, video_url: str, video_id: str) -> str:
-        """Download video and cache it locally"""
+    def download_video(self, video_url: str, video_id: str, window: Optional[Tuple[float, float]] = None,
+                       rendition: Optional[str] = None) -> str:
+        """
+        Download video and cache it locally
+        window: optional (start, duration) - on a cache miss only that part is
+        fetched and the full file is backfilled in the background
+        rendition: e.g. "1920x1080" - identifies the same Pexels file behind a
+        different (signed/rendition) URL so it isn't downloaded twice
+        """
         # Check if already cached
         cache_key = hashlib.md5(video_url.encode()).hexdigest()
         
@@ -115,38 +181,150 @@ class StockFootageManager:
             cached_path = self.cache_index[cache_key]
             if os.path.exists(cached_path):
                 print(f"📦 Using cached video: {video_id}")
+                # Backfill index for clips cached before the index existed
+                self.footage_index.ingest(cached_path)
                 return cached_path
+
+        # Same Pexels video + rendition already cached under another URL
+        identity = f"pexels:{video_id}:{rendition}" if rendition else None
+        if identity:
+            known_path = self.footage_index.find_by("identity", identity)
+            if known_path:
+                print(f"📦 Using cached video (same content, different URL): {video_id}")
+                self.save_cache_index({cache_key: known_path})
+                return known_path
+
+        if window:
+            window_path = self.download_window(video_url, video_id, cache_key, *window)
+            if window_path:
+                self.queue_backfill(video_url, video_id, rendition)
+                return window_path
+            # Fall through to a full download if the partial fetch failed
         
         # Download video
         try:
             print(f"⬇️ Downloading video {video_id}...")
-            response = requests.get(video_url, stream=True)
-            
-            if response.status_code == 200:
-                file_path = os.path.join(self.cache_dir, f"pexels_{video_id}_{cache_key[:8]}.mp4")
-                
-                with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
+            file_path = os.path.join(self.cache_dir, f"pexels_{video_id}_{cache_key[:8]}.mp4")
+
+            # Concurrent jobs asking for the same URL share a single download
+            if self.client.download(video_url, file_path):
+                # Hardlink/reuse if the same content is already cached
+                file_path = self.footage_index.register_content(file_path, identity)
+
                 # Update cache index
-                self.cache_index[cache_key] = file_path
-                self.save_cache_index()
+                self.save_cache_index({cache_key: file_path})
                 
                 print(f"✅ Downloaded: {file_path}")
+
+                # One-time analysis at ingest so segments can pick windows and cut points
+                self.footage_index.ingest(file_path)
                 return file_path
             else:
-                print(f"❌ Download failed: {response.status_code}")
                 return None
                 
         except Exception as e:
             print(f"❌ Error downloading video: {e}")
             return None
     
-    def get_footage_for_script(self, script_data: Dict, count_per_scene: int = 2) -> Dict:
+    def queue_backfill(self, video_url: str, video_id: str, rendition: Optional[str] = None):
+        """Download the full file in the background (once per URL, however many jobs ask)"""
+        with self.cache_index_lock:
+            if video_url in self.backfills_pending:
+                return
+            self.backfills_pending.add(video_url)
+
+        def backfill():
+            try:
+                if self.download_video(video_url, video_id, rendition=rendition):
+                    self.drop_windows(hashlib.md5(video_url.encode()).hexdigest())
+            finally:
+                with self.cache_index_lock:
+                    self.backfills_pending.discard(video_url)
+
+        self.backfill_executor.submit(backfill)
+
+    def download_window(self, video_url: str, video_id: str, cache_key: str,
+                        start: float, duration: float) -> Optional[str]:
+        """Fetch just one time window of a video (HTTP range reads via ffmpeg)"""
+        window_key = f"{cache_key}:{int(start * 1000)}:{int(duration * 1000)}"
+
+        if window_key in self.cache_index and os.path.exists(self.cache_index[window_key]):
+            print(f"📦 Using cached window of video: {video_id}")
+            try:
+                # Touch so drop_windows sees this window as in use
+                os.utime(self.cache_index[window_key], None)
+                return self.cache_index[window_key]
+            except OSError:
+                pass  # Dropped in the meantime - fetch it again
+
+        print(f"⬇️ Fetching {duration:.1f}s window of video {video_id} at {start:.1f}s...")
+        file_path = os.path.join(
+            self.cache_dir,
+            f"pexels_{video_id}_{cache_key[:8]}_w{int(start * 1000)}_{int(duration * 1000)}.mp4"
+        )
+        if not self.client.fetch_window(video_url, file_path, start, duration):
+            return None
+
+        self.save_cache_index({window_key: file_path})
+        self.footage_index.ingest(file_path)
+
+        print(f"✅ Fetched window: {file_path}")
+        return file_path
+
+    def drop_windows(self, cache_key: Optional[str] = None):
+        """
+        Delete window clips whose full file is now cached (for one URL's cache
+        key, or all of them). Windows used within window_grace_seconds, or
+        still open (Windows), are left for a later sweep.
+        """
+        with self.cache_index_lock:
+            windows = {}
+            for key, path in self.cache_index.items():
+                full_key = key.split(':')[0]
+                if key == full_key or (cache_key and full_key != cache_key):
+                    continue
+                if os.path.exists(self.cache_index.get(full_key, '')):
+                    windows[key] = path
+
+        dropped = []
+        for key, path in windows.items():
+            try:
+                if os.path.exists(path):
+                    if time.time() - os.path.getmtime(path) < self.window_grace_seconds:
+                        continue
+                    os.remove(path)
+            except OSError:
+                continue  # Still open - try again next time
+            dropped.append(key)
+
+        if dropped:
+            self.save_cache_index(removals=tuple(dropped))
+            print(f"🧹 Dropped {len(dropped)} window clip(s) replaced by full downloads")
+
+    def fetch_window_for(self, video: Dict, window_seconds: Optional[float]) -> Optional[Tuple[float, float]]:
+        """Window to fetch from a search result (middle section), None for full download"""
+        if not window_seconds or video.get("duration", 0) <= window_seconds * 2:
+            return None
+        start = (video["duration"] - window_seconds) / 2
+        return (round(start, 1), window_seconds)
+
+    def download_search_result(self, video: Dict, window_seconds: Optional[float] = None) -> Optional[str]:
+        """Download the chosen file of a search_videos result"""
+        file = video["files"][0]
+        return self.download_video(
+            file["link"], str(video["id"]),
+            window=self.fetch_window_for(video, window_seconds),
+            rendition=f"{file['width']}x{file['height']}"
+        )
+
+    def get_footage_for_script(self, script_data: Dict, count_per_scene: int = 2,
+                               window_seconds: Optional[float] = None, quality: str = "hd") -> Dict:
         """
         Get relevant footage for entire script
         Returns dict with footage for each section
+        window_seconds: fetch only this many seconds of each uncached clip
+        (full files are backfilled in the background)
+        quality: rendition to download ("sd" for draft renders)
         """
         footage = {
             "hook": [],
@@ -170,10 +348,10 @@ class StockFootageManager:
 
         # Use generic searches instead of specific keywords
         for i, search in enumerate(generic_searches[:4]):
-            videos = self.search_videos(search, count=1, orientation="portrait")
+            videos = self.search_videos(search, count=1, orientation="portrait", quality=quality)
             for video in videos:
                 if video["files"]:
-                    video_path = self.download_video(video["files"][0]["link"], str(video["id"]))
+                    video_path = self.download_search_result(video, window_seconds)
                     if video_path:
                         footage["hook"].append(video_path)
         
@@ -188,10 +366,10 @@ class StockFootageManager:
                 # Cycle through available searches
                 search = generic_searches[i % len(generic_searches)]
 
-            videos = self.search_videos(search, count=1, orientation="portrait")
+            videos = self.search_videos(search, count=1, orientation="portrait", quality=quality)
             for video in videos:
                 if video["files"]:
-                    video_path = self.download_video(video["files"][0]["link"], str(video["id"]))
+                    video_path = self.download_search_result(video, window_seconds)
                     if video_path:
                         footage["main_points"].append(video_path)
         
@@ -201,10 +379,10 @@ class StockFootageManager:
             "technology innovation bright",
             "data streams flowing"
         ]
-        videos = self.search_videos(random.choice(cta_queries), count=1, orientation="portrait")
+        videos = self.search_videos(random.choice(cta_queries), count=1, orientation="portrait", quality=quality)
         for video in videos:
             if video["files"]:
-                video_path = self.download_video(video["files"][0]["link"], str(video["id"]))
+                video_path = self.download_search_result(video, window_seconds)
                 if video_path:
                     footage["cta"].append(video_path)
         
@@ -217,10 +395,10 @@ class StockFootageManager:
             "nature forest cinematic"
         ]
         bg_query = random.choice(bg_queries)
-        videos = self.search_videos(bg_query, count=2, orientation="portrait")
+        videos = self.search_videos(bg_query, count=2, orientation="portrait", quality=quality)
         for video in videos:
             if video["files"]:
-                video_path = self.download_video(video["files"][0]["link"], str(video["id"]))
+                video_path = self.download_search_result(video, window_seconds)
                 if video_path:
                     footage["background"].append(video_path)
         
@@ -0,0 +1,7 @@
+# File: C:\New Project\viral-ai-content\tests\conftest.py
+"""The modules live at the project root, next to this folder"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+# File: C:\New Project\viral-ai-content\tests\test_color_grading.py
+"""ColorGrade LUTs against the moviepy effects they replace"""
+
+import numpy as np
+import pytest
+from moviepy.editor import ImageClip
+from moviepy.video.fx.all import colorx, gamma_corr, lum_contrast
+
+from color_grading import ColorGrade
+
+
+@pytest.fixture
+def frame():
+    # Every channel value, in every channel
+    values = np.arange(256, dtype=np.uint8)
+    return np.stack([values, values[::-1], np.roll(values, 97)], axis=1).reshape(16, 16, 3)
+
+
+def moviepy_frame(frame, *effects):
+    clip = ImageClip(frame, duration=1)
+    for effect, args in effects:
+        clip = clip.fx(effect, *args)
+    return np.asarray(clip.get_frame(0)).astype(np.uint8)
+
+
+@pytest.mark.parametrize("grade, effects", [
+    (ColorGrade().colorx(1.2), [(colorx, (1.2,))]),
+    (ColorGrade().gamma(1.2), [(gamma_corr, (1.2,))]),
+    (ColorGrade().lum_contrast(10, 0.3, 127), [(lum_contrast, (10, 0.3, 127))]),
+    (ColorGrade().colorx(1.2).gamma(1.2), [(colorx, (1.2,)), (gamma_corr, (1.2,))]),
+    (ColorGrade().lum_contrast(-20, 0.5).colorx(0.8), [(lum_contrast, (-20, 0.5)), (colorx, (0.8,))]),
+])
+def test_lut_matches_moviepy_fx(frame, grade, effects):
+    assert np.array_equal(grade.grade_frame(frame), moviepy_frame(frame, *effects))
+
+
+def test_channel_gain_scales_each_channel(frame):
+    graded = ColorGrade().channel_gain(red=0.9, blue=1.2).grade_frame(frame)
+    expected = np.minimum(255, frame * np.array([0.9, 1.0, 1.2])).astype(np.uint8)
+
+    assert np.array_equal(graded, expected)
+
+
+def test_empty_grade_leaves_clip_untouched(frame):
+    clip = ImageClip(frame, duration=1)
+
+    assert ColorGrade().apply(clip) is clip
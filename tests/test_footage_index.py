@@ -0,0 +1,48 @@
+# File: C:\New Project\viral-ai-content\tests\test_footage_index.py
+"""FootageAnalyzer.select_window over hand-built shot tables"""
+
+from footage_index import FootageAnalyzer
+
+
+def analysis_for(analyzer, score_by_second, cuts, duration):
+    """Shot table for a clip sampled once per second"""
+    times = [float(t) for t in range(len(score_by_second))]
+    return analyzer.build_shot_table(times, score_by_second, cuts, duration)
+
+
+def test_no_shots_returns_none():
+    assert FootageAnalyzer().select_window({"shots": [], "shot_lengths": []}, 2.0) is None
+
+
+def test_window_centred_on_peak_of_best_long_enough_shot():
+    analyzer = FootageAnalyzer()
+    # Shots [0, 4) calm, [4, 12) peaking at 8s, [12, 14) the highest score but too short
+    score = [0.1] * 4 + [0.3, 0.4, 0.5, 0.6, 0.9, 0.6, 0.5, 0.4] + [1.0, 1.0]
+    analysis = analysis_for(analyzer, score, [4.0, 12.0], 14.0)
+
+    assert analyzer.select_window(analysis, 3.0) == 6.5
+
+
+def test_window_clamped_inside_shot_with_margin():
+    analyzer = FootageAnalyzer()
+    # Peak at the very start of the only long shot
+    score = [1.0, 0.5, 0.4, 0.3, 0.2, 0.1]
+    analysis = analysis_for(analyzer, score, [], 6.0)
+
+    assert analyzer.select_window(analysis, 2.0) == analyzer.cut_margin
+
+
+def test_falls_back_to_shot_without_breathing_room():
+    analyzer = FootageAnalyzer()
+    score = [0.5, 0.5, 0.5]
+    analysis = analysis_for(analyzer, score, [], 3.0)
+
+    # Exactly as long as the shot: no room for margins, window is the whole shot
+    assert analyzer.select_window(analysis, 3.0) == 0.0
+
+
+def test_no_shot_long_enough_returns_none():
+    analyzer = FootageAnalyzer()
+    analysis = analysis_for(analyzer, [0.5] * 4, [2.0], 4.0)
+
+    assert analyzer.select_window(analysis, 3.0) is None
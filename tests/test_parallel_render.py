@@ -0,0 +1,31 @@
+# File: C:\New Project\viral-ai-content\tests\test_parallel_render.py
+"""plan_chunks frame ranges"""
+
+from parallel_render import plan_chunks, frame_count
+
+
+def covers_timeline(chunks, total):
+    """Chunks are contiguous, non-empty and cover [0, total) exactly"""
+    return (chunks[0][0] == 0 and chunks[-1][1] == total
+            and all(first < last for first, last in chunks)
+            and all(a[1] == b[0] for a, b in zip(chunks, chunks[1:])))
+
+
+def test_chunks_start_at_segment_boundaries():
+    chunks = plan_chunks([0, 2.0, 5.0], 7.0, 30)
+
+    assert chunks == [(0, 60), (60, 150), (150, 210)]
+
+
+def test_long_segments_are_sliced_evenly():
+    chunks = plan_chunks([0], 20.0, 30, max_chunk_seconds=8.0)
+
+    # 600 frames in three pieces of at most 240
+    assert chunks == [(0, 200), (200, 400), (400, 600)]
+
+
+def test_chunks_cover_every_frame_moviepy_writes():
+    duration = 10.01
+    chunks = plan_chunks([0, 3.3, 3.31, 7.77, 12.0], duration, 30)
+
+    assert covers_timeline(chunks, frame_count(duration, 30))
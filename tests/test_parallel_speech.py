@@ -0,0 +1,59 @@
+# File: C:\New Project\viral-ai-content\tests\test_parallel_speech.py
+"""stitch() sample positions and word offsets"""
+
+import numpy as np
+import pytest
+
+from audio_pcm import encode_wav
+from parallel_speech import stitch
+from speech_synthesis import SpeechResult
+
+
+RATE = 8000
+
+
+def chunk(seconds, words):
+    """WAV chunk of `seconds` of constant non-zero samples with a word table"""
+    samples = np.full(int(seconds * RATE), 1000, dtype=np.int16)
+    return SpeechResult(encode_wav(samples, RATE), words, seconds, audio_format='wav')
+
+
+def word(text, start, end):
+    return {'text': text, 'start': start, 'end': end}
+
+
+def test_word_offsets_follow_trimmed_chunks_and_pauses():
+    chunks = ["Hello there.", "Second part,", "end"]
+    results = [
+        chunk(2.0, [word("Hello", 0.5, 0.9), word("there", 1.0, 1.5)]),
+        chunk(1.5, [word("Second", 0.2, 0.6), word("part", 0.7, 1.0)]),
+        chunk(1.0, [word("end", 0.1, 0.4)]),
+    ]
+    lead, tail = 0.05, 0.15
+    speech = stitch(chunks, results, sample_rate=RATE, sentence_pause=0.35, clause_pause=0.15,
+                    lead=lead, tail=tail, fade=0)
+
+    # Piece lengths in samples: [first word - lead, last word + tail] of each chunk
+    first_piece = int((1.5 + tail) * RATE) - int((0.5 - lead) * RATE)
+    second_start = first_piece + int(0.35 * RATE)  # sentence pause after "there."
+    second_piece = int((1.0 + tail) * RATE) - int((0.2 - lead) * RATE)
+    third_start = second_start + second_piece + int(0.15 * RATE)  # clause pause after "part,"
+    third_piece = int((0.4 + tail) * RATE) - int((0.1 - lead) * RATE)
+
+    starts = [w['start'] for w in speech.words]
+    assert [w['text'] for w in speech.words] == ["Hello", "there", "Second", "part", "end"]
+    assert starts == pytest.approx([
+        lead,
+        lead + 0.5,
+        second_start / RATE + lead,
+        second_start / RATE + lead + 0.5,
+        third_start / RATE + lead,
+    ], abs=1.0 / RATE)
+    assert speech.duration == (third_start + third_piece) / RATE
+
+
+def test_chunk_without_words_is_kept_whole():
+    speech = stitch(["Hmm."], [chunk(0.5, [])], sample_rate=RATE, fade=0)
+
+    assert speech.words == []
+    assert speech.duration == 0.5
@@ -0,0 +1,81 @@
+# File: C:\New Project\viral-ai-content\tests\test_pexels_client.py
+"""TokenBucket pacing and rate-limit header handling, on a fake clock"""
+
+import pytest
+
+import pexels_client
+from pexels_client import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(pexels_client.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(pexels_client.time, 'time', clock.time)
+    monkeypatch.setattr(pexels_client.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_burst_up_to_capacity_then_paced_at_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.slept == []
+
+    started = clock.now
+    bucket.acquire()
+    assert clock.now - started == pytest.approx(0.5)
+
+
+def test_remaining_quota_caps_the_burst_without_changing_the_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=10)
+    bucket.update_from_headers({'X-Ratelimit-Remaining': '1', 'X-Ratelimit-Reset': str(clock.now + 3600)})
+
+    assert bucket.rate == 2.0
+    bucket.acquire()
+    started = clock.now
+    bucket.acquire()
+    assert clock.now - started == pytest.approx(0.5)
+
+
+def test_exhausted_quota_blocks_until_reset(clock):
+    bucket = TokenBucket(rate=2.0, capacity=10)
+    reset = clock.now + 30
+    bucket.update_from_headers({'X-Ratelimit-Remaining': '0', 'X-Ratelimit-Reset': str(reset)})
+
+    bucket.acquire()
+    assert clock.now >= reset
+
+
+def test_block_for_delays_next_request(clock):
+    bucket = TokenBucket(rate=2.0, capacity=10)
+    bucket.block_for(12)
+
+    started = clock.now
+    bucket.acquire()
+    assert clock.now - started >= 12
+
+
+def test_missing_or_malformed_headers_are_ignored(clock):
+    bucket = TokenBucket(rate=2.0, capacity=10)
+    bucket.update_from_headers({})
+    bucket.update_from_headers({'X-Ratelimit-Remaining': 'n/a', 'X-Ratelimit-Reset': '0'})
+
+    assert bucket.tokens == 10
+    assert bucket.blocked_until == 0.0
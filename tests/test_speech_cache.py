@@ -0,0 +1,57 @@
+# File: C:\New Project\viral-ai-content\tests\test_speech_cache.py
+"""SpeechCache keys, round trips and LRU eviction"""
+
+import os
+import time
+
+from speech_cache import SpeechCache
+from speech_synthesis import SpeechResult
+
+
+def speech(size=1000):
+    return SpeechResult(b'\0' * size, [{'text': 'hi', 'start': 0.0, 'end': 0.2}], 0.2)
+
+
+def test_key_ignores_whitespace_but_not_settings(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    key = cache.key("Hello  world\n", "en-US-AriaNeural")
+
+    assert key == cache.key(" Hello world", "en-US-AriaNeural")
+    assert key != cache.key("Hello world", "en-US-GuyNeural")
+    assert key != cache.key("Hello world", "en-US-AriaNeural", rate='+10%')
+    assert key != cache.key("Hello world", "en-US-AriaNeural", pitch='+5Hz')
+    assert key != cache.key("Hello world", "en-US-AriaNeural", backend='tone')
+
+
+def test_put_then_get_round_trips(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    key = cache.key("hi", "voice")
+    cache.put(key, speech())
+
+    cached = cache.get(key)
+    assert cached.audio == speech().audio
+    assert cached.words == speech().words
+    assert cached.duration == 0.2
+    assert cache.get(cache.key("other", "voice")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    # Room for two 1000-byte entries (plus their metadata), not three
+    cache = SpeechCache(str(tmp_path), max_bytes=2600)
+    keys = [cache.key(text, "voice") for text in ("one", "two", "three")]
+
+    cache.put(keys[0], speech())
+    cache.put(keys[1], speech())
+    # Make "one" the oldest, then use it so "two" becomes the least recently used
+    past = time.time() - 60
+    for key in keys[:2]:
+        os.utime(cache.paths(key)[1], (past, past))
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], speech())
+
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+    assert not os.path.exists(cache.paths(keys[1])[0])
@@ -0,0 +1,95 @@
+# File: C:\New Project\viral-ai-content\text_renderer.py
+"""
+Text Rendering Cache for Viral AI Content
+Process-wide font registry and an LRU cache of rendered text overlays so
+titles, CTAs, lower thirds and captions that repeat across jobs are
+rasterized only once
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import ImageFont
+
+
+class FontRegistry:
+    """Loads each (font, size) once per process"""
+
+    def __init__(self):
+        self.fonts = {}
+        self.lock = threading.Lock()
+
+    def get(self, name, size, fallbacks=()):
+        """TrueType font by file name, trying fallbacks, then PIL's default font"""
+        key = (name, size, tuple(fallbacks))
+        with self.lock:
+            if key in self.fonts:
+                return self.fonts[key]
+
+        font = None
+        for candidate in (name,) + tuple(fallbacks):
+            try:
+                font = ImageFont.truetype(candidate, size)
+                break
+            except:
+                continue
+        if font is None:
+            font = ImageFont.load_default()
+
+        with self.lock:
+            self.fonts[key] = font
+        return font
+
+
+class TextOverlayCache:
+    """LRU cache of rendered overlay arrays, bounded by total bytes"""
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """
+        Return the cached array for key, calling render() on a miss.
+        Cached arrays are shared between callers and jobs, so they are marked
+        read-only: code that draws on one in place fails instead of corrupting
+        the overlay for everyone else.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        image = np.array(render())
+        image.setflags(write=False)
+
+        with self.lock:
+            self.misses += 1
+            if key not in self.entries:
+                self.entries[key] = image
+                self.total_bytes += image.nbytes
+                while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.total_bytes -= evicted.nbytes
+            return self.entries[key]
+
+
+# Shared by every creator in the process
+fonts = FontRegistry()
+overlay_cache = TextOverlayCache()
+
+
+def get_font(name, size, fallbacks=()):
+    """Shortcut for the shared font registry"""
+    return fonts.get(name, size, fallbacks)
+
+
+def cached_overlay(key, render):
+    """Shortcut for the shared overlay cache"""
+    return overlay_cache.get_or_render(key, render)
@@ -14,7 +14,9 @@ from datetime import datetime
 import logging
 import traceback
 import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 # Add project to path
@@ -23,6 +25,8 @@ sys.path.append(r"C:\New Project\viral-ai-content")
 # Import video creators
 from create_video_enhanced import EnhancedVideoCreator
 from documentary_style_creator import DocumentaryStyleCreator
+from render_profiles import get_profile, RENDER_PROFILES
+from speech_synthesis import BACKENDS as TTS_BACKENDS
 
 # Configure logging
 logging.basicConfig(
@@ -41,7 +45,70 @@ CORS(app)  # Enable CORS for n8n
 # Global job status tracker
 job_status: Dict[str, Dict[str, Any]] = {}
 
-def _create_video_async(job_id: str, script_data: dict):
+# Serialises draft approvals (check-and-set of approved_job_id)
+approve_lock = threading.Lock()
+
+# Overlay pre-rasterization runs beside the render; it only warms the overlay cache
+overlay_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="overlay-prerender")
+
+async def _timed_stage(timeline: dict, stage: str, started: float, work):
+    """Await work (a coroutine or future), recording when it ran in timeline[stage] (seconds since started)"""
+    start = time.perf_counter() - started
+    timeline[stage] = {"start": round(start, 3)}
+    try:
+        return await work
+    finally:
+        end = time.perf_counter() - started
+        timeline[stage].update({"end": round(end, 3), "seconds": round(end - start, 3)})
+
+def _prerasterize_overlays(creator, script_data: dict, timeline: dict, started: float):
+    """Warm the overlay cache for the job, recording the stage in timeline["overlays"]"""
+    start = time.perf_counter() - started
+    timeline["overlays"]["start"] = round(start, 3)
+    try:
+        creator.prerasterize_overlays(script_data)
+    except Exception as e:
+        # The render rasterizes whatever is missing itself
+        logger.warning(f"Overlay pre-rasterization failed: {e}")
+    finally:
+        end = time.perf_counter() - started
+        timeline["overlays"].update({"end": round(end, 3), "seconds": round(end - start, 3)})
+
+async def _prepare_documentary_inputs(creator, script_data: dict, profile: str, timeline: dict, started: float):
+    """
+    Voice synthesis and stock footage search/download are independent, so they
+    run together; returns (speech, footage paths). Overlay pre-rasterization is
+    started alongside but not waited for - the render doesn't need it, it only
+    finds titles and lower thirds already cached. It is skipped when the render
+    runs in worker processes, which can't see this process's cache.
+    """
+    from stock_footage_manager import StockFootageManager
+    stock_manager = StockFootageManager(os.getenv('PEXELS_API_KEY'))
+    loop = asyncio.get_running_loop()
+
+    if creator.renders_in_process():
+        timeline["overlays"] = {}
+        overlay_executor.submit(_prerasterize_overlays, creator, script_data, timeline, started)
+
+    # Search for cinematic/tech footage (SD renditions for drafts) - blocking HTTP, so on a thread
+    footage = loop.run_in_executor(None, lambda: stock_manager.get_footage_for_script(
+        script_data, quality=get_profile(profile)['footage_quality']
+    ))
+
+    speech, footage_dict = await asyncio.gather(
+        _timed_stage(timeline, "tts", started, creator.synthesize_voiceover(script_data)),
+        _timed_stage(timeline, "footage", started, footage)
+    )
+
+    # Combine all footage paths
+    all_footage = (
+        footage_dict.get('hook', []) +
+        footage_dict.get('main_points', []) +
+        footage_dict.get('background', [])
+    )
+    return speech, all_footage
+
+def _create_video_async(job_id: str, script_data: dict, profile: str = 'full', tts_backend: str = None):
     """Background function to create video asynchronously"""
     try:
         # Update status to processing
@@ -52,7 +119,7 @@ def _create_video_async(job_id: str, script_data: dict):
             "updated_at": datetime.now().isoformat()
         })
 
-        logger.info(f"[{job_id}] Starting async video creation")
+        logger.info(f"[{job_id}] Starting async video creation ({profile} profile, {tts_backend or 'default'} TTS)")
 
         # Validate required fields
         if not validate_script_data(script_data):
@@ -80,25 +147,26 @@ def _create_video_async(job_id: str, script_data: dict):
         output_dir = r"C:\New Project\viral-ai-content\output\videos"
         os.makedirs(output_dir, exist_ok=True)
 
-        # Update progress - getting stock footage
+        # Update progress - voice and footage are prepared together
         job_status[job_id].update({
-            "message": "Fetching cinematic stock footage...",
+            "message": "Synthesizing voice and fetching cinematic stock footage...",
             "progress": 30,
             "updated_at": datetime.now().isoformat()
         })
 
-        # Get stock footage first
-        from stock_footage_manager import StockFootageManager
-        stock_manager = StockFootageManager(os.getenv('PEXELS_API_KEY'))
+        # Use documentary creator
+        creator = DocumentaryStyleCreator(profile, tts_backend)
 
-        # Search for cinematic/tech footage
-        footage_dict = stock_manager.get_footage_for_script(script_data)
+        # Per-stage timings (seconds since processing began), exposed in the job status
+        started = time.perf_counter()
+        timeline = job_status[job_id]["timeline"] = {}
 
-        # Combine all footage paths
-        all_footage = (
-            footage_dict.get('hook', []) +
-            footage_dict.get('main_points', []) +
-            footage_dict.get('background', [])
+        # Create event loop for async functions
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        speech, all_footage = loop.run_until_complete(
+            _prepare_documentary_inputs(creator, script_data, profile, timeline, started)
         )
 
         # Update progress - creating documentary
@@ -108,25 +176,25 @@ def _create_video_async(job_id: str, script_data: dict):
             "updated_at": datetime.now().isoformat()
         })
 
-        # Use documentary creator
-        creator = DocumentaryStyleCreator()
-
-        # Create event loop for async functions
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
+        # Rendering starts as soon as the voice and footage are in
         logger.info(f"[{job_id}] Starting documentary video creation...")
-        output_path = loop.run_until_complete(
-            creator.create_documentary_video(script_data, all_footage)
-        )
+        output_path = loop.run_until_complete(_timed_stage(
+            timeline, "render", started,
+            creator.create_documentary_video(script_data, all_footage, speech=speech)
+        ))
         loop.close()
 
+        logger.info(f"[{job_id}] Stage timeline: " + ", ".join(
+            f"{stage} {t['start']:.1f}-{t['end']:.1f}s" for stage, t in list(timeline.items()) if 'end' in t
+        ))
+
         # Format results to match expected structure
         results = {
             'documentary': {
                 'path': output_path,
                 'thumbnail': output_path.replace('.mp4', '_thumb.jpg'),
-                'quality_score': 9.0  # Documentary style gets high quality score
+                'quality_score': 9.0,  # Documentary style gets high quality score
+                'profile': profile
             }
         }
 
@@ -159,6 +227,9 @@ def _create_video_async(job_id: str, script_data: dict):
             "completed_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat()
         })
+        if profile != 'full':
+            # Preview only - the publish render is queued once the draft is approved
+            job_status[job_id]["approve_url"] = f"/approve/{job_id}"
 
         logger.info(f"[{job_id}] Video creation successful!")
 
@@ -174,7 +245,7 @@ def _create_video_async(job_id: str, script_data: dict):
             "updated_at": datetime.now().isoformat()
         })
 
-def _create_video_from_data(script_data):
+def _create_video_from_data(script_data, profile='full', tts_backend=None):
     """Internal function to handle video creation from script data (sync version for compatibility)."""
     # Validate required fields
     if not validate_script_data(script_data):
@@ -194,32 +265,26 @@ def _create_video_from_data(script_data):
     output_dir = r"C:\New Project\viral-ai-content\output\videos"
     os.makedirs(output_dir, exist_ok=True)
 
-    # Get stock footage first
-    from stock_footage_manager import StockFootageManager
-    stock_manager = StockFootageManager(os.getenv('PEXELS_API_KEY'))
-
-    # Search for cinematic/tech footage
-    footage_dict = stock_manager.get_footage_for_script(script_data)
-
-    # Combine all footage paths
-    all_footage = (
-        footage_dict.get('hook', []) +
-        footage_dict.get('main_points', []) +
-        footage_dict.get('background', [])
-    )
-
     # Use documentary creator
-    creator = DocumentaryStyleCreator()
+    creator = DocumentaryStyleCreator(profile, tts_backend)
+    started = time.perf_counter()
+    timeline = {}
 
     # Create event loop for async functions
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
 
+    # Voice and stock footage are prepared together
+    speech, all_footage = loop.run_until_complete(
+        _prepare_documentary_inputs(creator, script_data, profile, timeline, started)
+    )
+
     # Create documentary video
     logger.info("Starting documentary video creation...")
-    output_path = loop.run_until_complete(
-        creator.create_documentary_video(script_data, all_footage)
-    )
+    output_path = loop.run_until_complete(_timed_stage(
+        timeline, "render", started,
+        creator.create_documentary_video(script_data, all_footage, speech=speech)
+    ))
     loop.close()
 
     # Prepare response
@@ -230,9 +295,11 @@ def _create_video_from_data(script_data):
             "documentary": {
                 "path": output_path,
                 "thumbnail": output_path.replace('.mp4', '_thumb.jpg'),
-                "quality_score": 9.0
+                "quality_score": 9.0,
+                "profile": profile
             }
-        }
+        },
+        "timeline": timeline
     }
 
     logger.info(f"Created documentary video: {output_path}")
@@ -271,36 +338,26 @@ def create_video_async():
             json.dump(raw_data, f, indent=2)
         logger.info(f"Debug data saved to: {debug_file}")
 
+        # Render profile: ?profile=draft or "profile" in the body
+        profile = get_render_profile_name(raw_data)
+        if profile not in RENDER_PROFILES:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown render profile: {profile}"
+            }), 400
+
+        # Speech backend: ?tts_backend=tone or "tts_backend" in the body (offline runs)
+        tts_backend = get_tts_backend_name(raw_data)
+        if tts_backend not in TTS_BACKENDS:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown TTS backend: {tts_backend}"
+            }), 400
+
         # Parse script data properly
         script_data = parse_script_data(raw_data)
 
-        # Initialize job status
-        job_status[job_id] = {
-            "status": "queued",
-            "message": "Video creation queued",
-            "progress": 0,
-            "script_data": script_data,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }
-
-        # Start video creation in background thread
-        thread = threading.Thread(
-            target=_create_video_async,
-            args=(job_id, script_data),
-            daemon=True
-        )
-        thread.start()
-
-        # Return immediate response with job ID
-        return jsonify({
-            "success": True,
-            "job_id": job_id,
-            "status": "queued",
-            "message": "Video creation started",
-            "status_url": f"/status/{job_id}",
-            "estimated_time": "2-5 minutes"
-        }), 202
+        return jsonify(_queue_video_job(job_id, script_data, profile, tts_backend)), 202
 
     except Exception as e:
         logger.error(f"❌ Error starting async video creation: {str(e)}")
@@ -312,6 +369,89 @@ def create_video_async():
             "traceback": traceback.format_exc()
         }), 500
 
+def get_render_profile_name(raw_data):
+    """Requested render profile name (query string first, then the JSON body)"""
+    profile = request.args.get('profile')
+    if not profile and isinstance(raw_data, dict):
+        profile = raw_data.get('profile')
+    return profile or 'full'
+
+def get_tts_backend_name(raw_data):
+    """Requested TTS backend name (query string, then the JSON body, then TTS_BACKEND)"""
+    tts_backend = request.args.get('tts_backend')
+    if not tts_backend and isinstance(raw_data, dict):
+        tts_backend = raw_data.get('tts_backend')
+    return tts_backend or os.getenv('TTS_BACKEND', 'edge')
+
+def _queue_video_job(job_id, script_data, profile, tts_backend=None, **extra):
+    """Register a job and start it in a background thread; returns the 202 response body"""
+    # Initialize job status
+    job_status[job_id] = {
+        "status": "queued",
+        "message": "Video creation queued",
+        "progress": 0,
+        "profile": profile,
+        "tts_backend": tts_backend,
+        "script_data": script_data,
+        "created_at": datetime.now().isoformat(),
+        "updated_at": datetime.now().isoformat(),
+        **extra
+    }
+
+    # Start video creation in background thread
+    thread = threading.Thread(
+        target=_create_video_async,
+        args=(job_id, script_data, profile, tts_backend),
+        daemon=True
+    )
+    thread.start()
+
+    # Return immediate response with job ID
+    return {
+        "success": True,
+        "job_id": job_id,
+        "status": "queued",
+        "profile": profile,
+        "message": "Video creation started",
+        "status_url": f"/status/{job_id}",
+        "estimated_time": "under a minute" if profile == 'draft' else "2-5 minutes"
+    }
+
+@app.route('/approve/<job_id>', methods=['POST'])
+def approve_draft(job_id):
+    """Approve a finished draft and queue the full render of the same script"""
+    draft = job_status.get(job_id)
+    if draft is None:
+        return jsonify({
+            "success": False,
+            "error": "Job not found"
+        }), 404
+
+    if draft.get("profile", 'full') == 'full' or draft.get("status") != "completed":
+        return jsonify({
+            "success": False,
+            "error": "Only completed draft jobs can be approved"
+        }), 409
+
+    with approve_lock:
+        approved_job_id = draft.get("approved_job_id")
+        if not approved_job_id:
+            full_job_id = draft["approved_job_id"] = str(uuid.uuid4())
+
+    if approved_job_id:
+        # Approving twice (even concurrently) doesn't queue a second full render
+        return jsonify({
+            "success": True,
+            "job_id": approved_job_id,
+            "status_url": f"/status/{approved_job_id}"
+        }), 200
+
+    logger.info(f"[{job_id}] Draft approved - queued full render {full_job_id}")
+
+    response = _queue_video_job(full_job_id, draft["script_data"], 'full', draft.get("tts_backend"),
+                                draft_job_id=job_id)
+    return jsonify(response), 202
+
 @app.route('/status/<job_id>', methods=['GET'])
 def get_job_status(job_id):
     """Get status of a video creation job"""
@@ -367,10 +507,24 @@ def create_video():
             json.dump(raw_data, f, indent=2)
         logger.info(f"Debug data saved to: {debug_file}")
 
+        profile = get_render_profile_name(raw_data)
+        if profile not in RENDER_PROFILES:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown render profile: {profile}"
+            }), 400
+
+        tts_backend = get_tts_backend_name(raw_data)
+        if tts_backend not in TTS_BACKENDS:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown TTS backend: {tts_backend}"
+            }), 400
+
         # Parse script data properly
         script_data = parse_script_data(raw_data)
 
-        return _create_video_from_data(script_data)
+        return _create_video_from_data(script_data, profile, tts_backend)
 
     except Exception as e:
         logger.error(f"Error in video creation: {str(e)}")
@@ -498,7 +652,8 @@ def test():
         "endpoints": [
             "/test - This endpoint",
             "/create-video - Create documentary video synchronously (POST)",
-            "/create-video-async - Create documentary video asynchronously (POST)",
+            "/create-video-async - Create documentary video asynchronously (POST, ?profile=draft for a quick preview, ?tts_backend=tone for offline speech)",
+            "/approve/<job_id> - Approve a draft and queue the full render (POST)",
             "/status/<job_id> - Get job status (GET)",
             "/jobs - List all jobs (GET)",
             "/health - Health check"
@@ -7,15 +7,37 @@ Makes videos look manually edited, not AI-generated
 from moviepy.editor import *
 from moviepy.video.fx.all import *
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFilter
 import random
+import os
+from footage_index import FootageIndex
+from text_renderer import get_font, cached_overlay
+from composition import compose_layers
+from camera_moves import ZoomWindow
 
 class VideoEffectsManager:
-    def __init__(self):
+    def __init__(self, rng=None, readers=None):
         self.transitions = ['fade', 'slide', 'zoom', 'glitch', 'wipe']
-        
-    def create_hook_sequence(self, footage_clips, hook_text, duration=5):
-        """Create dramatic hook with multiple quick cuts"""
+
+        # Cut, shake and transition choices (a per-job generator)
+        self.rng = rng or random.Random()
+
+        # Where footage files are opened (multi_format.FootageReaders), so a job can close them
+        self.readers = readers
+
+    def open_footage(self, path):
+        """VideoFileClip for a footage file, tracked by the job's readers when there are any"""
+        if self.readers is not None:
+            return self.readers.open(path)
+        return VideoFileClip(path)
+        
+    def create_hook_sequence(self, footage_clips, hook_text, duration=5, width=None, height=None):
+        """
+        Create dramatic hook with multiple quick cuts.
+        With width and height, each cut is cropped to fill that frame and the
+        text is laid out for it; hook_text=None leaves the text off (it is
+        then added per format with create_cinematic_text).
+        """
         
         # Split hook duration into quick cuts (0.5-1 second each)
         cuts = []
@@ -23,13 +45,10 @@ class VideoEffectsManager:
         
         for i in range(int(duration / cut_duration)):
             if i < len(footage_clips):
-                clip = footage_clips[i]
-                
                 # Quick cut from footage
-                segment = clip.subclip(
-                    random.uniform(0, max(0, clip.duration - cut_duration)),
-                    min(clip.duration, random.uniform(0, max(0, clip.duration - cut_duration)) + cut_duration)
-                ).set_duration(cut_duration)
+                segment = self.quick_cut(footage_clips[i], cut_duration)
+                if width and height:
+                    segment = ZoomWindow(width, height).apply(segment)
                 
                 # Add different effect to each cut
                 if i == 0:
@@ -46,18 +65,54 @@ class VideoEffectsManager:
         # Concatenate with no gaps
         hook_video = concatenate_videoclips(cuts, method="compose")
         
+        if hook_text is None:
+            # Same length as with the text: cuts that end early leave black, not a frozen frame
+            return CompositeVideoClip([hook_video]).set_duration(duration)
+
         # Add dramatic text overlay
-        text_overlay = self.create_cinematic_text(hook_text, duration)
+        text_overlay = self.create_cinematic_text(hook_text, duration, width or 1080, height or 1920)
         
-        return CompositeVideoClip([hook_video, text_overlay])
+        return compose_layers([hook_video, text_overlay])
     
+    def quick_cut(self, source, cut_duration):
+        """Take a short random cut from a clip or footage path, keyframe-aligned when indexed"""
+        path = source if isinstance(source, str) else getattr(source, 'filename', None)
+
+        if path and os.path.exists(path):
+            index = FootageIndex.for_clip(path)
+            keyframes = index.ensure_keyframes(path)
+            clip_duration = index.get(path).get('analysis', {}).get('duration')
+            if clip_duration is None:
+                if isinstance(source, str):
+                    source = self.open_footage(path)
+                clip_duration = source.duration
+
+            if keyframes:
+                start = index.random_cut_start(path, cut_duration, clip_duration, rng=self.rng)
+                cut_path = index.extract_cut(path, start, cut_duration) if start is not None else None
+                if cut_path:
+                    # Cut file starts on a keyframe, so reading it never seeks back
+                    return self.open_footage(cut_path).set_duration(cut_duration)
+
+            if isinstance(source, str):
+                source = self.open_footage(path)
+
+        clip = source
+        start = self.rng.uniform(0, max(0, clip.duration - cut_duration))
+        return clip.subclip(start, min(clip.duration, start + cut_duration)).set_duration(cut_duration)
+
     def add_shake_effect(self, clip, intensity=5):
         """Add camera shake effect"""
+        seed = self.rng.getrandbits(32)
+
         def shake_frame(get_frame, t):
             frame = get_frame(t)
-            if random.random() < 0.5:  # 50% chance of shake
-                dx = random.randint(-intensity, intensity)
-                dy = random.randint(-intensity, intensity)
+            # Offsets depend only on the clip's seed and the frame time, never on
+            # the order frames are requested in
+            shake = random.Random(seed * 1000003 + int(round(t * 1000)))
+            if shake.random() < 0.5:  # 50% chance of shake
+                dx = shake.randint(-intensity, intensity)
+                dy = shake.randint(-intensity, intensity)
                 frame = np.roll(frame, dx, axis=1)
                 frame = np.roll(frame, dy, axis=0)
             return frame
@@ -78,65 +133,67 @@ class VideoEffectsManager:
         """Quick zoom in and out"""
         return clip.resize(lambda t: 1 + 0.2 * np.sin(2 * np.pi * t * 2))
     
-    def create_cinematic_text(self, text, duration):
-        """Create movie-trailer style text"""
+    def create_cinematic_text(self, text, duration, width=1080, height=1920):
+        """Create movie-trailer style text for a width x height frame"""
         
         # Create text with PIL for better control
-        img_width = 1080
+        img_width = width
         img_height = 300
-        
-        # Create text image with glow effect
-        base_img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
-        
-        # Create glow layer
-        glow_img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
-        glow_draw = ImageDraw.Draw(glow_img)
-        
-        try:
-            font = ImageFont.truetype("impact.ttf", 80)
-        except:
-            font = ImageFont.truetype("arial.ttf", 80)
-        
-        # Center text
+        font = get_font("impact.ttf", 80, fallbacks=("arial.ttf",))
         text = text.upper()
-        bbox = glow_draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (img_width - text_width) // 2
-        y = 100
-        
-        # Draw glow
-        for offset in range(20, 0, -2):
-            alpha = int(255 * (1 - offset/20) * 0.3)
-            glow_draw.text(
-                (x, y), text, 
-                font=font, 
-                fill=(255, 255, 0, alpha),
-                stroke_width=offset,
-                stroke_fill=(255, 200, 0, alpha//2)
+
+        def render():
+            # Create text image with glow effect
+            base_img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
+
+            # Create glow layer
+            glow_img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
+            glow_draw = ImageDraw.Draw(glow_img)
+
+            # Center text
+            bbox = glow_draw.textbbox((0, 0), text, font=font)
+            text_width = bbox[2] - bbox[0]
+            x = (img_width - text_width) // 2
+            y = 100
+
+            # Draw glow
+            for offset in range(20, 0, -2):
+                alpha = int(255 * (1 - offset/20) * 0.3)
+                glow_draw.text(
+                    (x, y), text,
+                    font=font,
+                    fill=(255, 255, 0, alpha),
+                    stroke_width=offset,
+                    stroke_fill=(255, 200, 0, alpha//2)
+                )
+
+            # Blur the glow
+            glow_img = glow_img.filter(ImageFilter.GaussianBlur(radius=3))
+
+            # Draw main text
+            main_draw = ImageDraw.Draw(base_img)
+            main_draw.text(
+                (x, y), text,
+                font=font,
+                fill=(255, 255, 255, 255),
+                stroke_width=3,
+                stroke_fill=(0, 0, 0, 255)
             )
-        
-        # Blur the glow
-        glow_img = glow_img.filter(ImageFilter.GaussianBlur(radius=3))
-        
-        # Draw main text
-        main_draw = ImageDraw.Draw(base_img)
-        main_draw.text(
-            (x, y), text,
-            font=font,
-            fill=(255, 255, 255, 255),
-            stroke_width=3,
-            stroke_fill=(0, 0, 0, 255)
-        )
-        
-        # Composite glow and main text
-        final_img = Image.alpha_composite(glow_img, base_img)
-        
+
+            # Composite glow and main text
+            final_img = Image.alpha_composite(glow_img, base_img)
+
+            return np.array(final_img)
+
+        # Ten stroked glow passes plus a blur - render each text once per process
+        text_img = cached_overlay(('cinematic_text', text, "impact.ttf", 80, img_width, img_height), render)
+
         # Convert to video clip
-        text_clip = ImageClip(np.array(final_img), duration=duration)
+        text_clip = ImageClip(text_img, duration=duration)
         
         # Animate: slide up + fade in + scale
         text_clip = (text_clip
-                    .set_position(lambda t: ('center', 800 - t * 100))
+                    .set_position(lambda t: ('center', height * 5 // 12 - t * 100))
                     .fadein(0.5)
                     .resize(lambda t: min(1.2, 0.8 + t * 0.4)))
         
@@ -146,7 +203,7 @@ class VideoEffectsManager:
         """Create smooth transition between clips"""
         
         if transition_type == 'random':
-            transition_type = random.choice(self.transitions)
+            transition_type = self.rng.choice(self.transitions)
         
         if transition_type == 'fade':
             # Crossfade
@@ -180,56 +237,76 @@ class VideoEffectsManager:
     
     def add_glitch_effect(self, clip, start_time=0, duration=0.5):
         """Add digital glitch effect"""
+        # Each frame's glitch comes from this seed and t, so chunked and
+        # out-of-order renders draw the same glitches
+        seed = self.rng.getrandbits(32)
+
         def glitch_frame(get_frame, t):
-            frame = get_frame(t)
+            # Frames can be shared (cached overlays, shared footage), so glitch a copy
+            frame = np.array(get_frame(t))
             if start_time <= t < start_time + duration:
+                glitch = random.Random(seed * 1000003 + int(round(t * 1000)))
+
                 # Random RGB channel shift
-                if random.random() < 0.3:
-                    frame[:, :, 0] = np.roll(frame[:, :, 0], random.randint(-20, 20), axis=1)
-                if random.random() < 0.3:
-                    frame[:, :, 1] = np.roll(frame[:, :, 1], random.randint(-20, 20), axis=1)
-                if random.random() < 0.3:
-                    frame[:, :, 2] = np.roll(frame[:, :, 2], random.randint(-20, 20), axis=1)
+                if glitch.random() < 0.3:
+                    frame[:, :, 0] = np.roll(frame[:, :, 0], glitch.randint(-20, 20), axis=1)
+                if glitch.random() < 0.3:
+                    frame[:, :, 1] = np.roll(frame[:, :, 1], glitch.randint(-20, 20), axis=1)
+                if glitch.random() < 0.3:
+                    frame[:, :, 2] = np.roll(frame[:, :, 2], glitch.randint(-20, 20), axis=1)
                 
                 # Random horizontal bars
-                if random.random() < 0.2:
-                    bar_height = random.randint(10, 50)
-                    bar_y = random.randint(0, frame.shape[0] - bar_height)
-                    frame[bar_y:bar_y+bar_height] = np.random.randint(0, 255, frame[bar_y:bar_y+bar_height].shape)
+                if glitch.random() < 0.2:
+                    bar_height = glitch.randint(10, 50)
+                    bar_y = glitch.randint(0, frame.shape[0] - bar_height)
+                    noise = np.random.default_rng(glitch.getrandbits(32))
+                    frame[bar_y:bar_y+bar_height] = noise.integers(0, 255, frame[bar_y:bar_y+bar_height].shape)
             
             return frame
         
         return clip.fl(glitch_frame)
     
-    def create_animated_captions(self, text, duration, style='bold'):
-        """Create TikTok-style animated captions"""
-        
-        words = text.split()
+    def create_animated_captions(self, text, duration, style='bold', width=1080, height=1920, timings=None):
+        """
+        Create TikTok-style animated captions for a width x height frame.
+        timings: word timing table from the TTS ([{'text', 'start', 'end'}, ...]);
+        without it the words are spread evenly over the duration.
+        """
+        
+        if timings:
+            words = [word['text'] for word in timings]
+        else:
+            words = text.split()
         clips = []
         
         # Calculate timing for each word
         word_duration = duration / len(words)
         
-        for i, word in enumerate(words):
-            # Create word clip
-            img = Image.new('RGBA', (1080, 200), (0, 0, 0, 0))
+        font_name = "arialbd.ttf" if style == 'bold' else "arial.ttf"
+        font = get_font(font_name, 60)
+
+        def render(word, box_color, text_color):
+            img = Image.new('RGBA', (width, 200), (0, 0, 0, 0))
             draw = ImageDraw.Draw(img)
-            
-            try:
-                if style == 'bold':
-                    font = ImageFont.truetype("arialbd.ttf", 60)
-                else:
-                    font = ImageFont.truetype("arial.ttf", 60)
-            except:
-                font = ImageFont.load_default()
-            
+
             # Text positioning
-            bbox = draw.textbbox((0, 0), word.upper(), font=font)
+            bbox = draw.textbbox((0, 0), word, font=font)
             text_width = bbox[2] - bbox[0]
-            x = (1080 - text_width) // 2
-            
+            x = (width - text_width) // 2
+
             # Background box (TikTok style)
             padding = 15
+            draw.rounded_rectangle(
+                [x - padding, 60, x + text_width + padding, 140],
+                radius=10,
+                fill=box_color
+            )
+
+            # Draw text
+            draw.text((x, 70), word, font=font, fill=text_color)
+            return np.array(img)
+
+        for i, word in enumerate(words):
             if i % 3 == 0:  # Alternate colors
                 box_color = (255, 255, 0, 220)  # Yellow
                 text_color = (0, 0, 0, 255)  # Black
@@ -239,21 +316,21 @@ class VideoEffectsManager:
             else:
                 box_color = (0, 255, 255, 220)  # Cyan
                 text_color = (0, 0, 0, 255)  # Black
-            
-            # Draw box
-            draw.rounded_rectangle(
-                [x - padding, 60, x + text_width + padding, 140],
-                radius=10,
-                fill=box_color
-            )
-            
-            # Draw text
-            draw.text((x, 70), word.upper(), font=font, fill=text_color)
-            
-            # Create clip
-            word_clip = (ImageClip(np.array(img), duration=word_duration * 1.5)
-                        .set_start(i * word_duration)
-                        .set_position(('center', 1600)))
+
+            # Create word clip (common words repeat a lot, so reuse their rasters)
+            word_img = cached_overlay(('caption_word', word.upper(), font_name, 60, box_color, text_color, width),
+                                      lambda: render(word.upper(), box_color, text_color))
+            # Same distance from the bottom edge in every format
+            if timings:
+                # Shown from the moment the word is spoken until the next one starts
+                start = timings[i]['start']
+                end = timings[i + 1]['start'] if i + 1 < len(timings) else min(duration, timings[i]['end'] + 0.5)
+                shown = max(end, timings[i]['end']) - start
+            else:
+                start, shown = i * word_duration, word_duration * 1.5
+            word_clip = (ImageClip(word_img, duration=shown)
+                        .set_start(start)
+                        .set_position(('center', height - 320)))
             
             # Add pop animation
             word_clip = word_clip.resize(lambda t: min(1.3, 0.5 + t * 6) if t < 0.1 else 1)
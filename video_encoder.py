@@ -0,0 +1,226 @@
+# File: C:\New Project\viral-ai-content\video_encoder.py
+"""
+Video Encoders for Viral AI Content
+Pluggable encode backends. PipeEncoder streams raw RGB frames straight into
+an ffmpeg subprocess over stdin (buffer-protocol writes, no per-frame copy)
+with tunable x264 settings, and reports the encode speed
+"""
+
+import os
+import time
+import tempfile
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+from audio_pcm import write_wav
+
+
+class PipeEncoder:
+    """Raw frames -> ffmpeg stdin; audio muxed from a file in the same ffmpeg run"""
+
+    def __init__(self, codec='libx264', preset='medium', crf=23, tune=None, gop=None,
+                 threads=0, pix_fmt='yuv420p', audio_codec='aac', audio_bitrate=None):
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.tune = tune
+        self.gop = gop
+        self.threads = threads  # 0 = let ffmpeg pick
+        self.pix_fmt = pix_fmt
+        self.audio_codec = audio_codec
+        self.audio_bitrate = audio_bitrate
+
+    def video_args(self):
+        """Output video codec options"""
+        args = ['-c:v', self.codec, '-preset', self.preset, '-crf', str(self.crf),
+                '-threads', str(self.threads), '-pix_fmt', self.pix_fmt]
+        if self.tune:
+            args += ['-tune', self.tune]
+        if self.gop:
+            args += ['-g', str(self.gop)]
+        return args
+
+    def command(self, output_path, size, fps, audio_path=None):
+        """ffmpeg command line for a width x height rgb24 stream on stdin"""
+        width, height = size
+        cmd = [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-vcodec', 'rawvideo',
+               '-s', f"{width}x{height}", '-pix_fmt', 'rgb24', '-r', f"{fps}",
+               '-i', '-']
+        if audio_path:
+            cmd += ['-i', audio_path]
+
+        cmd += ['-map', '0:v:0'] + self.video_args()
+        if audio_path:
+            cmd += ['-map', '1:a:0', '-c:a', self.audio_codec]
+            if self.audio_bitrate:
+                cmd += ['-b:a', self.audio_bitrate]
+        cmd += ['-movflags', '+faststart', output_path]
+        return cmd
+
+    @staticmethod
+    def read_log(log):
+        """Everything ffmpeg wrote to a stderr log file"""
+        log.seek(0)
+        return log.read().decode(errors='ignore').strip()
+
+    def encode(self, clip, output_path, fps, audio_path=None, scratch_dir=None):
+        """
+        Encode clip to output_path. audio_path (e.g. the voiceover) is muxed
+        as-is; otherwise the clip's own audio is rendered to a temp WAV first
+        (in scratch_dir, e.g. the job's scratch directory).
+        Returns {'frames', 'seconds', 'fps'}.
+        """
+        return self.encode_many([(clip, output_path)], fps, audio_path, scratch_dir)
+
+    def encode_many(self, outputs, fps, audio_path=None, scratch_dir=None):
+        """
+        Encode several same-length clips [(clip, output_path), ...] in one pass
+        over the timeline, one ffmpeg process per output. Clips cut from a
+        shared master (multi_format.format_branch) compose each master frame
+        once. The audio (audio_path, or the first clip's audio) is shared.
+        """
+        temp_audio = None
+        first = outputs[0][0]
+        if audio_path is None and first.audio is not None:
+            # Samples are mixed in memory and written as PCM WAV directly (no
+            # ffmpeg writer); ffmpeg encodes them during the mux
+            handle, temp_audio = tempfile.mkstemp(suffix='.wav', dir=scratch_dir)
+            os.close(handle)
+            chunks = list(first.audio.iter_chunks(fps=44100, quantize=True, nbytes=2, chunksize=50000))
+            samples = np.concatenate(chunks)
+            write_wav(temp_audio, samples, 44100)
+            audio_path = temp_audio
+
+        procs = []
+        logs = []
+        started = time.time()
+        frames = 0
+        try:
+            for clip, output_path in outputs:
+                cmd = self.command(output_path, clip.size, fps, audio_path)
+                # ffmpeg's stderr goes to a temp file, so a chatty encoder can't fill
+                # the pipe and stall while we are still writing frames
+                log = tempfile.TemporaryFile(dir=scratch_dir)
+                logs.append(log)
+                procs.append(subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                              stderr=log))
+
+            try:
+                # Same frame times as moviepy's iter_frames
+                for t in np.arange(0, first.duration, 1.0 / fps):
+                    for (clip, _), proc in zip(outputs, procs):
+                        frame = clip.get_frame(t)
+                        if frame.dtype != np.uint8:
+                            frame = frame.astype(np.uint8)
+                        # Writes straight from the array's buffer (copies only if not contiguous)
+                        proc.stdin.write(memoryview(np.ascontiguousarray(frame)))
+                    frames += 1
+
+                for proc in procs:
+                    proc.stdin.close()
+            except BrokenPipeError as e:
+                # An ffmpeg process exited early - report what it said, not the broken pipe
+                for proc, log in zip(procs, logs):
+                    try:
+                        returncode = proc.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        continue  # still waiting for frames, so not the one that failed
+                    if returncode != 0:
+                        raise IOError(f"ffmpeg encode failed: {self.read_log(log)}") from e
+                raise
+
+            for proc, log in zip(procs, logs):
+                if proc.wait() != 0:
+                    raise IOError(f"ffmpeg encode failed: {self.read_log(log)}")
+        except Exception:
+            for proc in procs:
+                proc.kill()
+            raise
+        finally:
+            for proc in procs:
+                proc.wait()
+            for log in logs:
+                log.close()
+            if temp_audio and os.path.exists(temp_audio):
+                os.remove(temp_audio)
+
+        seconds = time.time() - started
+        stats = {'frames': frames, 'seconds': seconds, 'fps': frames / max(seconds, 1e-6)}
+        outputs_note = f" x {len(outputs)} outputs" if len(outputs) > 1 else ""
+        print(f"🎞️ Encoded {frames} frames{outputs_note} in {seconds:.1f}s ({stats['fps']:.1f} fps, "
+              f"{self.codec} {self.preset} crf {self.crf})")
+        return stats
+
+
+class MoviepyEncoder:
+    """The original write_videofile path, behind the same interface"""
+
+    def __init__(self, codec='libx264', preset='medium', crf=None, tune=None, gop=None,
+                 threads=4, pix_fmt=None, audio_codec='aac', audio_bitrate=None):
+        self.codec = codec
+        self.preset = preset
+        self.threads = threads
+        self.audio_codec = audio_codec
+        self.audio_bitrate = audio_bitrate
+        self.settings = {'codec': codec, 'preset': preset, 'crf': crf, 'tune': tune, 'gop': gop,
+                         'threads': threads, 'pix_fmt': pix_fmt, 'audio_codec': audio_codec,
+                         'audio_bitrate': audio_bitrate}
+
+        self.ffmpeg_params = []
+        if crf is not None:
+            self.ffmpeg_params += ['-crf', str(crf)]
+        if tune:
+            self.ffmpeg_params += ['-tune', tune]
+        if gop:
+            self.ffmpeg_params += ['-g', str(gop)]
+        if pix_fmt:
+            self.ffmpeg_params += ['-pix_fmt', pix_fmt]
+
+    def pipe_encoder(self):
+        """PipeEncoder with the same settings, for renderers that run ffmpeg themselves"""
+        # Unset options keep PipeEncoder's defaults (crf 23, yuv420p - libx264's own defaults)
+        return PipeEncoder(**{key: value for key, value in self.settings.items() if value is not None})
+
+    def encode(self, clip, output_path, fps, audio_path=None, scratch_dir=None):
+        if audio_path is not None:
+            from moviepy.editor import AudioFileClip
+            clip = clip.set_audio(AudioFileClip(audio_path))
+
+        # moviepy's intermediate audio file would otherwise land in the current directory
+        handle, temp_audio = tempfile.mkstemp(suffix='.m4a', dir=scratch_dir)
+        os.close(handle)
+
+        started = time.time()
+        try:
+            clip.write_videofile(output_path, fps=fps, codec=self.codec, audio_codec=self.audio_codec,
+                                 audio_bitrate=self.audio_bitrate, preset=self.preset,
+                                 threads=self.threads, ffmpeg_params=self.ffmpeg_params or None,
+                                 temp_audiofile=temp_audio, logger=None)
+        finally:
+            if os.path.exists(temp_audio):
+                os.remove(temp_audio)
+        seconds = time.time() - started
+        frames = len(np.arange(0, clip.duration, 1.0 / fps))
+        return {'frames': frames, 'seconds': seconds, 'fps': frames / max(seconds, 1e-6)}
+
+    def encode_many(self, outputs, fps, audio_path=None, scratch_dir=None):
+        """write_videofile can't share a pass, so outputs are encoded one after another"""
+        stats = [self.encode(clip, output_path, fps, audio_path, scratch_dir) for clip, output_path in outputs]
+        seconds = sum(s['seconds'] for s in stats)
+        frames = stats[0]['frames']
+        return {'frames': frames, 'seconds': seconds, 'fps': frames / max(seconds, 1e-6)}
+
+
+ENCODERS = {
+    'pipe': PipeEncoder,
+    'moviepy': MoviepyEncoder,
+}
+
+
+def get_encoder(name=None, **settings):
+    """Encoder backend by name (defaults to VIDEO_ENCODER, then 'pipe')"""
+    name = name or os.getenv('VIDEO_ENCODER', 'pipe')
+    return ENCODERS[name](**settings)
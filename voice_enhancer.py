@@ -4,34 +4,42 @@ Enhanced Voice Generator with Natural Pauses and Human-like Speech
 Makes AI voices sound more natural and engaging
 """
 
-import edge_tts
 import asyncio
 import re
 import os
-import random
-from datetime import datetime
-from moviepy.editor import AudioFileClip
+import tempfile
+from parallel_speech import synthesize_speech
+from speech_synthesis import get_backend_name
 
 class NaturalVoiceGenerator:
-    def __init__(self):
+    def __init__(self, tts_backend=None):
         self.voices = {
             'female': 'en-GB-LibbyNeural',  # British female - sounds most natural
             'male': 'en-IN-PrabhatNeural',
             'female_alt': 'en-IN-NeerjaNeural',  # Indian accent backup
         }
 
+        # Concurrent sentence syntheses (1 = the whole text in one request)
+        self.tts_workers = int(os.getenv('TTS_WORKERS', '1'))
+
+        # Speech backend (TTS_BACKEND=edge|espeak|tone); espeak and tone run offline
+        self.tts_backend = get_backend_name(tts_backend)
+
     async def generate_natural_voice(self, text, voice_type='female', output_file='temp_voice.mp3'):
         """Generate voice with natural pauses and emphasis"""
+        speech = await self.synthesize(text, voice_type)
+        return speech.save(output_file)
 
+    async def synthesize(self, text, voice_type='female'):
+        """Speech audio plus exact word timings (SpeechResult)"""
         # Use clean text without SSML markup - the British voice sounds natural already
         clean_text = text.strip()
 
-        # Generate voice with edge-tts
+        # Generate voice with the configured backend (edge-tts by default)
         voice = self.voices[voice_type]
-        communicate = edge_tts.Communicate(clean_text, voice)  # No SSML markup needed
-        await communicate.save(output_file)
-
-        return output_file
+        # Repeats (retries, re-renders, other formats) come from the on-disk cache
+        return await synthesize_speech(clean_text, voice, backend=self.tts_backend,
+                                       workers=self.tts_workers)  # No SSML markup needed
 
     def add_speech_markup(self, text):
         """Add SSML markup for natural pauses and emphasis"""
@@ -120,60 +128,32 @@ class NaturalVoiceGenerator:
         return conversational
 
 # Integration function for your existing code
-async def generate_voice_with_subtitles_enhanced(text, voice_type='female'):
-    """Enhanced version to replace your existing function"""
-    generator = NaturalVoiceGenerator()
+async def generate_speech_enhanced(text, voice_type='female', tts_backend=None):
+    """
+    Conversational voiceover kept in memory: returns (SpeechResult, subtitles).
+    speech.audio_clip() gives the decoded audio for compositing.
+    """
+    generator = NaturalVoiceGenerator(tts_backend)
 
     # Make text more conversational
     script_data = {'voiceover': text}
     conversational_text = generator.create_conversational_script(script_data)
 
-    # Generate natural voice
-    voice_file = f"temp_voice_{datetime.now().timestamp()}.mp3"
-    await generator.generate_natural_voice(conversational_text, voice_type, voice_file)
-
-    # Generate subtitle timings with improved word timing
-    words = conversational_text.split()
-
-    # Try to get actual audio duration, fallback to estimation
-    try:
-        audio_clip = AudioFileClip(voice_file)
-        duration = audio_clip.duration
-        audio_clip.close()  # Clean up
-    except:
-        # Fallback: estimate duration (roughly 3 words per second)
-        duration = len(words) / 3.0
-
-    # More realistic word timing with variable speeds
-    subtitles = []
-    current_time = 0
-
-    for i, word in enumerate(words):
-        # Variable word duration based on word length and punctuation
-        base_duration = len(word) * 0.08  # Base on word length
-
-        # Add extra time for punctuation
-        if any(p in word for p in ['.', '!', '?']):
-            base_duration += 0.3
-        elif ',' in word:
-            base_duration += 0.15
-
-        # Add natural variation
-        word_duration = base_duration * random.uniform(0.9, 1.1)
-
-        subtitles.append({
-            'text': word,
-            'start': current_time,
-            'end': current_time + word_duration
-        })
-        current_time += word_duration
-
-    # Normalize timing to match actual audio duration
-    if current_time > 0:
-        scale_factor = duration / current_time
-        for sub in subtitles:
-            sub['start'] *= scale_factor
-            sub['end'] *= scale_factor
+    # Generate natural voice (audio and word boundaries come from the same stream)
+    speech = await generator.synthesize(conversational_text, voice_type)
+
+    # Subtitle timings are the spoken word boundaries
+    subtitles = [dict(word) for word in speech.words]
+
+    return speech, subtitles
+
+async def generate_voice_with_subtitles_enhanced(text, voice_type='female', output_dir=None, tts_backend=None):
+    """Enhanced version to replace your existing function (writes the voice to a unique file in output_dir, default the system temp dir)"""
+    speech, subtitles = await generate_speech_enhanced(text, voice_type, tts_backend)
+
+    handle, voice_file = tempfile.mkstemp(prefix='voice_', suffix=f'.{speech.audio_format}', dir=output_dir)
+    os.close(handle)
+    speech.save(voice_file)
 
     return voice_file, subtitles
 